@@ -1,13 +1,26 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # ============================================
     # DATABASE CONFIGURATION
     # ============================================
     DATABASE_URL: str
+    REPLICA_DATABASE_URL: Optional[str] = None  # read-only routes; primary is used when unset
     MONGODB_URL: str = "mongodb://localhost:27017"  
     
+    # ============================================
+    # CONNECTION POOL SETTINGS
+    # ============================================
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL only, 0 disables
+    DB_LEAK_THRESHOLD_SECONDS: float = 30.0  # warn when a connection is held longer
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # reads fall back to primary beyond this lag
+    REPLICA_LAG_CHECK_INTERVAL: float = 10.0  # seconds between replica lag checks
+    
     # ============================================
     # JWT AUTHENTICATION
     # ============================================
@@ -15,6 +28,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFERRAL_CODE_SECRET: Optional[str] = None  # keys the referral code permutation; SECRET_KEY when unset
     
     # ============================================
     # APPLICATION SETTINGS
@@ -50,6 +64,66 @@ class Settings(BaseSettings):
     BACKUP_DIR: str = "backups"
     DEFAULT_BACKUP_TIME: str = "02:00"  
     
+    # ============================================
+    # RETENTION SETTINGS
+    # ============================================
+    NOTIFICATION_RETENTION_MONTHS: int = 12  # months kept before archival to BACKUP_DIR/archive, 0 keeps all
+    NOTIFICATION_PARTITION_MONTHS_AHEAD: int = 2  # future monthly partitions kept ready (PostgreSQL)
+    RETENTION_MAINTENANCE_INTERVAL: int = 86400  # seconds between partition/retention runs
+    
+    # ============================================
+    # INACTIVITY SETTINGS
+    # ============================================
+    INACTIVITY_RECOMPUTE_TIME: str = "03:00"  # daily run, UTC
+    INACTIVITY_CHUNK_SIZE: int = 10000  # customer_id range per UPDATE
+    INACTIVITY_WARNING_DAYS: List[int] = [7, 30]  # days_inactive values that trigger a warning
+    INACTIVITY_NOTIFICATION_BATCH_SIZE: int = 500
+    SUBSCRIPTION_EXPIRY_INTERVAL: int = 300  # seconds between expiry runs, which refresh expired customers' activity state
+    
+    # ============================================
+    # NOTIFICATION STREAM SETTINGS
+    # ============================================
+    NOTIFICATION_STREAM_PG_NOTIFY: bool = True  # fan out to every worker through LISTEN/NOTIFY on PostgreSQL
+    NOTIFICATION_STREAM_HEARTBEAT_MIN: int = 15  # seconds of silence before the first keep-alive
+    NOTIFICATION_STREAM_HEARTBEAT_MAX: int = 60  # keep-alive interval doubles while idle, up to this
+    NOTIFICATION_STREAM_RETRY_MS: int = 3000  # reconnect delay advertised to clients
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100  # undelivered events per connection before it is dropped
+    NOTIFICATION_STREAM_REPLAY_LIMIT: int = 100  # missed notifications read per query when resuming
+    
+    # ============================================
+    # LOGGING SETTINGS
+    # ============================================
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_MODULE_LEVELS: Dict[str, str] = {}  # e.g. {"app.crud": "DEBUG"}
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # fraction of DEBUG records kept
+
+    # ============================================
+    # RATE LIMITING
+    # ============================================
+    RATE_LIMIT_REQUESTS: int = 1000  # per client IP per window, applied to every route
+    RATE_LIMIT_WINDOW: int = 3600  # seconds
+
+    # ============================================
+    # METRICS SETTINGS
+    # ============================================
+    METRICS_ENABLED: bool = True  # request metrics middleware and GET /metrics
+    SQL_PROFILING_ENABLED: bool = False  # per-request statement profiling and N+1 detection
+    SQL_PROFILE_LOG_SAMPLE_RATE: float = 0.01  # fraction of profiled requests logged
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times flags an N+1
+    REALTIME_METRICS_STREAM_INTERVAL: int = 5  # seconds between live admin dashboard snapshots
+
+    # ============================================
+    # CACHE SETTINGS
+    # ============================================
+    NOTIFICATION_COUNTER_RECONCILE_INTERVAL: int = 3600  # seconds between inbox counter reconciles
+    NOTIFICATION_COUNTER_RECONCILE_BATCH_SIZE: int = 1000  # customers checked per reconcile transaction
+    DASHBOARD_COUNTER_RECONCILE_INTERVAL: int = 300  # seconds between dashboard counter rebuilds
+    REDIS_URL: Optional[str] = None  # shared counter store across workers; in-process when unset
+    PHONE_DIRECTORY_CACHE_SIZE: int = 4096  # phone numbers kept in the resolution LRU, 0 disables
+    PHONE_DIRECTORY_CACHE_TTL: int = 30  # seconds; bounds staleness from other workers' writes
+    PHONE_DEFAULT_COUNTRY_CODE: str = "91"  # for numbers entered without a country code
+    
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,101 @@
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config import settings
+
+# Attributes every LogRecord carries; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a log record as a single JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues the record as logged. The stock prepare() merges
+    args into the message on the calling thread and clears exc_info, which both
+    moved the formatting cost back onto the request and lost tracebacks.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records; higher levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+def setup_logging() -> None:
+    """
+    Route all application logging through a queue so request handlers only pay
+    for enqueueing a record; message formatting, tracebacks and the stdout
+    write happen on the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        output_handler.setFormatter(JsonFormatter())
+    else:
+        output_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for module_name, level in settings.LOG_MODULE_LEVELS.items():
+        logging.getLogger(module_name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,269 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus text exposition without the client library: a handful of metric
+# families whose children (one per label combination) are created once and
+# then only updated in place.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def preregister(self, label_sets: Iterable[Sequence[str]]):
+        """Create children up front so the request path never allocates them"""
+        for values in label_sets:
+            self.labels(*values)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _ValueChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    @contextmanager
+    def time(self, *label_values: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.labels(*label_values).observe(time.perf_counter() - start)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests = registry.register(Counter(
+    "http_requests", "HTTP requests by route, method and status", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+
+# Database, attributed to the request that issued the statements
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ("method", "route"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250)))
+db_time_per_request = registry.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per request", ("method", "route")))
+
+# Application events
+notifications_dispatched = registry.register(Counter(
+    "notifications_dispatched", "Notifications dispatched by channel and outcome", ("channel", "result")))
+rate_limit_rejections = registry.register(Counter(
+    "rate_limit_rejections", "Requests rejected by a rate limiter", ("limiter",)))
+notification_stream_connections = registry.register(Gauge(
+    "notification_stream_connections", "Open customer notification streams in this process"))
+notification_stream_events = registry.register(Counter(
+    "notification_stream_events", "Notifications pushed to streams; source is live or replay", ("source",)))
+background_job_duration = registry.register(Histogram(
+    "background_job_duration_seconds", "Background job run time", ("job",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)))
+single_flight_requests = registry.register(Counter(
+    "single_flight_requests", "Coalesced reads by route; role is leader (computed) or follower (shared)",
+    ("route", "role")))
+
+# Routes served through app.core.single_flight
+SINGLE_FLIGHT_ROUTES = (
+    "/customer/plans", "/customer/offers", "/customer/cms/content",
+    "/admin/analytics/dashboard", "/admin/analytics/revenue", "/admin/analytics/customers/growth",
+    "/admin/analytics/referrals/trend", "/admin/analytics/plans/performance",
+    "/admin/analytics/cohorts/retention", "/admin/analytics/churn", "/admin/analytics/arpu",
+)
+
+http_requests_in_flight.preregister([()])
+notification_stream_connections.preregister([()])
+notification_stream_events.preregister([("live",), ("replay",)])
+notifications_dispatched.preregister(
+    (channel, result) for channel in ("sms", "push") for result in ("sent", "failed"))
+rate_limit_rejections.preregister([("global",), ("route",)])
+background_job_duration.preregister(
+    [("automated_notifications",), ("dashboard_counter_reconcile",), ("inactivity_recompute",),
+     ("notification_counter_reconcile",), ("notification_retention",), ("realtime_metrics_seed",),
+     ("scheduled_backup",), ("subscription_expiry",)])
+single_flight_requests.preregister(
+    (route, role) for route in SINGLE_FLIGHT_ROUTES for role in ("leader", "follower"))
+
+
+# ----------------------------------------------------------------------
+# Per-request SQL accounting
+# ----------------------------------------------------------------------
+
+class RequestDBStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+def instrument_engine_for_metrics(db_engine: Engine) -> None:
+    """Count statements and cursor time into the active request's RequestDBStats"""
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_db_stats.get() is not None:
+            conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_db_stats.get()
+        if stats is None:
+            return
+        starts = conn.info.get("query_start_time")
+        stats.queries += 1
+        if starts:
+            stats.db_time += time.perf_counter() - starts.pop()
@@ -0,0 +1,86 @@
+"""
+One set of Session hooks for every service that reacts to committed rows.
+
+Each flush is walked once and its rows are grouped by model; handlers
+registered with on_flush() get the new, dirty and deleted rows of the models
+they watch. Values have to be captured there, because instances are expired
+after commit: a handler stage()s what it needs, and the on_commit() handler
+for the same key receives everything staged once the transaction commits.
+Staged items of a rolled back transaction are discarded.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_STAGED = "session_events_staged"
+
+FlushHandler = Callable[[Session, List[Any], List[Any], List[Any]], None]
+
+_flush_handlers: List[Tuple[Tuple[type, ...], FlushHandler]] = []
+_commit_handlers: Dict[str, Callable[[List[Any]], None]] = {}
+
+
+def on_flush(*models: type):
+    """
+    Register fn(session, new, dirty, deleted), called after each flush that
+    wrote rows of `models` (matched by exact class) with those rows
+    """
+    def register(fn: FlushHandler) -> FlushHandler:
+        _flush_handlers.append((models, fn))
+        return fn
+    return register
+
+
+def on_commit(key: str):
+    """Register fn(items) to receive everything staged under `key` once the transaction commits"""
+    def register(fn: Callable[[List[Any]], None]) -> Callable[[List[Any]], None]:
+        _commit_handlers[key] = fn
+        return fn
+    return register
+
+
+def stage(session: Session, key: str, item: Any):
+    """Hold `item` for the on_commit() handler of `key` until `session` commits or rolls back"""
+    session.info.setdefault(_STAGED, {}).setdefault(key, []).append(item)
+
+
+def _by_model(objects) -> Dict[type, List[Any]]:
+    grouped: Dict[type, List[Any]] = {}
+    for obj in objects:
+        grouped.setdefault(type(obj), []).append(obj)
+    return grouped
+
+
+def _select(grouped: Dict[type, List[Any]], models: Sequence[type]) -> List[Any]:
+    return [obj for model in models for obj in grouped.get(model, ())]
+
+
+@event.listens_for(Session, "after_flush")
+def _dispatch_flush(session, flush_context):
+    new, dirty, deleted = _by_model(session.new), _by_model(session.dirty), _by_model(session.deleted)
+    for models, handler in _flush_handlers:
+        rows = _select(new, models), _select(dirty, models), _select(deleted, models)
+        if any(rows):
+            handler(session, *rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_commit(session):
+    staged = session.info.pop(_STAGED, None)
+    if not staged:
+        return
+    # The data is committed either way; one failing consumer must not stop the rest
+    for key, items in staged.items():
+        try:
+            _commit_handlers[key](items)
+        except Exception as e:
+            logger.error("Failed to apply committed %s: %s", key, e)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session):
+    session.info.pop(_STAGED, None)
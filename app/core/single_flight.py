@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from app.core.metrics import single_flight_requests
+from app.database import read_session_scope
+
+T = TypeVar("T")
+
+FlightKey = Tuple[str, Optional[Hashable], Tuple[Tuple[str, Hashable], ...]]
+
+
+def flight_key(route: str, principal: Optional[Hashable] = None, **params: Any) -> FlightKey:
+    """
+    Key for a coalesced read: the route, the caller when the result depends on
+    who asks, and the query parameters in a fixed order. Parameters left at
+    None are dropped, so an omitted filter and an explicit default share a key.
+    """
+    normalized = tuple(sorted((name, value) for name, value in params.items() if value is not None))
+    return route, principal, normalized
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical reads into one computation. The first
+    request for a key (the leader) starts it as a task; requests arriving with
+    the same key while it runs (followers) await that task and share its
+    result or exception. Nothing is cached: once the task finishes, the next
+    request starts a fresh one. A caller that disconnects does not cancel the
+    computation the others are waiting on.
+    """
+
+    def __init__(self):
+        self._flights: Dict[FlightKey, asyncio.Future] = {}
+
+    def _finished(self, key: FlightKey, task: asyncio.Future):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the exception retrieved if every waiter went away before it was raised
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: FlightKey, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+            single_flight_requests.labels(key[0], "leader").inc()
+        else:
+            single_flight_requests.labels(key[0], "follower").inc()
+        return await asyncio.shield(task)
+
+    async def do_read(self, key: FlightKey, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Coalesce a blocking SQL read. fn(db, *args) runs in a worker thread on
+        its own read session, since the leader's request session may be closed
+        while followers still wait on the result.
+        """
+        def call():
+            with read_session_scope() as db:
+                return fn(db, *args)
+
+        return await self.do(key, lambda: asyncio.to_thread(call))
+
+single_flight = SingleFlight()
@@ -0,0 +1,107 @@
+import re
+import time
+import hashlib
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|:\w+|\?|%s|\$\d+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in values compare equal"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _POSTCOMPILE.sub("(?)", normalized)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class SQLProfile:
+    """Statements executed while a profile is active (one request, or a `profile_sql` block)"""
+
+    def __init__(self):
+        self.statement_count = 0
+        self.db_time = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.statement_count += 1
+        self.db_time += duration
+        self.fingerprints[fingerprint_statement(statement)] += 1
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Fingerprints executed at least `threshold` times, the usual N+1 signature"""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {fp: count for fp, count in self.fingerprints.most_common() if count >= threshold}
+
+    @property
+    def has_n_plus_one(self) -> bool:
+        return bool(self.repeated_statements())
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "statement_count": self.statement_count,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "distinct_statements": len(self.fingerprints),
+            "n_plus_one": [
+                {"fingerprint": fp, "count": count, "id": fingerprint_id(fp)}
+                for fp, count in self.repeated_statements().items()
+            ],
+        }
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    """Short stable id for a fingerprint, small enough for a response header"""
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+
+current_sql_profile: ContextVar[Optional[SQLProfile]] = ContextVar("current_sql_profile", default=None)
+
+
+@contextmanager
+def profile_sql():
+    """
+    Profile every statement executed inside the block, e.g. to assert a query
+    budget around a call:
+
+        with profile_sql() as profile:
+            client.get("/customer/transactions")
+        assert profile.statement_count <= 5
+    """
+    profile = SQLProfile()
+    token = current_sql_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_sql_profile.reset(token)
+
+
+def instrument_engine_for_profiling(db_engine: Engine) -> None:
+    """Record statements into the active SQLProfile; a no-op when none is active"""
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_sql_profile.get() is not None:
+            conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_sql_profile.get()
+        if profile is None:
+            return
+        starts = conn.info.get("profile_start_time")
+        duration = time.perf_counter() - starts.pop() if starts else 0.0
+        profile.record(statement, duration)
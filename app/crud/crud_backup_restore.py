@@ -1,3 +1,4 @@
+import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 from datetime import datetime, timedelta
@@ -8,6 +9,8 @@ import zipfile
 from app.models.models import Backup, Restore, Admin, Customer, Transaction, Subscription, Plan, Category
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 class CRUDBackupRestore:
     def create_backup(self, db: Session, admin_id: int, backup_type: str, data_list: Dict[str, Any]):
         """Create a backup record"""
@@ -190,7 +193,7 @@ class CRUDBackupRestore:
             
             return True
         except Exception as e:
-            print(f"Error saving backup file: {e}")
+            logger.error("Error saving backup file: %s", e)
             return False
     
     def load_backup_file(self, file_path: str) -> Optional[Dict[str, Any]]:
@@ -199,7 +202,7 @@ class CRUDBackupRestore:
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"Error loading backup file: {e}")
+            logger.error("Error loading backup file: %s", e)
             return None
     
     def get_backup_stats(self, db: Session):
@@ -5,6 +5,7 @@ from typing import List, Optional
 from app.models.models import Customer, Transaction, Subscription, SubscriptionActivationQueue, AccountStatus
 from app.schemas.customer import CustomerFilter, CustomerUpdate, CustomerRegister
 from app.core.security import get_password_hash, verify_password
+from app.services.customer_search import customer_search, phone_filter, name_filter
 
 class CRUDCustomer:
     def get_by_phone(self, db: Session, phone_number: str):
@@ -67,6 +68,25 @@ class CRUDCustomer:
             db.refresh(customer)
         return customer
     
+    def record_plan_activation(self, db: Session, customer_id: int, activated_at: datetime):
+        """Stage the activity state for a plan that just became active; the caller commits"""
+        db.query(Customer).filter(Customer.customer_id == customer_id).update({
+            Customer.last_active_plan_date: activated_at,
+            Customer.days_inactive: 0,
+            Customer.inactivity_status_updated_at: activated_at
+        }, synchronize_session=False)
+
+    def mark_first_recharge(self, db: Session, customer_id: int) -> bool:
+        """
+        Set first_recharge_at if it is still unset. Returns True only for the
+        call that set it, so concurrent recharges cannot both count as first.
+        """
+        updated = db.query(Customer).filter(
+            Customer.customer_id == customer_id,
+            Customer.first_recharge_at.is_(None)
+        ).update({Customer.first_recharge_at: datetime.utcnow()}, synchronize_session=False)
+        return updated == 1
+
     def get_all(
         self, 
         db: Session, 
@@ -78,14 +98,21 @@ class CRUDCustomer:
         
         # Apply filters
         if filter.phone_number:
-            query = query.filter(Customer.phone_number.ilike(f"%{filter.phone_number}%"))
+            query = query.filter(phone_filter(Customer.phone_number, filter.phone_number))
         
         if filter.full_name:
-            query = query.filter(Customer.full_name.ilike(f"%{filter.full_name}%"))
+            query = query.filter(name_filter(Customer.full_name, filter.full_name))
         
         if filter.account_status:
             query = query.filter(Customer.account_status == filter.account_status)
         
+        # Maintained nightly by inactivity_service; served by idx_customer_days_inactive
+        if filter.days_inactive_min is not None:
+            query = query.filter(Customer.days_inactive >= filter.days_inactive_min)
+        
+        if filter.days_inactive_max is not None:
+            query = query.filter(Customer.days_inactive <= filter.days_inactive_max)
+        
         return query.order_by(Customer.created_at.desc()).offset(skip).limit(limit).all()
     
     def get_customer_details(self, db: Session, customer_id: int):
@@ -234,13 +261,7 @@ class CRUDCustomer:
         }
     
     def search_customers(self, db: Session, search_term: str, skip: int = 0, limit: int = 50):
-        """Search customers by phone number or name"""
-        return db.query(Customer).filter(
-            Customer.deleted_at.is_(None),
-            or_(
-                Customer.phone_number.ilike(f"%{search_term}%"),
-                Customer.full_name.ilike(f"%{search_term}%")
-            )
-        ).offset(skip).limit(limit).all()
+        """Search customers by phone number or name, best matches first"""
+        return customer_search.search(db, search_term, skip=skip, limit=limit)
 
 crud_customer = CRUDCustomer()
\ No newline at end of file
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 from app.models.models import LinkedAccount, Customer
 from app.schemas.linked_account import LinkedAccountCreate, LinkedAccountResponse
+from app.services.phone_directory import phone_directory
 
 class CRUDLinkedAccount:
     def get_by_id(self, db: Session, linked_account_id: int):
@@ -41,30 +42,25 @@ class CRUDLinkedAccount:
     def create(self, db: Session, linked_account: LinkedAccountCreate):
         """Create a new linked account relationship"""
         
-        # Check if relationship already exists
-        existing = self.get_relationship(
-            db, linked_account.primary_customer_id, linked_account.linked_phone_number
-        )
-        if existing:
-            return None, "This phone number is already linked to your account"
+        # One directory lookup answers the duplicate, own-number and registered-customer checks;
+        # uncached, since there is no unique constraint behind the duplicate check
+        directory_entry = phone_directory.resolve(db, linked_account.linked_phone_number, use_cache=False)
+        if directory_entry is None:
+            return None, "Invalid phone number"
         
-        # Check if trying to link own number
-        primary_customer = db.query(Customer).filter(
-            Customer.customer_id == linked_account.primary_customer_id
-        ).first()
+        if any(
+            link["primary_customer_id"] == linked_account.primary_customer_id
+            for link in directory_entry["linked_accounts"]
+        ):
+            return None, "This phone number is already linked to your account"
         
-        if primary_customer and primary_customer.phone_number == linked_account.linked_phone_number:
+        if directory_entry["customer_id"] == linked_account.primary_customer_id:
             return None, "Cannot link your own phone number"
         
-        # Check if linked phone belongs to existing customer
-        linked_customer = db.query(Customer).filter(
-            Customer.phone_number == linked_account.linked_phone_number
-        ).first()
-        
         db_linked_account = LinkedAccount(
             primary_customer_id=linked_account.primary_customer_id,
             linked_phone_number=linked_account.linked_phone_number,
-            linked_customer_id=linked_customer.customer_id if linked_customer else None
+            linked_customer_id=directory_entry["customer_id"]
         )
         
         db.add(db_linked_account)
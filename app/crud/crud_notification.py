@@ -4,20 +4,49 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from app.models.models import Notification, Customer, NotificationType, NotificationChannel, AccountStatus
 from app.schemas.notification import NotificationCreate
+from app.config import settings
+from app.crud.crud_notification_counter import crud_notification_counter
+
+def notification_retention_start(now: Optional[datetime] = None) -> Optional[datetime]:
+    """Start of the oldest month still retained, or None when retention is disabled"""
+    months = settings.NOTIFICATION_RETENTION_MONTHS
+    if months <= 0:
+        return None
+    now = now or datetime.utcnow()
+    year, month_index = divmod(now.year * 12 + now.month - 1 - months, 12)
+    return datetime(year, month_index + 1, 1)
 
 class CRUDNotification:
+    def _within_retention(self, query):
+        """Bound a query by created_at so partitions outside the retention window are pruned"""
+        retention_start = notification_retention_start()
+        if retention_start is not None:
+            query = query.filter(Notification.created_at >= retention_start)
+        return query
+    
     def get_by_id(self, db: Session, notification_id: int):
         return db.query(Notification).filter(Notification.notification_id == notification_id).first()
     
     def get_customer_notifications(self, db: Session, customer_id: int, skip: int = 0, limit: int = 100, 
                                  unread_only: bool = False):
-        query = db.query(Notification).filter(Notification.customer_id == customer_id)
+        query = self._within_retention(
+            db.query(Notification).filter(Notification.customer_id == customer_id)
+        )
         
         if unread_only:
             query = query.filter(Notification.is_read == False)
         
         return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
     
+    def get_customer_notifications_after(self, db: Session, customer_id: int, after_id: int, limit: int = 100):
+        """Notifications created after `after_id`, oldest first; for resuming a notification stream"""
+        return self._within_retention(
+            db.query(Notification).filter(
+                Notification.customer_id == customer_id,
+                Notification.notification_id > after_id
+            )
+        ).order_by(Notification.notification_id).limit(limit).all()
+    
     def create_notification(self, db: Session, notification: NotificationCreate):
         db_notification = Notification(
             customer_id=notification.customer_id,
@@ -28,6 +57,7 @@ class CRUDNotification:
             status="pending"
         )
         db.add(db_notification)
+        crud_notification_counter.record_created(db, [db_notification])
         db.commit()
         db.refresh(db_notification)
         return db_notification
@@ -47,6 +77,7 @@ class CRUDNotification:
             db_notifications.append(db_notification)
             db.add(db_notification)
         
+        crud_notification_counter.record_created(db, db_notifications)
         db.commit()
         
         # Refresh all notifications to get their IDs
@@ -59,23 +90,26 @@ class CRUDNotification:
         """Mark multiple notifications as read for a customer"""
         result = db.query(Notification).filter(
             Notification.notification_id.in_(notification_ids),
-            Notification.customer_id == customer_id
+            Notification.customer_id == customer_id,
+            Notification.is_read == False
         ).update({
             Notification.is_read: True
         }, synchronize_session=False)
         
+        crud_notification_counter.record_read(db, customer_id, result)
         db.commit()
         return result
     
     def mark_all_as_read(self, db: Session, customer_id: int):
         """Mark all notifications as read for a customer"""
-        result = db.query(Notification).filter(
+        result = self._within_retention(db.query(Notification)).filter(
             Notification.customer_id == customer_id,
             Notification.is_read == False
         ).update({
             Notification.is_read: True
         }, synchronize_session=False)
         
+        crud_notification_counter.record_read(db, customer_id, result)
         db.commit()
         return result
     
@@ -84,61 +118,23 @@ class CRUDNotification:
         """Update notification status and delivery info"""
         notification = self.get_by_id(db, notification_id)
         if notification:
+            old_status, old_sent_at = notification.status, notification.sent_at
             notification.status = status
             notification.delivery_mode = delivery_mode
             if sent_at:
                 notification.sent_at = sent_at
             else:
                 notification.sent_at = datetime.utcnow()
+            crud_notification_counter.record_status_change(
+                db, old_status, status, old_sent_at, notification.sent_at
+            )
             db.commit()
             db.refresh(notification)
         return notification
     
     def get_notification_stats(self, db: Session, customer_id: int):
         """Get notification statistics for a customer - shows received_today"""
-        total_notifications = db.query(Notification).filter(
-            Notification.customer_id == customer_id
-        ).count()
-        
-        unread_count = db.query(Notification).filter(
-            Notification.customer_id == customer_id,
-            Notification.is_read == False
-        ).count()
-        
-        # Notifications received today (by customer)
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        received_today = db.query(Notification).filter(
-            Notification.customer_id == customer_id,
-            Notification.created_at >= today_start 
-        ).count()
-        
-        # Count by type
-        type_counts = db.query(
-            Notification.type,
-            func.count(Notification.notification_id)
-        ).filter(
-            Notification.customer_id == customer_id
-        ).group_by(Notification.type).all()
-        
-        by_type = {ntype.value: count for ntype, count in type_counts}
-        
-        # Count by channel
-        channel_counts = db.query(
-            Notification.channel,
-            func.count(Notification.notification_id)
-        ).filter(
-            Notification.customer_id == customer_id
-        ).group_by(Notification.channel).all()
-        
-        by_channel = {nchannel.value: count for nchannel, count in channel_counts}
-        
-        return {
-            "total_notifications": total_notifications,
-            "unread_count": unread_count,
-            "received_today": received_today,  
-            "by_type": by_type,
-            "by_channel": by_channel
-        }
+        return crud_notification_counter.get_customer_stats(db, customer_id)
 
     def get_all_notifications(self, db: Session, skip: int = 0, limit: int = 100, 
                             customer_id: Optional[int] = None, 
@@ -146,7 +142,7 @@ class CRUDNotification:
                             channel: Optional[NotificationChannel] = None,
                             status: Optional[str] = None):
         """Get all notifications with filtering (for admin)"""
-        query = db.query(Notification)
+        query = self._within_retention(db.query(Notification))
         
         if customer_id:
             query = query.filter(Notification.customer_id == customer_id)
@@ -0,0 +1,342 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional
+from app.config import settings
+from app.database import advisory_lock
+from app.models.models import Customer, Notification, NotificationInboxCounter, NotificationGlobalCounter
+
+SENT_ON_PREFIX = "sent_on:"
+
+# advisory_lock key held by the worker currently reconciling
+RECONCILE_LOCK_KEY = 0x4E4F5449  # "NOTI"
+
+
+def _enum_value(value) -> str:
+    return getattr(value, "value", value)
+
+
+def _empty_inbox_counts() -> dict:
+    return {"total_count": 0, "unread_count": 0, "received_today": 0, "by_type": {}, "by_channel": {}}
+
+
+class CRUDNotificationCounter:
+    """
+    Inbox and system-wide notification counters. Every method here only stages
+    changes on the session; callers commit them together with the notification
+    rows they describe, so counters and rows change in the same transaction.
+    """
+
+    # Per-customer inbox row
+    def _lock_inbox(self, db: Session, customer_id: int) -> NotificationInboxCounter:
+        """Fetch (creating if needed) a customer's counter row, locked until commit"""
+        if db.bind.dialect.name == "postgresql":
+            db.execute(
+                pg_insert(NotificationInboxCounter)
+                .values(customer_id=customer_id, total_count=0, unread_count=0, received_today=0,
+                        by_type={}, by_channel={})
+                .on_conflict_do_nothing(index_elements=["customer_id"])
+            )
+
+        inbox = db.query(NotificationInboxCounter).filter(
+            NotificationInboxCounter.customer_id == customer_id
+        ).with_for_update().first()
+
+        if inbox is None:
+            inbox = NotificationInboxCounter(
+                customer_id=customer_id, total_count=0, unread_count=0, received_today=0,
+                by_type={}, by_channel={}
+            )
+            db.add(inbox)
+        return inbox
+
+    # System-wide keyed counters
+    def _increment_global(self, db: Session, counter_key: str, amount: int = 1):
+        if amount == 0:
+            return
+        if db.bind.dialect.name == "postgresql":
+            statement = pg_insert(NotificationGlobalCounter).values(counter_key=counter_key, count=amount)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["counter_key"],
+                set_={"count": NotificationGlobalCounter.count + statement.excluded.count}
+            ))
+            return
+
+        updated = db.query(NotificationGlobalCounter).filter(
+            NotificationGlobalCounter.counter_key == counter_key
+        ).update({NotificationGlobalCounter.count: NotificationGlobalCounter.count + amount},
+                 synchronize_session=False)
+        if not updated:
+            db.add(NotificationGlobalCounter(counter_key=counter_key, count=amount))
+            db.flush()
+
+    def record_created(self, db: Session, notifications: Iterable[Notification]):
+        """Count newly added (not yet committed) notifications"""
+        today = datetime.utcnow().date()
+        per_customer: Dict[int, list] = {}
+        global_changes: Dict[str, int] = {}
+
+        for notification in notifications:
+            per_customer.setdefault(notification.customer_id, []).append(notification)
+            for key in (
+                "total",
+                f"type:{_enum_value(notification.type)}",
+                f"channel:{_enum_value(notification.channel)}",
+                f"status:{notification.status or 'pending'}",
+            ):
+                global_changes[key] = global_changes.get(key, 0) + 1
+
+        # Lock inbox rows in a fixed order so concurrent broadcasts cannot deadlock
+        for customer_id in sorted(per_customer):
+            inbox = self._lock_inbox(db, customer_id)
+            by_type = dict(inbox.by_type or {})
+            by_channel = dict(inbox.by_channel or {})
+            received_today = inbox.received_today if inbox.today_date == today else 0
+
+            for notification in per_customer[customer_id]:
+                ntype, nchannel = _enum_value(notification.type), _enum_value(notification.channel)
+                by_type[ntype] = by_type.get(ntype, 0) + 1
+                by_channel[nchannel] = by_channel.get(nchannel, 0) + 1
+                received_today += 1
+
+            created = len(per_customer[customer_id])
+            inbox.total_count = (inbox.total_count or 0) + created
+            inbox.unread_count = (inbox.unread_count or 0) + created
+            inbox.received_today = received_today
+            inbox.today_date = today
+            inbox.by_type = by_type
+            inbox.by_channel = by_channel
+
+        for key in sorted(global_changes):
+            self._increment_global(db, key, global_changes[key])
+
+    def record_read(self, db: Session, customer_id: int, count: int):
+        """Count `count` notifications that just went from unread to read"""
+        if count <= 0:
+            return
+        inbox = self._lock_inbox(db, customer_id)
+        inbox.unread_count = max((inbox.unread_count or 0) - count, 0)
+
+    def record_status_change(self, db: Session, old_status: Optional[str], new_status: str,
+                             old_sent_at: Optional[datetime], new_sent_at: Optional[datetime]):
+        if old_status != new_status:
+            self._increment_global(db, f"status:{old_status or 'pending'}", -1)
+            self._increment_global(db, f"status:{new_status}", 1)
+
+        old_day = old_sent_at.date() if old_sent_at else None
+        new_day = new_sent_at.date() if new_sent_at else None
+        if old_day != new_day:
+            if old_day:
+                self._increment_global(db, f"{SENT_ON_PREFIX}{old_day.isoformat()}", -1)
+            if new_day:
+                self._increment_global(db, f"{SENT_ON_PREFIX}{new_day.isoformat()}", 1)
+
+    # Reads
+    def get_customer_stats(self, db: Session, customer_id: int):
+        inbox = db.query(NotificationInboxCounter).filter(
+            NotificationInboxCounter.customer_id == customer_id
+        ).first()
+
+        if inbox is None:
+            return {"total_notifications": 0, "unread_count": 0, "received_today": 0,
+                    "by_type": {}, "by_channel": {}}
+
+        today = datetime.utcnow().date()
+        return {
+            "total_notifications": inbox.total_count,
+            "unread_count": inbox.unread_count,
+            "received_today": inbox.received_today if inbox.today_date == today else 0,
+            "by_type": {key: count for key, count in (inbox.by_type or {}).items() if count},
+            "by_channel": {key: count for key, count in (inbox.by_channel or {}).items() if count}
+        }
+
+    def get_global_stats(self, db: Session):
+        today_key = f"{SENT_ON_PREFIX}{datetime.utcnow().date().isoformat()}"
+        rows = db.query(NotificationGlobalCounter).filter(
+            or_(
+                ~NotificationGlobalCounter.counter_key.like(f"{SENT_ON_PREFIX}%"),
+                NotificationGlobalCounter.counter_key == today_key
+            )
+        ).all()
+
+        stats = {"total_notifications": 0, "sent_today": 0, "by_type": {}, "by_channel": {}, "by_status": {}}
+        sections = {"type": "by_type", "channel": "by_channel", "status": "by_status"}
+        for row in rows:
+            if not row.count:
+                continue
+            if row.counter_key == "total":
+                stats["total_notifications"] = row.count
+            elif row.counter_key == today_key:
+                stats["sent_today"] = row.count
+            else:
+                prefix, _, name = row.counter_key.partition(":")
+                if prefix in sections:
+                    stats[sections[prefix]][name] = row.count
+        return stats
+
+    # Reconciliation
+    def reconcile(self, db: Session, today: Optional[date] = None) -> Optional[Dict[str, int]]:
+        """
+        Correct counters that drifted from the notifications table, without
+        locking either table; commits as it goes.
+
+        Counters and notification rows are written in the same transactions,
+        so within one snapshot they agree except for real drift. Each batch of
+        customers (and then the global counters) is read from one snapshot and
+        the difference is added to the live rows, which keeps every write
+        committed after the snapshot. Rows that already agree are not written.
+        On PostgreSQL one worker reconciles at a time; the others return None.
+        """
+        with advisory_lock(RECONCILE_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return None
+            return self._reconcile(db, today or datetime.utcnow().date())
+
+    def _begin_snapshot(self, db: Session):
+        """Start a transaction whose reads all see the same committed state"""
+        db.commit()
+        if db.bind.dialect.name == "postgresql":
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    def _reconcile(self, db: Session, today: date) -> Dict[str, int]:
+        today_start = datetime.combine(today, datetime.min.time())
+        corrected_customers = 0
+        after_id = 0
+
+        while True:
+            self._begin_snapshot(db)
+            customer_ids = [customer_id for customer_id, in db.query(Customer.customer_id).filter(
+                Customer.customer_id > after_id
+            ).order_by(Customer.customer_id).limit(settings.NOTIFICATION_COUNTER_RECONCILE_BATCH_SIZE)]
+            if not customer_ids:
+                db.rollback()
+                break
+            after_id = customer_ids[-1]
+
+            drift = self._inbox_drift(db, customer_ids, today, today_start)
+            db.rollback()
+            for customer_id in sorted(drift):
+                self._apply_inbox_drift(db, customer_id, drift[customer_id], today)
+            db.commit()
+            corrected_customers += len(drift)
+
+        return {"customers": corrected_customers, "global_counters": self._reconcile_global(db, today, today_start)}
+
+    def _inbox_drift(self, db: Session, customer_ids: List[int], today: date, today_start: datetime) -> Dict[int, dict]:
+        """Per customer, what must be added to the stored inbox row to match the notifications"""
+        actual: Dict[int, dict] = {}
+        for customer_id, ntype, nchannel, count, unread, received_today in db.query(
+            Notification.customer_id, Notification.type, Notification.channel,
+            func.count(Notification.notification_id),
+            func.sum(case((Notification.is_read == False, 1), else_=0)),
+            func.sum(case((Notification.created_at >= today_start, 1), else_=0))
+        ).filter(
+            Notification.customer_id.in_(customer_ids)
+        ).group_by(Notification.customer_id, Notification.type, Notification.channel):
+            counts = actual.setdefault(customer_id, _empty_inbox_counts())
+            ntype, nchannel = _enum_value(ntype), _enum_value(nchannel)
+            counts["total_count"] += count
+            counts["unread_count"] += unread
+            counts["received_today"] += received_today
+            counts["by_type"][ntype] = counts["by_type"].get(ntype, 0) + count
+            counts["by_channel"][nchannel] = counts["by_channel"].get(nchannel, 0) + count
+
+        stored = {
+            inbox.customer_id: inbox
+            for inbox in db.query(NotificationInboxCounter).filter(
+                NotificationInboxCounter.customer_id.in_(customer_ids)
+            )
+        }
+
+        drift = {}
+        for customer_id in actual.keys() | stored.keys():
+            counts = actual.get(customer_id, _empty_inbox_counts())
+            inbox = stored.get(customer_id)
+            current = _empty_inbox_counts() if inbox is None else {
+                "total_count": inbox.total_count or 0,
+                "unread_count": inbox.unread_count or 0,
+                "received_today": inbox.received_today if inbox.today_date == today else 0,
+                "by_type": inbox.by_type or {},
+                "by_channel": inbox.by_channel or {},
+            }
+            difference = {
+                field: counts[field] - current[field]
+                for field in ("total_count", "unread_count", "received_today")
+                if counts[field] != current[field]
+            }
+            for field in ("by_type", "by_channel"):
+                changed = {
+                    key: counts[field].get(key, 0) - current[field].get(key, 0)
+                    for key in counts[field].keys() | current[field].keys()
+                    if counts[field].get(key, 0) != current[field].get(key, 0)
+                }
+                if changed:
+                    difference[field] = changed
+            if difference:
+                drift[customer_id] = difference
+        return drift
+
+    def _apply_inbox_drift(self, db: Session, customer_id: int, difference: dict, today: date):
+        inbox = self._lock_inbox(db, customer_id)
+        received_today = inbox.received_today if inbox.today_date == today else 0
+        inbox.total_count = (inbox.total_count or 0) + difference.get("total_count", 0)
+        inbox.unread_count = (inbox.unread_count or 0) + difference.get("unread_count", 0)
+        inbox.received_today = received_today + difference.get("received_today", 0)
+        inbox.today_date = today
+        for field in ("by_type", "by_channel"):
+            if field in difference:
+                merged = dict(getattr(inbox, field) or {})
+                for key, change in difference[field].items():
+                    merged[key] = merged.get(key, 0) + change
+                setattr(inbox, field, merged)
+
+    def _reconcile_global(self, db: Session, today: date, today_start: datetime) -> int:
+        """Correct the system-wide counters the same way; returns how many keys were corrected"""
+        today_key = f"{SENT_ON_PREFIX}{today.isoformat()}"
+
+        self._begin_snapshot(db)
+        actual: Dict[str, int] = {}
+        for ntype, nchannel, nstatus, count, sent_today in db.query(
+            Notification.type, Notification.channel, Notification.status,
+            func.count(Notification.notification_id),
+            func.sum(case((Notification.sent_at >= today_start, 1), else_=0))
+        ).group_by(Notification.type, Notification.channel, Notification.status):
+            for key, amount in (
+                ("total", count),
+                (f"type:{_enum_value(ntype)}", count),
+                (f"channel:{_enum_value(nchannel)}", count),
+                (f"status:{nstatus or 'pending'}", count),
+                (today_key, sent_today),
+            ):
+                actual[key] = actual.get(key, 0) + amount
+
+        stored = {
+            row.counter_key: row.count
+            for row in db.query(NotificationGlobalCounter).filter(
+                or_(
+                    ~NotificationGlobalCounter.counter_key.like(f"{SENT_ON_PREFIX}%"),
+                    NotificationGlobalCounter.counter_key == today_key
+                )
+            )
+        }
+        db.rollback()
+
+        drift = {
+            key: actual.get(key, 0) - stored.get(key, 0)
+            for key in actual.keys() | stored.keys()
+            if actual.get(key, 0) != stored.get(key, 0)
+        }
+        for key in sorted(drift):
+            self._increment_global(db, key, drift[key])
+
+        # Older sent_on rows are no longer read and are dropped here
+        db.query(NotificationGlobalCounter).filter(
+            NotificationGlobalCounter.counter_key.like(f"{SENT_ON_PREFIX}%"),
+            NotificationGlobalCounter.counter_key < today_key
+        ).delete(synchronize_session=False)
+        db.commit()
+        return len(drift)
+
+
+crud_notification_counter = CRUDNotificationCounter()
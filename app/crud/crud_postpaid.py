@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+import logging
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from sqlalchemy import and_, or_, func, case, exists, select
 from datetime import datetime, timedelta
 from typing import List, Optional
 from app.models.models import (
@@ -8,6 +9,10 @@ from app.models.models import (
     PostpaidStatus, AddonStatus
 )
 from app.schemas.postpaid import PostpaidActivationFilter
+from app.crud.crud_customer import crud_customer
+from app.services.customer_search import phone_filter
+
+logger = logging.getLogger(__name__)
 
 class CRUDPostpaid:
     # ==========================================================
@@ -43,21 +48,8 @@ class CRUDPostpaid:
             PostpaidActivation.status == PostpaidStatus.active
         ).first()
     
-    def get_all_activations(
-        self, 
-        db: Session, 
-        filter: PostpaidActivationFilter,
-        skip: int = 0, 
-        limit: int = 100
-    ):
-        """Get all postpaid activations (including completed ones)"""
-        query = db.query(PostpaidActivation).join(
-            Customer, PostpaidActivation.customer_id == Customer.customer_id
-        ).join(
-            Plan, PostpaidActivation.plan_id == Plan.plan_id
-        )
-        
-        # Apply filters
+    def _apply_activation_filters(self, query, filter: PostpaidActivationFilter):
+        """Apply admin listing filters to a query already joined with Customer and Plan"""
         if filter.plan_id:
             query = query.filter(PostpaidActivation.plan_id == filter.plan_id)
         
@@ -67,8 +59,8 @@ class CRUDPostpaid:
         if filter.customer_phone:
             query = query.filter(
                 or_(
-                    PostpaidActivation.primary_number.ilike(f"%{filter.customer_phone}%"),
-                    Customer.phone_number.ilike(f"%{filter.customer_phone}%")
+                    phone_filter(PostpaidActivation.primary_number, filter.customer_phone),
+                    phone_filter(Customer.phone_number, filter.customer_phone)
                 )
             )
         
@@ -79,93 +71,146 @@ class CRUDPostpaid:
             end_date = filter.date_to + timedelta(days=1)
             query = query.filter(PostpaidActivation.created_at < end_date)
         
+        return query
+    
+    def get_all_activations(
+        self, 
+        db: Session, 
+        filter: PostpaidActivationFilter,
+        skip: int = 0, 
+        limit: int = 100
+    ):
+        """Get all postpaid activations (including completed ones)"""
+        query = db.query(PostpaidActivation).join(
+            Customer, PostpaidActivation.customer_id == Customer.customer_id
+        ).join(
+            Plan, PostpaidActivation.plan_id == Plan.plan_id
+        )
+        
+        query = self._apply_activation_filters(query, filter)
+        
         return query.order_by(PostpaidActivation.created_at.desc()).offset(skip).limit(limit).all()
     
-    def get_activations_for_customer(self, db: Session, customer_id: int, customer_phone: str = None):
-        """Get all active postpaid activations for customer (both primary and secondary)"""
+    def get_activations_with_details(
+        self,
+        db: Session,
+        filter: Optional[PostpaidActivationFilter] = None,
+        activation_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100
+    ):
+        """
+        Get postpaid activations with customer, plan, secondary numbers and active
+        addons loaded up front. Customer and plan come from the listing join itself;
+        secondary numbers and active addons are fetched with one IN query each, so
+        the statement count does not grow with the page size.
+        """
+        query = db.query(PostpaidActivation).join(
+            Customer, PostpaidActivation.customer_id == Customer.customer_id
+        ).join(
+            Plan, PostpaidActivation.plan_id == Plan.plan_id
+        ).options(
+            contains_eager(PostpaidActivation.customer),
+            contains_eager(PostpaidActivation.plan),
+            selectinload(PostpaidActivation.secondary_numbers),
+            selectinload(PostpaidActivation.data_addons.and_(
+                PostpaidDataAddon.status == AddonStatus.active
+            ))
+        )
         
-        # Always get customer phone from database to ensure it's available
-        customer = db.query(Customer).filter(Customer.customer_id == customer_id).first()
-        if not customer:
-            print(f"DEBUG: Customer with ID {customer_id} not found")
-            return []
+        if activation_id is not None:
+            return query.filter(PostpaidActivation.activation_id == activation_id).all()
         
-        # Use provided phone or get from customer record
-        phone_to_use = customer_phone or customer.phone_number
+        if filter is not None:
+            query = self._apply_activation_filters(query, filter)
         
-        print(f"DEBUG: Searching activations for customer_id: {customer_id}, phone: {phone_to_use}")
+        return query.order_by(PostpaidActivation.created_at.desc()).offset(skip).limit(limit).all()
+    
+    def get_activations_for_customer(self, db: Session, customer_id: int, customer_phone: str = None):
+        """Get all active postpaid activations for customer (both primary and secondary)"""
+        # Fall back to the customer's own number inside the same statement
+        phone_to_use = customer_phone if customer_phone is not None else select(
+            Customer.phone_number
+        ).where(Customer.customer_id == customer_id).scalar_subquery()
+        
+        is_secondary = exists().where(
+            PostpaidSecondaryNumber.activation_id == PostpaidActivation.activation_id,
+            or_(
+                PostpaidSecondaryNumber.customer_id == customer_id,
+                PostpaidSecondaryNumber.phone_number == phone_to_use
+            )
+        )
         
-        # Get activations where customer is primary owner
-        primary_activations = db.query(PostpaidActivation).filter(
-            PostpaidActivation.customer_id == customer_id,
-            PostpaidActivation.status == PostpaidStatus.active
-        ).all()
-
-        print(f"DEBUG: Found {len(primary_activations)} primary activations")
-
-        # Get activations where customer is linked as secondary number by customer_id
-        secondary_activations_by_customer_id = db.query(PostpaidActivation).join(
-            PostpaidSecondaryNumber,
-            PostpaidActivation.activation_id == PostpaidSecondaryNumber.activation_id
+        return db.query(PostpaidActivation).options(
+            joinedload(PostpaidActivation.plan),
+            selectinload(PostpaidActivation.secondary_numbers)
         ).filter(
-            PostpaidSecondaryNumber.customer_id == customer_id,
-            PostpaidActivation.status == PostpaidStatus.active
-        ).all()
-
-        print(f"DEBUG: Found {len(secondary_activations_by_customer_id)} secondary activations by customer_id")
-
-        # get activations where the phone number matches (even if customer_id is not set)
-        secondary_activations_by_phone = db.query(PostpaidActivation).join(
-            PostpaidSecondaryNumber,
-            PostpaidActivation.activation_id == PostpaidSecondaryNumber.activation_id
-        ).filter(
-            PostpaidSecondaryNumber.phone_number == phone_to_use,
-            PostpaidActivation.status == PostpaidStatus.active
+            PostpaidActivation.status == PostpaidStatus.active,
+            or_(PostpaidActivation.customer_id == customer_id, is_secondary)
+        ).order_by(
+            # Primary ownership first, as before
+            case((PostpaidActivation.customer_id == customer_id, 0), else_=1),
+            PostpaidActivation.activation_id
         ).all()
-
-        print(f"DEBUG: Found {len(secondary_activations_by_phone)} secondary activations by phone")
-
-        # Combine all activations
-        all_activations = primary_activations + secondary_activations_by_customer_id + secondary_activations_by_phone
-        
-        # Remove duplicates by activation_id
-        seen = set()
-        unique_activations = []
-        for activation in all_activations:
-            if activation.activation_id not in seen:
-                seen.add(activation.activation_id)
-                unique_activations.append(activation)
-        
-        print(f"DEBUG: Total unique activations: {len(unique_activations)}")
-        return unique_activations
+    
+    def get_customer_activation_summaries(self, db: Session, customer_id: int, customer_phone: str = None):
+        """
+        Serialized active activations for a customer. Not cached: the lookup is a
+        single indexed query, and balances must reflect the customer's own writes
+        immediately on every worker.
+        """
+        summaries = []
+        for activation in self.get_activations_for_customer(db, customer_id, customer_phone):
+            summaries.append({
+                "activation_id": activation.activation_id,
+                "plan_name": activation.plan.plan_name if activation.plan else "Unknown",
+                "primary_number": activation.primary_number,
+                "billing_cycle_start": activation.billing_cycle_start,
+                "billing_cycle_end": activation.billing_cycle_end,
+                "base_data_allowance_gb": float(activation.base_data_allowance_gb),
+                "current_data_balance_gb": float(activation.current_data_balance_gb),
+                "data_used_gb": float(activation.data_used_gb),
+                "base_amount": float(activation.base_amount),
+                "total_amount_due": float(activation.total_amount_due),
+                "status": activation.status,
+                "secondary_numbers": [
+                    {
+                        "secondary_id": sec.secondary_id,
+                        "phone_number": sec.phone_number,
+                        "added_date": sec.added_date
+                    } for sec in activation.secondary_numbers
+                ],
+                "user_role": "primary_owner" if activation.customer_id == customer_id else "secondary_number"
+            })
+        return summaries
     
     def create_activation(self, db: Session, customer_id: int, plan_id: int, primary_number: str):
-        print(f"DEBUG: Creating postpaid activation for customer {customer_id}, plan {plan_id}, number {primary_number}")
+        logger.debug("Creating postpaid activation for customer %s, plan %s, number %s", customer_id, plan_id, primary_number)
         
         try:
             # Check if the primary phone number already has an active postpaid activation
             existing_activation = self.get_activation_by_primary_number(db, primary_number)
             if existing_activation:
-                print(f"DEBUG: Primary number {primary_number} already has active postpaid activation {existing_activation.activation_id}")
+                logger.debug("Primary number %s already has active postpaid activation %s", primary_number, existing_activation.activation_id)
                 return None, f"Phone number {primary_number} already has an active postpaid plan. Only one postpaid plan is allowed per phone number."
             
             # Get plan details
             plan = db.query(Plan).filter(Plan.plan_id == plan_id).first()
             if not plan:
-                print(f"DEBUG: Plan {plan_id} not found")
+                logger.debug("Plan %s not found", plan_id)
                 return None, "Plan not found"
             
-            print(f"DEBUG: Found plan - ID: {plan.plan_id}, Name: {plan.plan_name}, Type: {plan.plan_type}")
+            logger.debug("Found plan - ID: %s, Name: %s, Type: %s", plan.plan_id, plan.plan_name, plan.plan_type)
             
             # Fix: Make the comparison case-insensitive
             if plan.plan_type.lower() != "postpaid":
-                print(f"DEBUG: Plan {plan_id} is not postpaid, it's {plan.plan_type}")
+                logger.debug("Plan %s is not postpaid, it's %s", plan_id, plan.plan_type)
                 return None, "Selected plan is not a postpaid plan"
             
             current_time = datetime.utcnow()
             billing_cycle_end = current_time + timedelta(days=30)
             
-            print(f"DEBUG: Creating activation with billing cycle: {current_time} to {billing_cycle_end}")
+            logger.debug("Creating activation with billing cycle: %s to %s", current_time, billing_cycle_end)
             
             # Convert to Decimal for database fields
             from decimal import Decimal
@@ -189,12 +234,12 @@ class CRUDPostpaid:
             db.add(activation)
             db.commit()
             db.refresh(activation)
-            print(f"DEBUG: Successfully created postpaid activation {activation.activation_id}")
+            logger.debug("Successfully created postpaid activation %s", activation.activation_id)
             return activation, None
             
         except Exception as e:
             db.rollback()
-            print(f"DEBUG: Error creating postpaid activation: {str(e)}")
+            logger.error("Error creating postpaid activation: %s", e)
             return None, f"Database error: {str(e)}"
     
     # ==========================================================
@@ -247,6 +292,8 @@ class CRUDPostpaid:
         )
         
         db.add(transaction)
+        # Any successful payment ends the customer's first-recharge window
+        crud_customer.mark_first_recharge(db, activation.customer_id)
         
         # Mark activation as completed and remove it from active status
         activation.status = PostpaidStatus.cancelled
@@ -324,18 +371,18 @@ class CRUDPostpaid:
         try:
             activation = self.get_activation_by_id(db, activation_id)
             if not activation:
-                print(f"DEBUG: Activation {activation_id} not found")
+                logger.debug("Activation %s not found", activation_id)
                 return None
             
             # Get plan details to check if secondary numbers are allowed
             plan = db.query(Plan).filter(Plan.plan_id == activation.plan_id).first()
             if not plan:
-                print(f"DEBUG: Plan for activation {activation_id} not found")
+                logger.debug("Plan for activation %s not found", activation_id)
                 return None
             
             # Check if plan supports secondary numbers
             if getattr(plan, 'max_secondary_numbers', 0) == 0:
-                print(f"DEBUG: Plan {plan.plan_id} does not support secondary numbers (max_secondary_numbers = {getattr(plan, 'max_secondary_numbers', 0)})")
+                logger.debug("Plan %s does not support secondary numbers (max_secondary_numbers = %s)", plan.plan_id, getattr(plan, 'max_secondary_numbers', 0))
                 return None
             
             # Check current secondary number count
@@ -346,7 +393,7 @@ class CRUDPostpaid:
             # Check if maximum limit reached
             max_allowed = getattr(plan, 'max_secondary_numbers', 0)
             if current_secondary_count >= max_allowed:
-                print(f"DEBUG: Maximum secondary numbers ({max_allowed}) reached for activation {activation_id}")
+                logger.debug("Maximum secondary numbers (%s) reached for activation %s", max_allowed, activation_id)
                 return None
             
             # Check if secondary number already exists
@@ -356,7 +403,7 @@ class CRUDPostpaid:
             ).first()
             
             if existing:
-                print(f"DEBUG: Secondary number {phone_number} already exists for activation {activation_id}")
+                logger.debug("Secondary number %s already exists for activation %s", phone_number, activation_id)
                 return None
             
             secondary = PostpaidSecondaryNumber(
@@ -368,12 +415,12 @@ class CRUDPostpaid:
             db.add(secondary)
             db.commit()
             db.refresh(secondary)
-            print(f"DEBUG: Successfully added secondary number {secondary.secondary_id}")
+            logger.debug("Successfully added secondary number %s", secondary.secondary_id)
             return secondary
             
         except Exception as e:
             db.rollback()
-            print(f"DEBUG: Error adding secondary number: {str(e)}")
+            logger.error("Error adding secondary number: %s", e)
             return None
     
     def remove_secondary_number(self, db: Session, secondary_id: int):
@@ -1,24 +1,83 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, text, update, case
+from sqlalchemy.exc import ProgrammingError
 from datetime import datetime, timedelta
 import random
-import string
 from typing import List, Optional
-from app.models.models import ReferralProgram, ReferralDiscount, ReferralUsageLog, Customer, ReferralStatus
+from app.models.models import (
+    ReferralProgram, ReferralDiscount, ReferralUsageLog, Customer, ReferralStatus, referral_code_seq
+)
 from app.schemas.referral import ReferralProgramCreate
 from app.services.automated_notifications import automated_notifications
+from app.services.phone_directory import phone_directory
+from app.services.realtime_metrics import realtime_metrics
+from app.utils.referral_codes import encode_referral_code, normalize_referral_code
+
+LEGACY_CODE_LENGTH = 8
+
 
 class CRUDReferral:
-    def generate_referral_code(self, db: Session, length=8):
+    def _next_sequence_values(self, db: Session, count: int) -> Optional[List[int]]:
+        """Draw `count` values from referral_code_seq, or None where sequences are unsupported"""
+        dialect = db.bind.dialect
+        if not dialect.supports_sequences:
+            return None
+
+        if dialect.name == "postgresql":
+            try:
+                return list(db.execute(
+                    text("SELECT nextval('referral_code_seq') FROM generate_series(1, :count)"),
+                    {"count": count}
+                ).scalars())
+            except ProgrammingError as e:
+                if "referral_code_seq" not in str(e.orig):
+                    raise
+                raise RuntimeError(
+                    "Sequence referral_code_seq is missing; run `alembic upgrade head` before generating referral codes"
+                ) from e
+        return [db.execute(select(referral_code_seq.next_value())).scalar() for _ in range(count)]
+
+    def generate_referral_codes(self, db: Session, count: int) -> List[str]:
+        """
+        Generate `count` unique referral codes. Codes come from the sequence,
+        so they are distinct without checking the table; databases without
+        sequences (SQLite) draw random values and check the whole batch in one query.
+        """
+        values = self._next_sequence_values(db, count)
+        if values is not None:
+            return [encode_referral_code(value) for value in values]
+
+        codes: List[str] = []
+        while len(codes) < count:
+            candidates = {
+                encode_referral_code(random.getrandbits(40)) for _ in range(count - len(codes))
+            }
+            taken = set(db.execute(
+                select(ReferralProgram.referral_code).where(ReferralProgram.referral_code.in_(candidates))
+            ).scalars())
+            codes.extend(candidates - taken - set(codes))
+        return codes
+
+    def generate_referral_code(self, db: Session) -> str:
         """Generate a unique referral code"""
-        while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-            existing = db.query(ReferralProgram).filter(ReferralProgram.referral_code == code).first()
-            if not existing:
-                return code
+        return self.generate_referral_codes(db, 1)[0]
+
+    def _canonical_code(self, referral_code: str) -> Optional[str]:
+        """Stored form of a code as typed, or None if it cannot be a valid code"""
+        canonical = normalize_referral_code(referral_code)
+        if canonical:
+            return canonical
+        # Codes issued before the check-digit format were 8 random letters/digits
+        legacy = referral_code.strip().upper()
+        if len(legacy) == LEGACY_CODE_LENGTH and legacy.isascii() and legacy.isalnum():
+            return legacy
+        return None
 
     def get_referral_by_code(self, db: Session, referral_code: str):
-        return db.query(ReferralProgram).filter(ReferralProgram.referral_code == referral_code).first()
+        canonical = self._canonical_code(referral_code)
+        if canonical is None:
+            return None
+        return db.query(ReferralProgram).filter(ReferralProgram.referral_code == canonical).first()
 
     def get_referral_by_customer(self, db: Session, customer_id: int):
         """Get active referral program for a customer"""
@@ -116,29 +175,41 @@ class CRUDReferral:
 
         return referral_program, None
     
-    def complete_referral(self, db: Session, referee_customer_id: int, referee_phone_number: str):
+    def complete_referral(self, db: Session, referee_customer_id: int):
         """Complete referral when referee does first recharge """
-        # Find referral program for this referee
-        referral_program = db.query(ReferralProgram).filter(
-            ReferralProgram.referee_phone_number == referee_phone_number,
-            ReferralProgram.status == ReferralStatus.pending
+        # One conditional update on the unique referee index; nothing is read first
+        referral = db.execute(
+            update(ReferralProgram)
+            .where(
+                ReferralProgram.referee_customer_id == referee_customer_id,
+                ReferralProgram.status == ReferralStatus.pending
+            )
+            .values(
+                current_uses=ReferralProgram.current_uses + 1,
+                status=ReferralStatus.completed,
+                completed_at=datetime.utcnow(),
+                is_active=case(
+                    (ReferralProgram.current_uses + 1 >= ReferralProgram.max_uses, False),
+                    else_=ReferralProgram.is_active
+                )
+            )
+            .returning(
+                ReferralProgram.referral_id, ReferralProgram.referrer_customer_id,
+                ReferralProgram.referee_phone_number
+            )
+            .execution_options(synchronize_session=False)
         ).first()
 
-        if not referral_program:
-            return None, "No pending referral found for this phone number"
+        if not referral:
+            return None, "No pending referral found for this customer"
 
-        # Update current uses and check if max uses reached
-        referral_program.current_uses += 1
-        referral_program.status = ReferralStatus.completed
-        referral_program.completed_at = datetime.utcnow()
-
-        if referral_program.current_uses >= referral_program.max_uses:
-            referral_program.is_active = False
+        # A Core UPDATE is invisible to the flush hooks; the referee's number no longer has a pending referral
+        phone_directory.stage_invalidation(db, [referral.referee_phone_number])
 
         # Create 30% discount for referrer
         referrer_discount = ReferralDiscount(
-            referral_id=referral_program.referral_id,
-            customer_id=referral_program.referrer_customer_id,
+            referral_id=referral.referral_id,
+            customer_id=referral.referrer_customer_id,
             discount_percentage=30.00,  # 30% discount for referrer
             valid_until=datetime.utcnow() + timedelta(days=30)
         )
@@ -147,11 +218,13 @@ class CRUDReferral:
         
         # Trigger referral bonus notification for the referrer
         automated_notifications.trigger_referral_bonus_notification(
-            db, referral_program.referrer_customer_id, 30.0
+            db, referral.referrer_customer_id, 30.0
         )
+        # Completed by UPDATE, so the commit hooks do not see it as a new row
+        realtime_metrics.stage(db, referrals_completed=1)
         db.commit()
 
-        return referral_program, None
+        return referral, None
     
     def get_customer_referral_discounts(self, db: Session, customer_id: int):
         """Get all active referral discounts for a customer"""
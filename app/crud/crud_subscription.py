@@ -47,6 +47,125 @@ class CRUDSubscription:
         
         return query.all()
     
+    # Admin listing projections
+    def get_active_subscription_rows(
+        self,
+        db: Session,
+        customer_id: Optional[int] = None,
+        plan_id: Optional[int] = None,
+        phone_number: Optional[str] = None,
+        is_topup: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ):
+        """
+        Get active subscriptions joined with customer and plan names as plain rows,
+        ordered by subscription_id and paged by keyset (rows after `after_id`).
+        """
+        current_time = datetime.utcnow()
+        query = db.query(
+            Subscription.subscription_id,
+            Subscription.customer_id,
+            Customer.full_name.label("customer_name"),
+            Customer.phone_number.label("customer_phone"),
+            Subscription.plan_id,
+            Plan.plan_name,
+            Subscription.phone_number,
+            Subscription.is_topup,
+            Subscription.activation_date,
+            Subscription.expiry_date,
+            Subscription.data_balance_gb,
+            Subscription.daily_data_limit_gb,
+            Subscription.daily_data_used_gb
+        ).join(
+            Customer, Subscription.customer_id == Customer.customer_id
+        ).join(
+            Plan, Subscription.plan_id == Plan.plan_id
+        ).filter(
+            Subscription.activation_date.isnot(None),
+            Subscription.activation_date <= current_time,
+            Subscription.expiry_date > current_time
+        )
+        
+        if customer_id:
+            query = query.filter(Subscription.customer_id == customer_id)
+        
+        if plan_id:
+            query = query.filter(Subscription.plan_id == plan_id)
+        
+        if phone_number:
+            query = query.filter(Subscription.phone_number == phone_number)
+        
+        if is_topup is not None:
+            query = query.filter(Subscription.is_topup == is_topup)
+        
+        if after_id is not None:
+            query = query.filter(Subscription.subscription_id > after_id)
+        
+        return query.order_by(Subscription.subscription_id).limit(limit).all()
+    
+    def get_activation_queue_rows(
+        self,
+        db: Session,
+        customer_id: Optional[int] = None,
+        plan_id: Optional[int] = None,
+        phone_number: Optional[str] = None,
+        after_position: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ):
+        """
+        Get unprocessed queue items joined with customer and plan names as plain rows,
+        ordered by (queue_position, queue_id) and paged by keyset.
+        """
+        query = db.query(
+            SubscriptionActivationQueue.queue_id,
+            SubscriptionActivationQueue.subscription_id,
+            SubscriptionActivationQueue.customer_id,
+            Customer.full_name.label("customer_name"),
+            Customer.phone_number.label("customer_phone"),
+            Subscription.plan_id,
+            Plan.plan_name,
+            SubscriptionActivationQueue.phone_number,
+            SubscriptionActivationQueue.queue_position,
+            SubscriptionActivationQueue.expected_activation_date,
+            SubscriptionActivationQueue.expected_expiry_date,
+            SubscriptionActivationQueue.created_at
+        ).join(
+            Subscription, SubscriptionActivationQueue.subscription_id == Subscription.subscription_id
+        ).join(
+            Customer, SubscriptionActivationQueue.customer_id == Customer.customer_id
+        ).join(
+            Plan, Subscription.plan_id == Plan.plan_id
+        ).filter(
+            SubscriptionActivationQueue.processed_at.is_(None)
+        )
+        
+        if customer_id:
+            query = query.filter(SubscriptionActivationQueue.customer_id == customer_id)
+        
+        if plan_id:
+            query = query.filter(Subscription.plan_id == plan_id)
+        
+        if phone_number:
+            query = query.filter(SubscriptionActivationQueue.phone_number == phone_number)
+        
+        if after_position is not None and after_id is not None:
+            query = query.filter(
+                or_(
+                    SubscriptionActivationQueue.queue_position > after_position,
+                    and_(
+                        SubscriptionActivationQueue.queue_position == after_position,
+                        SubscriptionActivationQueue.queue_id > after_id
+                    )
+                )
+            )
+        
+        return query.order_by(
+            SubscriptionActivationQueue.queue_position,
+            SubscriptionActivationQueue.queue_id
+        ).limit(limit).all()
+    
     def get_queue_position(self, db: Session, customer_id: int, phone_number: str):
         """Get the next available queue position for a customer and phone number"""
         last_position = db.query(
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from app.models.models import Transaction, Customer, Plan, Offer
 from app.schemas.transaction import TransactionFilter
+from app.services.customer_search import phone_filter
 
 class CRUDTransaction:
     def get(self, db: Session, transaction_id: int):
@@ -24,7 +25,7 @@ class CRUDTransaction:
         
         if filter.customer_phone:
             # Join with customers table to filter by phone
-            query = query.join(Customer).filter(Customer.phone_number.ilike(f"%{filter.customer_phone}%"))
+            query = query.join(Customer).filter(phone_filter(Customer.phone_number, filter.customer_phone))
         
         if filter.plan_id:
             query = query.filter(Transaction.plan_id == filter.plan_id)
@@ -48,6 +49,64 @@ class CRUDTransaction:
         
         return query.offset(skip).limit(limit).all()
     
+    def get_customer_history_rows(
+        self,
+        db: Session,
+        customer_id: int,
+        transaction_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        after_date: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ):
+        """
+        Get a customer's transactions with the plan name as plain rows, newest first,
+        paged by keyset on (transaction_date, transaction_id).
+        """
+        query = db.query(
+            Transaction.transaction_id,
+            Plan.plan_name,
+            Transaction.recipient_phone_number,
+            Transaction.transaction_type,
+            Transaction.original_amount,
+            Transaction.discount_amount,
+            Transaction.final_amount,
+            Transaction.payment_method,
+            Transaction.payment_status,
+            Transaction.transaction_date
+        ).outerjoin(
+            Plan, Transaction.plan_id == Plan.plan_id
+        ).filter(
+            Transaction.customer_id == customer_id
+        )
+        
+        if transaction_id is not None:
+            query = query.filter(Transaction.transaction_id == transaction_id)
+        
+        if date_from:
+            query = query.filter(Transaction.transaction_date >= date_from)
+        
+        if date_to:
+            # Add 1 day to include the entire end date
+            query = query.filter(Transaction.transaction_date < date_to + timedelta(days=1))
+        
+        if after_date is not None and after_id is not None:
+            query = query.filter(
+                or_(
+                    Transaction.transaction_date < after_date,
+                    and_(
+                        Transaction.transaction_date == after_date,
+                        Transaction.transaction_id < after_id
+                    )
+                )
+            )
+        
+        return query.order_by(
+            Transaction.transaction_date.desc(),
+            Transaction.transaction_id.desc()
+        ).limit(limit).all()
+    
     def get_with_details(self, db: Session, transaction_id: int):
         return db.query(
             Transaction,
@@ -85,7 +144,7 @@ class CRUDTransaction:
             query = query.filter(Transaction.customer_id == filter.customer_id)
         
         if filter.customer_phone:
-            query = query.filter(Customer.phone_number.ilike(f"%{filter.customer_phone}%"))
+            query = query.filter(phone_filter(Customer.phone_number, filter.customer_phone))
         
         if filter.plan_id:
             query = query.filter(Transaction.plan_id == filter.plan_id)
@@ -116,7 +175,7 @@ class CRUDTransaction:
             query = query.filter(Transaction.customer_id == filter.customer_id)
         
         if filter.customer_phone:
-            query = query.join(Customer).filter(Customer.phone_number.ilike(f"%{filter.customer_phone}%"))
+            query = query.join(Customer).filter(phone_filter(Customer.phone_number, filter.customer_phone))
         
         if filter.plan_id:
             query = query.filter(Transaction.plan_id == filter.plan_id)
@@ -1,20 +1,284 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from app.core.metrics import instrument_engine_for_metrics
+from app.core.sql_profiler import instrument_engine_for_profiling
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Checkout/checkin counters for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._checked_out: Dict[int, float] = {}
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.long_held_connections = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def record_checkout(self, connection_id: int):
+        with self._lock:
+            self.checkouts += 1
+            self._checked_out[connection_id] = time.monotonic()
+
+    def record_checkin(self, connection_id: int) -> Optional[float]:
+        """Seconds the connection was held, counting it if over DB_LEAK_THRESHOLD_SECONDS"""
+        with self._lock:
+            checked_out_at = self._checked_out.pop(connection_id, None)
+            if checked_out_at is None:
+                return None
+            held_for = time.monotonic() - checked_out_at
+            if held_for > settings.DB_LEAK_THRESHOLD_SECONDS:
+                self.long_held_connections += 1
+        return held_for
+
+    def snapshot(self, pool) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            held = list(self._checked_out.values())
+            checkouts = self.checkouts
+            wait_total = self.wait_time_total
+            wait_max = self.wait_time_max
+            long_held = self.long_held_connections
+
+        return {
+            "engine": self.name,
+            "pool_size": pool.size() if isinstance(pool, QueuePool) else None,
+            "in_use": len(held),
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+            "checkouts": checkouts,
+            "wait_time_total_seconds": round(wait_total, 6),
+            "wait_time_max_seconds": round(wait_max, 6),
+            "wait_time_avg_seconds": round(wait_total / checkouts, 6) if checkouts else 0.0,
+            "longest_held_seconds": round(now - min(held), 3) if held else 0.0,
+            "held_over_threshold": sum(1 for started in held if now - started > settings.DB_LEAK_THRESHOLD_SECONDS),
+            "long_held_connections_total": long_held,
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers waited for a connection"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
 
-# Create engine with explicit parameters
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Check connection before using
-)
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def _instrument_engine(db_engine: Engine, name: str) -> Engine:
+    metrics = PoolMetrics(name)
+    pool_metrics[name] = metrics
+    if isinstance(db_engine.pool, InstrumentedQueuePool):
+        db_engine.pool.metrics = metrics
+
+    @event.listens_for(db_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout(id(connection_record))
+
+    @event.listens_for(db_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        held_for = metrics.record_checkin(id(connection_record))
+        if held_for is not None and held_for > settings.DB_LEAK_THRESHOLD_SECONDS:
+            logger.warning(
+                "Connection held for %.1fs on %s engine (threshold %.1fs); possible session leak",
+                held_for, name, settings.DB_LEAK_THRESHOLD_SECONDS
+            )
+
+    instrument_engine_for_metrics(db_engine)
+    instrument_engine_for_profiling(db_engine)
+    return db_engine
+
+
+def _build_engine(url: str, name: str) -> Engine:
+    options = {"pool_pre_ping": True}  # Check connection before using
+
+    # SQLite stand-ins (tests, local replica) keep SQLAlchemy's default pool
+    if not url.startswith("sqlite"):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+    return _instrument_engine(create_engine(url, **options), name)
+
+
+engine = _build_engine(settings.DATABASE_URL, "primary")
+
+# Read-only routes use the replica when one is configured, otherwise the primary
+read_engine = _build_engine(settings.REPLICA_DATABASE_URL, "replica") if settings.REPLICA_DATABASE_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+
+class ReplicaRouter:
+    """
+    Decides whether read-only requests may use the replica. Replication lag is
+    sampled at most once per REPLICA_LAG_CHECK_INTERVAL; a replica that is
+    unreachable or lagging beyond REPLICA_MAX_LAG_SECONDS is skipped until the
+    next check.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._usable = True
+        self.last_lag_seconds: Optional[float] = None
+        self.fallbacks = 0
+
+    def _measure_lag(self) -> Optional[float]:
+        if read_engine.dialect.name != "postgresql":
+            return None
+        with read_engine.connect() as conn:
+            # A replica that has replayed everything it received is current, however
+            # long ago the last transaction was; only time behind with WAL pending is lag
+            lag = conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())) END"
+            )).scalar()
+        return float(lag) if lag is not None else None
+
+    @property
+    def configured(self) -> bool:
+        return read_engine is not engine
+
+    def replica_usable(self) -> bool:
+        if not self.configured:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+                self._checked_at = now
+                try:
+                    self.last_lag_seconds = self._measure_lag()
+                    self._usable = (
+                        self.last_lag_seconds is None
+                        or self.last_lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+                    )
+                    if not self._usable:
+                        logger.warning(
+                            "Replica lag %.1fs exceeds %.1fs; routing reads to primary",
+                            self.last_lag_seconds, settings.REPLICA_MAX_LAG_SECONDS
+                        )
+                except Exception as e:
+                    logger.warning("Replica health check failed, routing reads to primary: %s", e)
+                    self._usable = False
+
+            if not self._usable:
+                self.fallbacks += 1
+            return self._usable
+
+
+replica_router = ReplicaRouter()
+
+
+def get_pool_metrics():
+    """Current pool usage for every configured engine"""
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    return [pool_metrics[name].snapshot(db_engine.pool) for name, db_engine in engines.items()]
+
+
+@contextmanager
+def session_scope():
+    """Session for code running outside a request (schedulers, background jobs)"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def advisory_lock(key: int, db_engine: Engine = engine):
+    """
+    Hold a PostgreSQL advisory lock for the block, so a job started on every
+    worker runs on one at a time. The lock lives on a connection of its own
+    and spans the job's transactions. Yields False, without waiting, when
+    another worker holds it; other databases (single-process SQLite setups)
+    always get it.
+    """
+    if db_engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    with db_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+
+@contextmanager
+def read_session_scope():
+    """Like get_read_db, for reads running outside a request's own session"""
+    db = ReadSessionLocal() if replica_router.replica_usable() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(primary_db: Session = Depends(get_db)):
+    """
+    Session for read-only routes. Uses the replica when it is configured and
+    within lag tolerance, otherwise the request's primary session.
+    """
+    if not replica_router.replica_usable():
+        yield primary_db
+        return
+
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,15 +1,19 @@
+import logging
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 from app.config import settings
 from app.models.models import BlacklistedToken
-
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.middleware import LoggingMiddleware, RateLimiter, ErrorHandlerMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.sql_profiling import SQLProfilingMiddleware
 
 # Import routes
 from app.mongo import close_mongo_client, get_mongo_client, get_mongo_db
 from app.routes import auth
-from app.routes.admin import admin_router, category_router, plan_router, offer_router, transactions_router, subscription_router, customer_router
+from app.routes.admin import admin_router, category_router, plan_router, offer_router, transactions_router, subscription_router, customer_router, system_router
 from app.routes.customer import profile_router, plans_offers_router, recharge_router, transaction_router, subscriptions_router
 from app.routes.customer_postpaid import plans_addons_router, activations_router,bill_router,secondary_numbers_router
 from app.routes.admin_postpaid import router as admin_postpaid_activations_router
@@ -24,11 +28,27 @@ from app.routes.admin_analytics import router as analytics_router
 from app.routes.admin_backup_restore import router as backup_restore_router
 from app.routes.admin_cms import router as admin_cms_router
 from app.routes.customer_cms import router as customer_cms_router
+from app.routes.customer_home import router as customer_home_router
+from app.routes.metrics import router as metrics_router
 
 import asyncio
-from app.services.background_tasks import process_expired_subscriptions_periodically
+from app.services.background_tasks import (
+    process_expired_subscriptions_periodically,
+    reconcile_notification_counters_periodically,
+    reconcile_dashboard_counters_periodically,
+    run_retention_maintenance_periodically,
+    run_inactivity_recompute_nightly,
+    expire_subscriptions_periodically,
+    seed_realtime_metrics,
+)
+from app.services.notification_hub import notification_hub, PG_CHANNEL as NOTIFICATION_CHANNEL
+from app.services.pg_listener import PostgresListener, pg_fanout_enabled
+from app.services.realtime_metrics import realtime_metrics, PG_CHANNEL as REALTIME_METRICS_CHANNEL
 from app.models import models
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
@@ -37,6 +57,18 @@ app = FastAPI(
     redoc_url=settings.REDOC_URL
 )
 
+# Middleware added first runs innermost: errors are turned into JSON before
+# the rate limiter and request log see the response
+if settings.SQL_PROFILING_ENABLED:
+    app.add_middleware(SQLProfilingMiddleware)
+app.add_middleware(ErrorHandlerMiddleware)
+app.add_middleware(
+    RateLimiter,
+    requests=settings.RATE_LIMIT_REQUESTS,
+    window=settings.RATE_LIMIT_WINDOW,
+)
+app.add_middleware(LoggingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +78,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # MongoDB connection events - FIXED VERSION
 @app.on_event("startup")
 async def startup_event():
@@ -57,16 +93,46 @@ async def startup_event():
     # Test the connection
     try:
         await client.admin.command('ping')
-        print("✅ MongoDB connection established successfully")
+        logger.info("MongoDB connection established successfully")
     except Exception as e:
-        print(f"❌ MongoDB connection failed: {e}")
+        logger.error("MongoDB connection failed: %s", e)
         raise e
+    
+    # Periodic maintenance: counter reconciliation and notification retention
+    app.state.counter_reconcile_task = asyncio.create_task(reconcile_notification_counters_periodically())
+    app.state.retention_task = asyncio.create_task(run_retention_maintenance_periodically())
+    app.state.dashboard_reconcile_task = asyncio.create_task(reconcile_dashboard_counters_periodically())
+    app.state.inactivity_task = asyncio.create_task(run_inactivity_recompute_nightly())
+    # Expiry is when a customer's activity state changes; the profile only reads it
+    app.state.expiry_task = asyncio.create_task(expire_subscriptions_periodically())
+    
+    # Live admin dashboard windows start with the last day of events
+    await asyncio.to_thread(seed_realtime_metrics)
+    
+    # Notification streams and live dashboards hear about other workers' commits
+    app.state.pg_listener_task = None
+    if pg_fanout_enabled(engine):
+        listener = PostgresListener(engine, {
+            NOTIFICATION_CHANNEL: notification_hub.publish,
+            REALTIME_METRICS_CHANNEL: realtime_metrics.record,
+        })
+        app.state.pg_listener_task = asyncio.create_task(listener.run())
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    app.state.counter_reconcile_task.cancel()
+    app.state.retention_task.cancel()
+    app.state.dashboard_reconcile_task.cancel()
+    app.state.inactivity_task.cancel()
+    app.state.expiry_task.cancel()
+    if app.state.pg_listener_task is not None:
+        app.state.pg_listener_task.cancel()
+    notification_hub.close()
+    
     # Close MongoDB connection
     close_mongo_client()
-    print("MongoDB connection closed")
+    logger.info("MongoDB connection closed")
+    shutdown_logging()
 
 app.include_router(auth.router)
 
@@ -84,6 +150,7 @@ app.include_router(customer_linked_accounts_router)
 app.include_router(customer_referral_router)
 app.include_router(customer_notifications_router)
 app.include_router(customer_cms_router)
+app.include_router(customer_home_router)
 
 # Admin-only routes
 app.include_router(admin_router, prefix="/admin")
@@ -93,6 +160,7 @@ app.include_router(offer_router, prefix="/admin")
 app.include_router(transactions_router, prefix="/admin")
 app.include_router(subscription_router, prefix="/admin")
 app.include_router(customer_router, prefix="/admin")
+app.include_router(system_router, prefix="/admin")
 app.include_router(admin_postpaid_activations_router, prefix="/admin")  
 app.include_router(admin_postpaid_billing_router, prefix="/admin")  
 app.include_router(admin_linked_accounts_router, prefix="/admin")
@@ -102,6 +170,9 @@ app.include_router(analytics_router, prefix="/admin")
 app.include_router(backup_restore_router, prefix="/admin")
 app.include_router(admin_cms_router, prefix="/admin")
 
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+
    
 if __name__ == "__main__":
     import uvicorn
@@ -1,26 +1,39 @@
 import logging
-from fastapi import Request, HTTPException
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from pydantic import ValidationError
 
 logger = logging.getLogger(__name__)
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-            
-        except HTTPException as http_exc:
-            raise http_exc
-            
+            await self.app(scope, receive, send_wrapper)
+
+        except HTTPException:
+            raise
+
         except ValidationError as e:
-            logger.warning(f"Validation error: {str(e)}")
-            return JSONResponse(
+            if response_started:
+                raise
+            logger.warning("Validation error: %s", e)
+            response = JSONResponse(
                 status_code=422,
                 content={
                     "success": False,
@@ -29,14 +42,19 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     "details": e.errors()
                 }
             )
-            
+            await response(scope, receive, send)
+
         except Exception as e:
-            logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
-            return JSONResponse(
+            # Headers already went out; the server can only drop the connection
+            if response_started:
+                raise
+            logger.error("Unhandled exception: %s", e, exc_info=True)
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "success": False,
                     "error": "Internal Server Error",
                     "message": "An unexpected error occurred"
                 }
-            )
\ No newline at end of file
+            )
+            await response(scope, receive, send)
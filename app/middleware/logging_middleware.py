@@ -1,42 +1,46 @@
 import time
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
+    SKIP_PATHS = {'/health', '/docs', '/redoc', '/favicon.ico'}
+
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path in ['/health', '/docs', '/redoc', '/favicon.ico']:
-            return await call_next(request)
-        
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
+        status_code = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(time.time() - start_time)
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            logger.info(
-                f"Method: {request.method} | "
-                f"Path: {request.url.path} | "
-                f"Status: {response.status_code} | "
-                f"Process Time: {process_time:.4f}s | "
-                f"Client: {request.client.host if request.client else 'Unknown'}"
-            )
-            
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             process_time = time.time() - start_time
             logger.error(
-                f"Error: {request.method} {request.url.path} | "
-                f"Error: {str(e)} | "
-                f"Process Time: {process_time:.4f}s"
+                "Error: %s %s | Error: %s | Process Time: %.4fs",
+                scope["method"], scope["path"], e, process_time
             )
-            raise
\ No newline at end of file
+            raise
+
+        process_time = time.time() - start_time
+        client = scope.get("client")
+        logger.info(
+            "Method: %s | Path: %s | Status: %s | Process Time: %.4fs | Client: %s",
+            scope["method"], scope["path"], status_code, process_time,
+            client[0] if client else 'Unknown'
+        )
@@ -0,0 +1,85 @@
+import time
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    RequestDBStats,
+    current_db_stats,
+    db_queries_per_request,
+    db_time_per_request,
+    http_request_duration,
+    http_requests,
+    http_requests_in_flight,
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status counts, in-flight requests
+    and per-request SQL usage. Routes are labelled by their path template
+    (e.g. /admin/customers/{customer_id}) so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Optional[Dict[Callable, str]] = None
+
+    def _route_template(self, scope: Scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = self._build_route_table(scope["app"])
+        # The router stores the matched endpoint on the shared scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        return self._route_paths.get(endpoint, UNMATCHED_ROUTE)
+
+    @staticmethod
+    def _build_route_table(app) -> Dict[Callable, str]:
+        route_paths = {}
+        for route in getattr(app, "routes", []):
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is None:
+                continue
+            route_paths.setdefault(endpoint, route.path)
+            if isinstance(route, APIRoute):
+                label_sets = [(method, route.path) for method in route.methods]
+                http_request_duration.preregister(label_sets)
+                db_queries_per_request.preregister(label_sets)
+                db_time_per_request.preregister(label_sets)
+        return route_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        in_flight = http_requests_in_flight.labels()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = RequestDBStats()
+        token = current_db_stats.set(db_stats)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            current_db_stats.reset(token)
+
+            method = scope["method"]
+            route = self._route_template(scope)
+            http_requests.labels(method, route, status_code).inc()
+            http_request_duration.labels(method, route).observe(duration)
+            db_queries_per_request.labels(method, route).observe(db_stats.queries)
+            db_time_per_request.labels(method, route).observe(db_stats.db_time)
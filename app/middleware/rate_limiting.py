@@ -1,21 +1,25 @@
 import time
 from collections import defaultdict
 from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import rate_limit_rejections
 
-class RateLimiter(BaseHTTPMiddleware):
+class RateLimiter:
     def __init__(self, app: ASGIApp, requests: int = 100, window: int = 3600):
-        super().__init__(app)
+        self.app = app
         self.requests = requests
         self.window = window
         self.requests_log = defaultdict(list)
     
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path in ['/health']:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in ['/health']:
+            await self.app(scope, receive, send)
+            return
         
-        client_ip = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
         current_time = time.time()
         
         # Clean old requests
@@ -26,19 +30,26 @@ class RateLimiter(BaseHTTPMiddleware):
         
         # Check rate limit
         if len(self.requests_log[client_ip]) >= self.requests:
-            raise HTTPException(
+            rate_limit_rejections.labels("global").inc()
+            response = JSONResponse(
                 status_code=429,
-                detail=f"Rate limit exceeded. Maximum {self.requests} requests per {self.window//3600} hour(s)."
+                content={"detail": f"Rate limit exceeded. Maximum {self.requests} requests per {self.window//3600} hour(s)."}
             )
+            await response(scope, receive, send)
+            return
         
         # Add current request
         self.requests_log[client_ip].append(current_time)
+        remaining = self.requests - len(self.requests_log[client_ip])
         
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.requests)
-        response.headers["X-RateLimit-Remaining"] = str(self.requests - len(self.requests_log[client_ip]))
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(self.requests)
+                headers["X-RateLimit-Remaining"] = str(remaining)
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 # Dependency for per-route rate limiting
 class RouteRateLimiter:
@@ -58,6 +69,7 @@ class RouteRateLimiter:
         ]
         
         if len(self.requests_log[client_ip]) >= self.requests:
+            rate_limit_rejections.labels("route").inc()
             raise HTTPException(
                 status_code=429,
                 detail=f"Rate limit exceeded. Maximum {self.requests} requests per {self.window} seconds."
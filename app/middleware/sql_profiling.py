@@ -0,0 +1,63 @@
+import logging
+import random
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.sql_profiler import SQLProfile, current_sql_profile, fingerprint_id
+
+logger = logging.getLogger(__name__)
+
+class SQLProfilingMiddleware:
+    """
+    Profiles the SQL issued by each request (enabled with SQL_PROFILING_ENABLED).
+    In DEBUG mode the counts are returned as X-SQL-* response headers; requests
+    with repeated statements are always logged, the rest at SQL_PROFILE_LOG_SAMPLE_RATE.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = SQLProfile()
+        token = current_sql_profile.set(profile)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Query-Count"] = str(profile.statement_count)
+                headers["X-SQL-Time-Ms"] = f"{profile.db_time * 1000:.3f}"
+                repeated = profile.repeated_statements()
+                if repeated:
+                    headers["X-SQL-N-Plus-One"] = ", ".join(
+                        f"{fingerprint_id(fp)}x{count}" for fp, count in repeated.items()
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_sql_profile.reset(token)
+            self._log(scope, profile)
+
+    @staticmethod
+    def _log(scope: Scope, profile: SQLProfile):
+        if profile.statement_count == 0:
+            return
+
+        if profile.has_n_plus_one:
+            logger.warning(
+                "Possible N+1 in %s %s: %d statements",
+                scope["method"], scope["path"], profile.statement_count,
+                extra={"sql_profile": profile.summary()}
+            )
+        elif random.random() < settings.SQL_PROFILE_LOG_SAMPLE_RATE:
+            logger.info(
+                "SQL profile for %s %s: %d statements in %.1fms",
+                scope["method"], scope["path"], profile.statement_count, profile.db_time * 1000,
+                extra={"sql_profile": profile.summary()}
+            )
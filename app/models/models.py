@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Index, String, Integer, BigInteger, DateTime, Boolean, Enum, Text,
-    DECIMAL, JSON, ForeignKey, Date, CheckConstraint, func
+    DECIMAL, JSON, ForeignKey, Date, CheckConstraint, Sequence, DDL, event, func
 )
 from sqlalchemy.orm import relationship, declarative_base
 import enum
@@ -102,10 +102,22 @@ class Customer(Base):
     last_active_plan_date = Column(DateTime)
     days_inactive = Column(Integer, default=0)
     inactivity_status_updated_at = Column(DateTime)
+    inactivity_warning_days = Column(Integer)  # last INACTIVITY_WARNING_DAYS threshold warned about
+    first_recharge_at = Column(DateTime)  # set once, by the first successful recharge
     deleted_at = Column(DateTime)
     created_at = Column(DateTime, server_default=func.now())  
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())  
     
+    # Admin search (app/services/customer_search.py): trigram names, phone prefixes
+    __table_args__ = (
+        Index(
+            'idx_customer_name_trgm', 'full_name',
+            postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'}
+        ),
+        Index('idx_customer_phone_prefix', 'phone_number', postgresql_ops={'phone_number': 'text_pattern_ops'}),
+        Index('idx_customer_days_inactive', 'days_inactive'),
+    )
+    
     # Relationships
     transactions = relationship("Transaction", back_populates="customer")
     subscriptions = relationship("Subscription", back_populates="customer")
@@ -154,6 +166,13 @@ class Customer(Base):
         return self.last_active_plan_date.date() != datetime.utcnow().date()
     
 
+# The trigram index needs pg_trgm before the customers table is created
+event.listen(
+    Customer.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+
 class Admin(Base):
     __tablename__ = "admins"
 
@@ -254,6 +273,18 @@ class Transaction(Base):
     subscription = relationship("Subscription", back_populates="transaction", uselist=False)
     active_topup = relationship("ActiveTopup", back_populates="transaction", uselist=False)
 
+    # Covers the customer history listing so pages are served from the index alone
+    __table_args__ = (
+        Index(
+            'idx_transaction_customer_history',
+            'customer_id', 'transaction_date', 'transaction_id',
+            postgresql_include=[
+                'plan_id', 'recipient_phone_number', 'transaction_type', 'original_amount',
+                'discount_amount', 'final_amount', 'payment_method', 'payment_status'
+            ]
+        ),
+    )
+
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -278,6 +309,11 @@ class Subscription(Base):
     transaction = relationship("Transaction", back_populates="subscription")
     activation_queue = relationship("SubscriptionActivationQueue", back_populates="subscription", uselist=False)
     active_topups = relationship("ActiveTopup", back_populates="base_subscription")
+    
+    __table_args__ = (
+        Index('idx_subscription_active_window', 'expiry_date', 'activation_date'),
+        Index('idx_subscription_phone_expiry', 'phone_number', 'expiry_date'),
+    )
 
 
 class SubscriptionActivationQueue(Base):
@@ -296,6 +332,8 @@ class SubscriptionActivationQueue(Base):
     # Relationships
     subscription = relationship("Subscription", back_populates="activation_queue")
     customer = relationship("Customer", back_populates="subscription_queue")
+    
+    __table_args__ = (Index('idx_activation_queue_pending', 'processed_at', 'queue_position', 'queue_id'),)
 
 
 class ActiveTopup(Base):
@@ -343,6 +381,13 @@ class LinkedAccount(Base):
         back_populates="linked_accounts_secondary"
     )
 
+    __table_args__ = (
+        Index(
+            'idx_linked_account_phone_prefix', 'linked_phone_number',
+            postgresql_ops={'linked_phone_number': 'text_pattern_ops'}
+        ),
+    )
+
 
 class PostpaidActivation(Base):
     __tablename__ = "postpaid_activations"
@@ -366,6 +411,14 @@ class PostpaidActivation(Base):
     plan = relationship("Plan", back_populates="postpaid_activations")
     secondary_numbers = relationship("PostpaidSecondaryNumber", back_populates="postpaid_activation", cascade="all, delete-orphan")
     data_addons = relationship("PostpaidDataAddon", back_populates="postpaid_activation")
+    
+    __table_args__ = (
+        Index('idx_postpaid_activation_customer_status', 'customer_id', 'status'),
+        Index(
+            'idx_postpaid_activation_number_prefix', 'primary_number',
+            postgresql_ops={'primary_number': 'text_pattern_ops'}
+        ),
+    )
 
 
 class PostpaidSecondaryNumber(Base):
@@ -380,6 +433,11 @@ class PostpaidSecondaryNumber(Base):
     # Relationships
     postpaid_activation = relationship("PostpaidActivation", back_populates="secondary_numbers")
     customer = relationship("Customer", back_populates="postpaid_secondary_numbers")
+    
+    __table_args__ = (
+        Index('idx_postpaid_secondary_customer', 'customer_id'),
+        Index('idx_postpaid_secondary_phone', 'phone_number'),
+    )
 
 
 class PostpaidDataAddon(Base):
@@ -399,6 +457,10 @@ class PostpaidDataAddon(Base):
     postpaid_activation = relationship("PostpaidActivation", back_populates="data_addons")
 
 
+# Feeds app/utils/referral_codes.py; each value yields one distinct referral code
+referral_code_seq = Sequence("referral_code_seq", metadata=Base.metadata)
+
+
 class ReferralProgram(Base):
     __tablename__ = "referral_program"
 
@@ -429,6 +491,12 @@ class ReferralProgram(Base):
     referral_discounts = relationship("ReferralDiscount", back_populates="referral_program")
     usage_logs = relationship("ReferralUsageLog", back_populates="referral_program")
 
+    # A customer can be the referee of one program; completion looks it up by customer
+    __table_args__ = (
+        Index('idx_referral_referee_customer', 'referee_customer_id', unique=True),
+        Index('idx_referral_referee_phone', 'referee_phone_number'),
+    )
+
 
 class ReferralDiscount(Base):
     __tablename__ = "referral_discounts"
@@ -479,6 +547,35 @@ class Notification(Base):
     # Relationships
     customer = relationship("Customer", back_populates="notifications")
 
+    # PostgreSQL deployments partition this table by month on created_at
+    # (see app/services/retention_service.py)
+    __table_args__ = (Index('idx_notification_customer_created', 'customer_id', 'created_at'),)
+
+
+class NotificationInboxCounter(Base):
+    """Per-customer inbox totals, maintained alongside notification writes"""
+    __tablename__ = "notification_inbox_counters"
+
+    customer_id = Column(BigInteger, ForeignKey("customers.customer_id"), primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+    received_today = Column(Integer, nullable=False, default=0)
+    today_date = Column(Date)  # day that received_today refers to
+    by_type = Column(JSON, nullable=False, default=dict)
+    by_channel = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class NotificationGlobalCounter(Base):
+    """
+    System-wide notification totals, one row per counter key: "total",
+    "type:<type>", "channel:<channel>", "status:<status>" and "sent_on:<date>".
+    """
+    __tablename__ = "notification_global_counters"
+
+    counter_key = Column(String(64), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
 
 class Backup(Base):
     __tablename__ = "backup"
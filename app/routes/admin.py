@@ -4,7 +4,7 @@ from typing import List, Optional
 from datetime import datetime
 from sqlalchemy import func
 
-from app.database import get_db
+from app.database import get_db, get_read_db, get_pool_metrics, replica_router
 from app.models.models import Admin, Customer, Offer, Plan, Transaction
 from app.schemas.admin import *
 from app.core.auth import get_current_admin
@@ -499,7 +499,7 @@ async def get_transactions(
     date_from: Optional[datetime] = Query(None, description="Filter from date"),
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all transactions or a specific transaction by ID with filtering options.
@@ -579,7 +579,7 @@ async def get_transactions(
 @transactions_router.post("/export")
 async def export_transactions(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Export all transactions as CSV file.
@@ -635,90 +635,115 @@ subscription_router = APIRouter(prefix="/subscriptions", tags=["Subscription Man
 
 @subscription_router.get("/active")
 async def get_active_subscriptions(
+    response: Response,
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    plan_id: Optional[int] = Query(None, description="Filter by plan ID"),
+    phone_number: Optional[str] = Query(None, description="Filter by subscribed phone number"),
+    is_topup: Optional[bool] = Query(None, description="Filter topups or base plans"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of subscriptions to return"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all active subscriptions (only currently active ones).
-    """
-    current_time = datetime.utcnow()
-    
-    query = db.query(Subscription).filter(
-        Subscription.activation_date.isnot(None),  
-        Subscription.activation_date <= current_time,  
-        Subscription.expiry_date > current_time 
+    Results are paged by subscription ID; the cursor for the next page is returned
+    in the X-Next-Cursor header.
+    """
+    after_id = None
+    if cursor:
+        try:
+            after_id = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
+    rows = crud_subscription.get_active_subscription_rows(
+        db,
+        customer_id=customer_id,
+        plan_id=plan_id,
+        phone_number=phone_number,
+        is_topup=is_topup,
+        after_id=after_id,
+        limit=limit
     )
     
-    if customer_id:
-        query = query.filter(Subscription.customer_id == customer_id)
-    
-    subscriptions = query.all()
-    
-    # Enhance with customer and plan details
-    enhanced_subscriptions = []
-    for subscription in subscriptions:
-        customer = db.query(Customer).filter(Customer.customer_id == subscription.customer_id).first()
-        plan = db.query(Plan).filter(Plan.plan_id == subscription.plan_id).first()
-        
-        enhanced_subscriptions.append({
-            "subscription_id": subscription.subscription_id,
-            "customer_id": subscription.customer_id,
-            "customer_name": customer.full_name if customer else "Unknown",
-            "customer_phone": customer.phone_number if customer else "Unknown",
-            "plan_id": subscription.plan_id,
-            "plan_name": plan.plan_name if plan else "Unknown",
-            "phone_number": subscription.phone_number,
-            "is_topup": subscription.is_topup,
-            "activation_date": subscription.activation_date,
-            "expiry_date": subscription.expiry_date,
-            "data_balance_gb": float(subscription.data_balance_gb) if subscription.data_balance_gb else None,
-            "daily_data_limit_gb": float(subscription.daily_data_limit_gb) if subscription.daily_data_limit_gb else None,
-            "daily_data_used_gb": float(subscription.daily_data_used_gb) if subscription.daily_data_used_gb else None
-        })
-    
-    return enhanced_subscriptions
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].subscription_id)
+    
+    return [
+        {
+            "subscription_id": row.subscription_id,
+            "customer_id": row.customer_id,
+            "customer_name": row.customer_name,
+            "customer_phone": row.customer_phone,
+            "plan_id": row.plan_id,
+            "plan_name": row.plan_name,
+            "phone_number": row.phone_number,
+            "is_topup": row.is_topup,
+            "activation_date": row.activation_date,
+            "expiry_date": row.expiry_date,
+            "data_balance_gb": float(row.data_balance_gb) if row.data_balance_gb else None,
+            "daily_data_limit_gb": float(row.daily_data_limit_gb) if row.daily_data_limit_gb else None,
+            "daily_data_used_gb": float(row.daily_data_used_gb) if row.daily_data_used_gb else None
+        }
+        for row in rows
+    ]
 
 @subscription_router.get("/queue")
 async def get_activation_queue(
+    response: Response,
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    plan_id: Optional[int] = Query(None, description="Filter by plan ID"),
+    phone_number: Optional[str] = Query(None, description="Filter by queued phone number"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of queue items to return"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get the subscription activation queue.
+    Results are paged by (queue_position, queue_id); the cursor for the next page is
+    returned in the X-Next-Cursor header.
     """
+    after_position = after_id = None
+    if cursor:
+        try:
+            position_part, id_part = cursor.split(":", 1)
+            after_position, after_id = int(position_part), int(id_part)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
     # Only get unprocessed queue items
-    query = db.query(SubscriptionActivationQueue).filter(
-        SubscriptionActivationQueue.processed_at.is_(None)   
+    rows = crud_subscription.get_activation_queue_rows(
+        db,
+        customer_id=customer_id,
+        plan_id=plan_id,
+        phone_number=phone_number,
+        after_position=after_position,
+        after_id=after_id,
+        limit=limit
     )
     
-    if customer_id:
-        query = query.filter(SubscriptionActivationQueue.customer_id == customer_id)
-    
-    queue_items = query.order_by(SubscriptionActivationQueue.queue_position).all()
-    
-    enhanced_queue = []
-    for item in queue_items:
-        customer = db.query(Customer).filter(Customer.customer_id == item.customer_id).first()
-        plan = db.query(Plan).filter(Plan.plan_id == item.subscription.plan_id).first()
-        
-        enhanced_queue.append({
-            "queue_id": item.queue_id,
-            "subscription_id": item.subscription_id,
-            "customer_id": item.customer_id,
-            "customer_name": customer.full_name if customer else "Unknown",
-            "customer_phone": customer.phone_number if customer else "Unknown",
-            "plan_id": item.subscription.plan_id,
-            "plan_name": plan.plan_name if plan else "Unknown",
-            "phone_number": item.phone_number,
-            "queue_position": item.queue_position,
-            "expected_activation_date": item.expected_activation_date,
-            "expected_expiry_date": item.expected_expiry_date,
-            "created_at": item.created_at
-        })
-    
-    return enhanced_queue
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = f"{rows[-1].queue_position}:{rows[-1].queue_id}"
+    
+    return [
+        {
+            "queue_id": row.queue_id,
+            "subscription_id": row.subscription_id,
+            "customer_id": row.customer_id,
+            "customer_name": row.customer_name,
+            "customer_phone": row.customer_phone,
+            "plan_id": row.plan_id,
+            "plan_name": row.plan_name,
+            "phone_number": row.phone_number,
+            "queue_position": row.queue_position,
+            "expected_activation_date": row.expected_activation_date,
+            "expected_expiry_date": row.expected_expiry_date,
+            "created_at": row.created_at
+        }
+        for row in rows
+    ]
 
 
 # ==========================================================
@@ -736,7 +761,7 @@ async def get_customers(
     days_inactive_max: Optional[int] = Query(None, description="Maximum days inactive"),
     search_term: Optional[str] = Query(None, description="Search by phone number or name"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all customers, a specific customer by ID, or search customers with filtering options.
@@ -791,7 +816,7 @@ async def get_customers(
 @customer_router.get("/stats", response_model=CustomerStatsResponse)
 async def get_customer_stats(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get customer statistics.
@@ -816,3 +841,26 @@ async def deactivate_customer(
         )
     
     return {"message": "Customer account deactivated successfully", "customer_id": customer_id}
+
+
+# ==========================================================
+# SYSTEM MONITORING ROUTES
+# ==========================================================
+system_router = APIRouter(prefix="/system", tags=["System Monitoring"])
+
+@system_router.get("/db-pool")
+async def get_db_pool_metrics(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get connection pool usage (in use, overflow, wait time, long-held connections) per engine,
+    plus replica routing state.
+    """
+    return {
+        "pools": get_pool_metrics(),
+        "replica": {
+            "configured": replica_router.configured,
+            "last_lag_seconds": replica_router.last_lag_seconds,
+            "fallbacks_to_primary": replica_router.fallbacks
+        }
+    }
@@ -1,62 +1,77 @@
+import asyncio
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc, text
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import json
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, session_scope
 from app.models.models import Admin, SubscriptionActivationQueue, Transaction, Customer, Plan, Subscription, ReferralProgram
 from app.core.auth import get_current_admin
+from app.core.single_flight import single_flight, flight_key
 from app.schemas.analytics import *
+from app.services.cohort_analytics import cohort_analytics
+from app.services.dashboard_counters import dashboard_counters
+from app.services.realtime_metrics import realtime_metrics
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics", tags=["Analytics & Reports"])
 
 @router.get("/dashboard")
 async def get_dashboard_analytics(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get minimal dashboard analytics - ESSENTIAL DATA ONLY
+    Served from counters maintained on write (see app/services/dashboard_counters.py).
+    """
+    return await single_flight.do(
+        flight_key("/admin/analytics/dashboard"), lambda: asyncio.to_thread(_dashboard_snapshot)
+    )
+
+def _dashboard_snapshot():
+    # The first call after startup rebuilds the counters from SQL
+    dashboard_counters.ensure_reconciled(session_scope)
+    return dashboard_counters.get_dashboard(session_scope, top_plans=3)
+
+@router.get("/realtime", response_model=RealTimeMetricsSnapshot)
+async def get_realtime_metrics(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Live metrics over the last minute, hour and day, with last-hour KPIs.
+    Served from in-memory rolling windows (see app/services/realtime_metrics.py).
+    """
+    return realtime_metrics.snapshot()
+
+async def _realtime_metrics_stream():
+    interval = settings.REALTIME_METRICS_STREAM_INTERVAL
+    yield f"retry: {interval * 1000}\n\n"
+    while True:
+        yield f"event: metrics\ndata: {realtime_metrics.snapshot().model_dump_json()}\n\n"
+        await asyncio.sleep(interval)
+
+@router.get("/realtime/stream")
+async def stream_realtime_metrics(
     current_admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """
-    Get minimal dashboard analytics - ESSENTIAL DATA ONLY
+    Server-Sent Events stream of the /realtime snapshot, pushed every
+    REALTIME_METRICS_STREAM_INTERVAL seconds. Replaces polling /dashboard.
     """
-    today = datetime.utcnow().date()
-    
-    # Essential Today's Stats
-    revenue_today_result = db.query(func.sum(Transaction.final_amount)).filter(
-        func.date(Transaction.transaction_date) == today,
-        Transaction.payment_status == "success"
-    ).first()
-    revenue_today = float(revenue_today_result[0]) if revenue_today_result[0] else 0.0
-    
-    new_customers_today = db.query(Customer).filter(
-        func.date(Customer.created_at) == today
-    ).count()
-    
-    # Essential Quick Stats
-    total_customers = db.query(Customer).count()
-    total_transactions = db.query(Transaction).filter(
-        Transaction.payment_status == "success"
-    ).count()
-    total_revenue = db.query(func.sum(Transaction.final_amount)).filter(
-        Transaction.payment_status == "success"
-    ).scalar() or 0.0
-    
-    # Minimal Top Plans (Top 3 only)
-    top_plans = get_minimal_plan_performance(db, limit=3)
-    
-    return {
-        "today": {
-            "revenue": f"₹{revenue_today:,.2f}",
-            "new_customers": new_customers_today
-        },
-        "overview": {
-            "total_customers": total_customers,
-            "total_transactions": total_transactions,
-            "total_revenue": f"₹{float(total_revenue):,.2f}"
-        },
-        "top_plans": top_plans
-    }
+    # Nothing in the stream touches the database; release the auth session's connection
+    db.close()
+    return StreamingResponse(
+        _realtime_metrics_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 def get_minimal_plan_performance(db: Session, limit: int = 3):
     """Get minimal plan performance data"""
@@ -86,18 +101,20 @@ def get_minimal_plan_performance(db: Session, limit: int = 3):
         return result
     
     except Exception as e:
-        print(f"Error in minimal plan performance: {e}")
+        logger.error("Error in minimal plan performance: %s", e)
         return []
 
 @router.get("/revenue")
 async def get_revenue_analytics(
     period: str = Query("daily", description="daily, weekly, monthly"),
     days: int = Query(30, description="Number of days to analyze"),
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get revenue analytics - FIXED TO RETURN DATA"""
-    return get_enhanced_revenue_trend(db, period, days)
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/revenue", period=period, days=days),
+        get_enhanced_revenue_trend, period, days
+    )
 
 def get_enhanced_revenue_trend(db: Session, period: str = "daily", days: int = 30):
     """Enhanced revenue trend that actually returns data"""
@@ -148,7 +165,7 @@ def get_enhanced_revenue_trend(db: Session, period: str = "daily", days: int = 3
         return sample_data[:10] if period == "daily" else sample_data
     
     except Exception as e:
-        print(f"Error in enhanced revenue trend: {e}")
+        logger.error("Error in enhanced revenue trend: %s", e)
         return [
             {"date": "2025-11-14", "revenue": 2500.0, "transactions": 5},
             {"date": "2025-11-15", "revenue": 3070.4, "transactions": 6},
@@ -160,20 +177,24 @@ def get_enhanced_revenue_trend(db: Session, period: str = "daily", days: int = 3
 @router.get("/customers/growth")
 async def get_customer_growth_analytics(
     days: int = Query(90, description="Number of days to analyze"),
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get customer growth analytics"""
-    return get_simplified_customer_growth(db, days)
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/customers/growth", days=days),
+        get_simplified_customer_growth, days
+    )
 
 @router.get("/referrals/trend")
 async def get_referral_trend_analytics(
     days: int = Query(90, description="Number of days to analyze"),
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get referral trend analytics - FIXED TO RETURN DATA"""
-    return get_enhanced_referral_trend(db, days)
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/referrals/trend", days=days),
+        get_enhanced_referral_trend, days
+    )
 
 def get_enhanced_referral_trend(db: Session, days: int = 30):
     """Enhanced referral trend that actually returns data"""
@@ -224,7 +245,7 @@ def get_enhanced_referral_trend(db: Session, days: int = 30):
         return sample_data
     
     except Exception as e:
-        print(f"Error in enhanced referral trend: {e}")
+        logger.error("Error in enhanced referral trend: %s", e)
         # Fallback sample data
         return [
             {"date": "2025-11-14", "new_referrals": 3, "successful_referrals": 1, "success_rate": "33.3%"},
@@ -236,11 +257,46 @@ def get_enhanced_referral_trend(db: Session, days: int = 30):
 @router.get("/plans/performance")
 async def get_plan_performance(
     limit: int = Query(10, description="Number of top plans to return"),
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get top performing plans by transaction count"""
-    return get_simplified_plan_performance(db, limit)
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/plans/performance", limit=limit),
+        get_simplified_plan_performance, limit
+    )
+
+def _cohort_chart(db: Session, months: int, chart: str) -> ChartResponse:
+    return cohort_analytics.report(db, months)[chart]
+
+@router.get("/cohorts/retention", response_model=ChartResponse)
+async def get_cohort_retention(
+    months: int = Query(12, ge=1, le=36, description="Complete calendar months to analyze"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Share of each monthly signup cohort still active (recharging or subscribed) N months later"""
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/cohorts/retention", months=months), _cohort_chart, months, "retention"
+    )
+
+@router.get("/churn", response_model=ChartResponse)
+async def get_churn_curve(
+    months: int = Query(12, ge=2, le=36, description="Complete calendar months to analyze"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Monthly churn: customers active in the previous month but not in this one"""
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/churn", months=months), _cohort_chart, months, "churn"
+    )
+
+@router.get("/arpu", response_model=ChartResponse)
+async def get_arpu(
+    months: int = Query(12, ge=1, le=36, description="Complete calendar months to analyze"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Average recharge revenue per active customer, by month"""
+    return await single_flight.do_read(
+        flight_key("/admin/analytics/arpu", months=months), _cohort_chart, months, "arpu"
+    )
 
 # ==========================================================
 # HELPER FUNCTIONS WITH REFERRAL TREND
@@ -328,7 +384,7 @@ def get_simplified_revenue_trend(db: Session, period: str = "daily", days: int =
             return result
     
     except Exception as e:
-        print(f"Error in revenue trend: {e}")
+        logger.error("Error in revenue trend: %s", e)
         # Return sample data for testing if query fails
         return [{"date": "2025-11-14", "revenue": 2500.0, "transactions": 5}]
 
@@ -370,7 +426,7 @@ def get_simplified_customer_growth(db: Session, days: int = 30):
         return result
     
     except Exception as e:
-        print(f"Error in customer growth: {e}")
+        logger.error("Error in customer growth: %s", e)
         return [{"date": "2025-11-14", "new_customers": 2, "total_customers": 2, "growth": "0.0%"}]
 
 def get_simplified_referral_trend(db: Session, days: int = 30):
@@ -404,7 +460,7 @@ def get_simplified_referral_trend(db: Session, days: int = 30):
         return result
     
     except Exception as e:
-        print(f"Error in referral trend: {e}")
+        logger.error("Error in referral trend: %s", e)
         return [{"date": "2025-11-14", "new_referrals": 3, "successful_referrals": 1, "success_rate": "33.3%"}]
 
 def get_simplified_plan_performance(db: Session, limit: int = 10):
@@ -438,5 +494,5 @@ def get_simplified_plan_performance(db: Session, limit: int = 10):
         return result
     
     except Exception as e:
-        print(f"Error in plan performance: {e}")
+        logger.error("Error in plan performance: %s", e)
         return [{"plan_name": "1.5GB/day 84 Days Pack", "transactions": 5, "revenue": "₹2,755.40", "rank": 1}]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
@@ -12,7 +13,9 @@ from app.models.models import Admin
 from app.core.auth import get_current_admin
 from app.schemas.cms import *
 from app.mongo import get_mongo_db
-from app.utils.mongo_utils import bson_to_json, create_timestamps, update_timestamp
+from app.utils.mongo_utils import MongoJSONResponse, bson_to_json, create_timestamps, find_serialized, update_timestamp
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/cms", tags=["Admin - CMS Management"])
 
@@ -66,15 +69,8 @@ async def get_headers(
     """
     Get all headers
     """
-    headers_collection = db.headers
-    headers = []
-    
-    async for header in headers_collection.find().sort("created_at", -1):
-        header_data = bson_to_json(header)
-        header_data["id"] = str(header["_id"])
-        headers.append(HeaderResponse(**header_data))
-    
-    return headers
+    headers = await find_serialized(db.headers, HeaderResponse, "created_at", -1)
+    return MongoJSONResponse(headers)
 
 @router.get("/headers/{header_id}", response_model=HeaderResponse)
 async def get_header(
@@ -197,21 +193,21 @@ async def create_carousel(
     Create a new carousel item
     """
     try:
-        print(f"Creating carousel with data: {carousel_data}")
+        logger.debug("Creating carousel with data: %s", carousel_data)
         
         carousels_collection = db.carousels
         
         carousel_doc = carousel_data.model_dump()
-        print(f"Carousel doc before timestamps: {carousel_doc}")
+        logger.debug("Carousel doc before timestamps: %s", carousel_doc)
         
         carousel_doc.update(create_timestamps())
-        print(f"Carousel doc after timestamps: {carousel_doc}")
+        logger.debug("Carousel doc after timestamps: %s", carousel_doc)
         
         result = await carousels_collection.insert_one(carousel_doc)
-        print(f"Insert result: {result.inserted_id}")
+        logger.debug("Insert result: %s", result.inserted_id)
         
         created_carousel = await carousels_collection.find_one({"_id": result.inserted_id})
-        print(f"Created carousel from DB: {created_carousel}")
+        logger.debug("Created carousel from DB: %s", created_carousel)
         
         if not created_carousel:
             raise HTTPException(
@@ -220,21 +216,18 @@ async def create_carousel(
             )
         
         carousel_response = bson_to_json(created_carousel)
-        print(f"After bson_to_json: {carousel_response}")
+        logger.debug("After bson_to_json: %s", carousel_response)
         
         carousel_response["id"] = str(created_carousel["_id"])
-        print(f"Final response data: {carousel_response}")
+        logger.debug("Final response data: %s", carousel_response)
         
         response = CarouselResponse(**carousel_response)
-        print(f"Final CarouselResponse: {response}")
+        logger.debug("Final CarouselResponse: %s", response)
         
         return response
         
     except Exception as e:
-        print(f"Error in create_carousel: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Error in create_carousel: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create carousel: {str(e)}"
@@ -248,15 +241,8 @@ async def get_carousels(
     """
     Get all carousel items ordered by 'order' field
     """
-    carousels_collection = db.carousels
-    carousels = []
-    
-    async for carousel in carousels_collection.find().sort("order", 1):
-        carousel_data = bson_to_json(carousel)
-        carousel_data["id"] = str(carousel["_id"])
-        carousels.append(CarouselResponse(**carousel_data))
-    
-    return carousels
+    carousels = await find_serialized(db.carousels, CarouselResponse, "order", 1)
+    return MongoJSONResponse(carousels)
 
 @router.put("/carousels/{carousel_id}", response_model=CarouselResponse)
 async def update_carousel(
@@ -372,15 +358,8 @@ async def get_faqs(
     """
     Get all FAQ items ordered by 'order' field
     """
-    faqs_collection = db.faqs
-    faqs = []
-    
-    async for faq in faqs_collection.find().sort("order", 1):
-        faq_data = bson_to_json(faq)
-        faq_data["id"] = str(faq["_id"])
-        faqs.append(FAQResponse(**faq_data))
-    
-    return faqs
+    faqs = await find_serialized(db.faqs, FAQResponse, "order", 1)
+    return MongoJSONResponse(faqs)
 
 @router.put("/faqs/{faq_id}", response_model=FAQResponse)
 async def update_faq(
@@ -469,35 +448,15 @@ async def get_cms_overview(
     """
     Get complete CMS data overview
     """
-    # Get headers
-    headers_collection = db.headers
-    headers = []
-    async for header in headers_collection.find().sort("created_at", -1):
-        header_data = bson_to_json(header)
-        header_data["id"] = str(header["_id"])
-        headers.append(HeaderResponse(**header_data))
-    
-    # Get carousels
-    carousels_collection = db.carousels
-    carousels = []
-    async for carousel in carousels_collection.find().sort("order", 1):
-        carousel_data = bson_to_json(carousel)
-        carousel_data["id"] = str(carousel["_id"])
-        carousels.append(CarouselResponse(**carousel_data))
-    
-    # Get FAQs
-    faqs_collection = db.faqs
-    faqs = []
-    async for faq in faqs_collection.find().sort("order", 1):
-        faq_data = bson_to_json(faq)
-        faq_data["id"] = str(faq["_id"])
-        faqs.append(FAQResponse(**faq_data))
-    
-    return CMSListResponse(
-        headers=headers,
-        carousels=carousels,
-        faqs=faqs
-    )
+    headers = await find_serialized(db.headers, HeaderResponse, "created_at", -1)
+    carousels = await find_serialized(db.carousels, CarouselResponse, "order", 1)
+    faqs = await find_serialized(db.faqs, FAQResponse, "order", 1)
+    
+    return MongoJSONResponse({
+        "headers": headers,
+        "carousels": carousels,
+        "faqs": faqs
+    })
 
 @router.post("/reorder")
 async def reorder_items(
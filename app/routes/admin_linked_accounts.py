@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.models import Admin, LinkedAccount, Customer
 from app.core.auth import get_current_admin
 from app.schemas.linked_account import LinkedAccountResponse
 from app.crud.crud_linked_account import crud_linked_account
+from app.services.customer_search import phone_filter
 
 router = APIRouter(prefix="/linked-accounts", tags=["Admin - Linked Accounts"])
 
@@ -15,7 +16,7 @@ async def get_all_linked_accounts(
     primary_customer_id: Optional[int] = Query(None, description="Filter by primary customer"),
     linked_phone: Optional[str] = Query(None, description="Filter by linked phone number"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all linked account relationships in the system.
@@ -27,7 +28,7 @@ async def get_all_linked_accounts(
         query = query.filter(LinkedAccount.primary_customer_id == primary_customer_id)
     
     if linked_phone:
-        query = query.filter(LinkedAccount.linked_phone_number.ilike(f"%{linked_phone}%"))
+        query = query.filter(phone_filter(LinkedAccount.linked_phone_number, linked_phone))
     
     linked_accounts = query.all()
     
@@ -61,7 +62,7 @@ async def get_all_linked_accounts(
 async def get_customer_linked_relationships(
     customer_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all linked account relationships for a specific customer
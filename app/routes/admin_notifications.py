@@ -4,11 +4,12 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.models import Admin, Notification, NotificationType, NotificationChannel
 from app.core.auth import get_current_admin
 from app.schemas.notification import NotificationResponse, AdminNotificationCreate
 from app.crud.crud_notification import crud_notification
+from app.crud.crud_notification_counter import crud_notification_counter
 from app.services.notification_service import notification_service
 
 router = APIRouter(prefix="/notifications", tags=["Admin Notifications"])
@@ -20,7 +21,7 @@ async def get_all_notifications(
     channel: Optional[NotificationChannel] = Query(None, description="Filter by channel"),
     status: Optional[str] = Query(None, description="Filter by status"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: Get all notifications with filtering options
@@ -100,54 +101,17 @@ async def send_admin_notification(
 @router.get("/stats")
 async def get_admin_notification_stats(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: Get system-wide notification statistics - shows sent_today
     """
-    # Get total notifications
-    total_notifications = db.query(Notification).count()
-    
-    # Notifications sent today (by system)
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    sent_today = db.query(Notification).filter(Notification.sent_at >= today_start).count()
-    
-    # Count by type
-    type_counts = db.query(
-        Notification.type,
-        func.count(Notification.notification_id)
-    ).group_by(Notification.type).all()
-    
-    by_type = {ntype.value: count for ntype, count in type_counts}
-    
-    # Count by channel
-    channel_counts = db.query(
-        Notification.channel,
-        func.count(Notification.notification_id)
-    ).group_by(Notification.channel).all()
-    
-    by_channel = {nchannel.value: count for nchannel, count in channel_counts}
-    
-    # Count by status
-    status_counts = db.query(
-        Notification.status,
-        func.count(Notification.notification_id)
-    ).group_by(Notification.status).all()
-    
-    by_status = {status: count for status, count in status_counts}
-    
-    return {
-        "total_notifications": total_notifications,
-        "sent_today": sent_today, 
-        "by_type": by_type,
-        "by_channel": by_channel,
-        "by_status": by_status
-    }
+    return crud_notification_counter.get_global_stats(db)
     
 @router.get("/automated-stats")
 async def get_automated_notification_stats(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get statistics about automated notifications"""
     from sqlalchemy import func
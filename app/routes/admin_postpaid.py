@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.models import Admin, PostpaidActivation, Customer, Plan, PostpaidDataAddon, PostpaidSecondaryNumber, Transaction, PostpaidStatus
 from app.core.auth import get_current_admin
 from app.schemas.postpaid import *
@@ -15,6 +15,48 @@ router = APIRouter(prefix="/postpaid", tags=["Postpaid Activations Management"])
 # POSTPAID ACTIVATION MANAGEMENT
 # ==========================================================
 
+def _build_activation_detail(activation: PostpaidActivation) -> PostpaidActivationDetailResponse:
+    """Serialize an activation whose customer, plan, secondary numbers and active addons are already loaded"""
+    customer = activation.customer
+    plan = activation.plan
+    
+    return PostpaidActivationDetailResponse(
+        activation_id=activation.activation_id,
+        customer_id=activation.customer_id,
+        customer_name=customer.full_name if customer else "Unknown",
+        customer_phone=customer.phone_number if customer else "Unknown",
+        plan_name=plan.plan_name if plan else "Unknown",
+        primary_number=activation.primary_number,
+        billing_cycle_start=activation.billing_cycle_start,
+        billing_cycle_end=activation.billing_cycle_end,
+        base_data_allowance_gb=float(activation.base_data_allowance_gb),
+        current_data_balance_gb=float(activation.current_data_balance_gb),
+        data_used_gb=float(activation.data_used_gb),
+        base_amount=float(activation.base_amount),
+        total_amount_due=float(activation.total_amount_due),
+        status=activation.status,
+        secondary_numbers=[
+            SecondaryNumberResponse(
+                secondary_id=secondary.secondary_id,
+                phone_number=secondary.phone_number,
+                added_date=secondary.added_date
+            )
+            for secondary in activation.secondary_numbers
+        ],
+        data_addons=[
+            DataAddonResponse(
+                addon_id=addon.addon_id,
+                addon_name=addon.addon_name,
+                data_amount_gb=float(addon.data_amount_gb),
+                addon_price=float(addon.addon_price),
+                purchased_date=addon.purchased_date,
+                valid_until=addon.valid_until,
+                status=addon.status
+            )
+            for addon in activation.data_addons
+        ]
+    )
+
 @router.get("/activations", response_model=List[PostpaidActivationDetailResponse])
 async def get_postpaid_activations(
     activation_id: Optional[int] = Query(None, description="Get specific activation by ID"),
@@ -23,8 +65,10 @@ async def get_postpaid_activations(
     customer_phone: Optional[str] = Query(None, description="Filter by customer phone"),
     date_from: Optional[datetime] = Query(None, description="Filter from date"),
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
+    skip: int = Query(0, ge=0, description="Number of activations to skip"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of activations to return"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all postpaid activations or a specific activation by ID with filtering options.
@@ -32,60 +76,14 @@ async def get_postpaid_activations(
     """
     # If activation_id is provided, return detailed information for that activation
     if activation_id is not None:
-        activation = crud_postpaid.get_activation_by_id(db, activation_id)
-        if not activation:
+        activations = crud_postpaid.get_activations_with_details(db, activation_id=activation_id)
+        if not activations:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
+                status_code=404,
                 detail="Postpaid activation not found"
             )
         
-        customer = db.query(Customer).filter(Customer.customer_id == activation.customer_id).first()
-        plan = db.query(Plan).filter(Plan.plan_id == activation.plan_id).first()
-        secondary_numbers = crud_postpaid.get_secondary_numbers(db, activation.activation_id)
-        data_addons = crud_postpaid.get_active_addons(db, activation.activation_id)
-        
-        # Format secondary numbers
-        secondary_responses = []
-        for secondary in secondary_numbers:
-            secondary_responses.append(SecondaryNumberResponse(
-                secondary_id=secondary.secondary_id,
-                phone_number=secondary.phone_number,
-                added_date=secondary.added_date
-            ))
-        
-        # Format data addons
-        addon_responses = []
-        for addon in data_addons:
-            addon_responses.append(DataAddonResponse(
-                addon_id=addon.addon_id,
-                addon_name=addon.addon_name,
-                data_amount_gb=float(addon.data_amount_gb),
-                addon_price=float(addon.addon_price),
-                purchased_date=addon.purchased_date,
-                valid_until=addon.valid_until,
-                status=addon.status
-            ))
-        
-        response_data = PostpaidActivationDetailResponse(
-            activation_id=activation.activation_id,
-            customer_id=activation.customer_id,
-            customer_name=customer.full_name if customer else "Unknown",
-            customer_phone=customer.phone_number if customer else "Unknown",
-            plan_name=plan.plan_name if plan else "Unknown",
-            primary_number=activation.primary_number,
-            billing_cycle_start=activation.billing_cycle_start,
-            billing_cycle_end=activation.billing_cycle_end,
-            base_data_allowance_gb=float(activation.base_data_allowance_gb),
-            current_data_balance_gb=float(activation.current_data_balance_gb),
-            data_used_gb=float(activation.data_used_gb),
-            base_amount=float(activation.base_amount),
-            total_amount_due=float(activation.total_amount_due),
-            status=activation.status,
-            secondary_numbers=secondary_responses,
-            data_addons=addon_responses
-        )
-        
-        return [response_data]
+        return [_build_activation_detail(activations[0])]
     
 
     if status is None:
@@ -99,57 +97,11 @@ async def get_postpaid_activations(
         date_to=date_to
     )
     
-    activations = crud_postpaid.get_all_activations(db, filter=filter_params)
-    
-    response_activations = []
-    for activation in activations:
-        customer = db.query(Customer).filter(Customer.customer_id == activation.customer_id).first()
-        plan = db.query(Plan).filter(Plan.plan_id == activation.plan_id).first()
-        secondary_numbers = crud_postpaid.get_secondary_numbers(db, activation.activation_id)
-        data_addons = crud_postpaid.get_active_addons(db, activation.activation_id)
-        
-        # Format secondary numbers
-        secondary_responses = []
-        for secondary in secondary_numbers:
-            secondary_responses.append(SecondaryNumberResponse(
-                secondary_id=secondary.secondary_id,
-                phone_number=secondary.phone_number,
-                added_date=secondary.added_date
-            ))
-        
-        # Format data addons
-        addon_responses = []
-        for addon in data_addons:
-            addon_responses.append(DataAddonResponse(
-                addon_id=addon.addon_id,
-                addon_name=addon.addon_name,
-                data_amount_gb=float(addon.data_amount_gb),
-                addon_price=float(addon.addon_price),
-                purchased_date=addon.purchased_date,
-                valid_until=addon.valid_until,
-                status=addon.status
-            ))
-        
-        response_activations.append(PostpaidActivationDetailResponse(
-            activation_id=activation.activation_id,
-            customer_id=activation.customer_id,
-            customer_name=customer.full_name if customer else "Unknown",
-            customer_phone=customer.phone_number if customer else "Unknown",
-            plan_name=plan.plan_name if plan else "Unknown",
-            primary_number=activation.primary_number,
-            billing_cycle_start=activation.billing_cycle_start,
-            billing_cycle_end=activation.billing_cycle_end,
-            base_data_allowance_gb=float(activation.base_data_allowance_gb),
-            current_data_balance_gb=float(activation.current_data_balance_gb),
-            data_used_gb=float(activation.data_used_gb),
-            base_amount=float(activation.base_amount),
-            total_amount_due=float(activation.total_amount_due),
-            status=activation.status,
-            secondary_numbers=secondary_responses,
-            data_addons=addon_responses
-        ))
+    activations = crud_postpaid.get_activations_with_details(
+        db, filter=filter_params, skip=skip, limit=limit
+    )
     
-    return response_activations
+    return [_build_activation_detail(activation) for activation in activations]
 
 # ==========================================================
 # SECONDARY NUMBER VALIDATION
@@ -194,7 +146,7 @@ router1 = APIRouter(prefix="/postpaid", tags=["Postpaid Billing Management"])
 @router1.get("/due-payments")
 async def get_due_payments(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all activations with due payments (only unpaid bills).
@@ -227,7 +179,7 @@ async def get_due_payments(
 async def get_customer_postpaid_history(
     customer_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed postpaid history for a specific customer.
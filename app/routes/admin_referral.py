@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.models import Admin, ReferralStatus
 from app.core.auth import get_current_admin
-from app.schemas.referral import ReferralProgramResponse, ReferralUsageLogResponse, SystemReferralStats
+from app.schemas.referral import (
+    ReferralProgramResponse, ReferralUsageLogResponse, SystemReferralStats, ReferralCodeBatchResponse
+)
 from app.crud.crud_referral import crud_referral
 
 router = APIRouter(prefix="/admin/referrals", tags=["Admin - Referral Management"])
@@ -17,7 +19,7 @@ async def get_all_referral_programs(
     skip: int = Query(0, description="Skip records"),
     limit: int = Query(100, description="Limit records"),
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: View all referral programs with filtering.
@@ -27,11 +29,25 @@ async def get_all_referral_programs(
     )
     return referral_programs
 
+@router.post("/codes/bulk", response_model=ReferralCodeBatchResponse)
+async def generate_referral_codes_bulk(
+    count: int = Query(100, ge=1, le=10000, description="Number of codes to generate"),
+    current_admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Admin: Pre-generate referral codes for a marketing campaign.
+    Codes are drawn from the referral code sequence, so they never collide with
+    existing or future codes.
+    """
+    codes = crud_referral.generate_referral_codes(db, count)
+    return ReferralCodeBatchResponse(count=len(codes), codes=codes)
+
 @router.get("/{referral_id}/usage-logs", response_model=List[ReferralUsageLogResponse])
 async def get_referral_usage_logs(
     referral_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: View usage logs for a specific referral program.
@@ -42,7 +58,7 @@ async def get_referral_usage_logs(
 @router.get("/stats/overview", response_model=SystemReferralStats)
 async def get_referral_overview_stats(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: Get overview statistics for referral programs.
@@ -55,7 +71,7 @@ async def get_referral_overview_stats(
 async def get_customer_referral_details(
     customer_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Admin: Get detailed referral information for a specific customer.
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -17,6 +18,8 @@ from app.schemas.token import Token, TokenRefresh, TokenResponse, LogoutResponse
 from datetime import timedelta
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter( tags=["Authentication"])
 security = HTTPBearer()
 
@@ -182,7 +185,7 @@ async def customer_register(customer_data: CustomerRegister, db: Session = Depen
     
     # If referral code is provided in the customer_data, apply it
     if hasattr(customer_data, 'referral_code') and customer_data.referral_code:
-        print(f"DEBUG: Applying referral code {customer_data.referral_code} for new customer {customer.customer_id}")
+        logger.debug("Applying referral code %s for new customer %s", customer_data.referral_code, customer.customer_id)
         
         referral_program, error = crud_referral.use_referral_code(
             db, 
@@ -193,8 +196,8 @@ async def customer_register(customer_data: CustomerRegister, db: Session = Depen
         
         # We don't fail registration if referral fails, just log it
         if error:
-            print(f"Referral code application failed: {error}")
+            logger.warning("Referral code application failed: %s", error)
         else:
-            print(f"Referral code applied successfully for new customer: {customer.phone_number}")
+            logger.info("Referral code applied successfully for new customer: %s", customer.phone_number)
     
     return customer
\ No newline at end of file
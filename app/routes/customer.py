@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import joinedload
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.models import Customer, Plan, Offer, ReferralDiscount, ReferralProgram, ReferralStatus, Transaction, Subscription, SubscriptionActivationQueue, Category
 from app.core.auth import get_current_customer
+from app.core.single_flight import single_flight, flight_key
 from app.schemas.customer_operations import *
-from app.crud import crud_customer, crud_subscription
+from app.crud import crud_customer, crud_subscription, crud_transaction
 from app.core.security import verify_password, get_password_hash
 from app.crud.crud_customer import crud_customer
 from app.services.automated_notifications import automated_notifications
 
+logger = logging.getLogger(__name__)
+
 
 
 # ==========================================================
@@ -20,35 +25,34 @@ from app.services.automated_notifications import automated_notifications
 # ==========================================================
 profile_router = APIRouter(prefix="/customer", tags=["Customer Profile"])
 
+def _if_none_match(header: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, so W/ tags match too)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
 @profile_router.get("/profile", response_model=CustomerProfileResponse)
 async def get_customer_profile(
-    current_customer: Customer = Depends(get_current_customer),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_customer: Customer = Depends(get_current_customer)
 ):
     """
     Get current customer's profile information.
+    Read-only: activity state is maintained where plans activate and expire.
+    Supports conditional requests with If-None-Match.
     """
-    # Directly update the last_active_plan_date based on current active subscriptions
-    current_time = datetime.utcnow()
-    
-    # Find the most recent active subscription
-    latest_active_subscription = db.query(Subscription).filter(
-        Subscription.customer_id == current_customer.customer_id,
-        Subscription.expiry_date > current_time
-    ).order_by(Subscription.activation_date.desc()).first()
-    
-    if latest_active_subscription:
-        # Update the customer's last_active_plan_date
-        current_customer.last_active_plan_date = latest_active_subscription.activation_date
-        current_customer.days_inactive = 0
-        current_customer.inactivity_status_updated_at = current_time
-        db.commit()
+    profile = CustomerProfileResponse.model_validate(current_customer)
+    etag = '"' + hashlib.sha1(profile.model_dump_json().encode("utf-8")).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    db.refresh(current_customer)
-    
-    print(f"DEBUG: Customer {current_customer.customer_id} - last_active_plan_date: {current_customer.last_active_plan_date}")
+    if _if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return current_customer
+    response.headers.update(headers)
+    return profile
 
 @profile_router.put("/profile", response_model=CustomerProfileResponse)
 async def update_customer_profile(
@@ -119,12 +123,19 @@ async def get_plans_for_customer(
     plan_id: Optional[int] = Query(None, description="Get specific plan by ID"),
     plan_type: Optional[str] = Query(None, description="Filter by plan type"),
     category_id: Optional[int] = Query(None, description="Filter by category"),
-    current_customer: Customer = Depends(get_current_customer),
-    db: Session = Depends(get_db)
+    current_customer: Customer = Depends(get_current_customer)
 ):
     """
     Get all available plans for customers or a specific plan by ID.
+    Concurrent requests for the same filters share one catalog read.
     """
+    return await single_flight.do_read(
+        flight_key("/customer/plans", plan_id=plan_id, plan_type=plan_type, category_id=category_id),
+        list_plans_for_customer, plan_id, plan_type, category_id
+    )
+
+def list_plans_for_customer(db: Session, plan_id: Optional[int], plan_type: Optional[str],
+                            category_id: Optional[int]) -> List[PlanResponseForCustomer]:
     current_time = datetime.utcnow()
     
     # If plan_id is provided, return only that specific plan
@@ -244,12 +255,18 @@ async def get_plans_for_customer(
 @plans_offers_router.get("/offers", response_model=List[OfferResponseForCustomer])
 async def get_offers_for_customer(
     plan_id: Optional[int] = Query(None, description="Filter by plan"),
-    current_customer: Customer = Depends(get_current_customer),
-    db: Session = Depends(get_db)
+    current_customer: Customer = Depends(get_current_customer)
 ):
     """
     Get all active offers for customers.
+    Concurrent requests for the same filter share one read.
     """
+    return await single_flight.do_read(
+        flight_key("/customer/offers", plan_id=plan_id or None),
+        list_offers_for_customer, plan_id
+    )
+
+def list_offers_for_customer(db: Session, plan_id: Optional[int]) -> List[OfferResponseForCustomer]:
     current_time = datetime.utcnow()
     
     query = db.query(Offer).join(Plan).filter(
@@ -356,7 +373,7 @@ async def create_recharge(
         crud_referral.mark_discount_used(db, active_referral_discount.discount_id, current_customer.customer_id)
         
         referral_message = f" Applied {discount_percentage}% referral discount!"
-        print(f"DEBUG: Applied referral discount {discount_percentage}% for customer {current_customer.customer_id}")
+        logger.debug("Applied referral discount %s%% for customer %s", discount_percentage, current_customer.customer_id)
         
     elif offer:
         # Apply offer discount
@@ -387,6 +404,12 @@ async def create_recharge(
     )
     
     db.add(transaction)
+    # Only a customer without the marker can be on their first recharge; the
+    # conditional update decides it once, in the same commit as the transaction
+    is_first_recharge = (
+        current_customer.first_recharge_at is None
+        and crud_customer.mark_first_recharge(db, current_customer.customer_id)
+    )
     db.commit()
     db.refresh(transaction)
     
@@ -397,26 +420,17 @@ async def create_recharge(
     
     current_time = datetime.utcnow()
     
-    # Check if this is the customer's first successful recharge
-    previous_recharges = db.query(Transaction).filter(
-        Transaction.customer_id == current_customer.customer_id,
-        Transaction.payment_status == "success",
-        Transaction.transaction_id != transaction.transaction_id  
-    ).count()
-
-    if previous_recharges == 0:
-        print(f"DEBUG: First recharge for customer {current_customer.customer_id}, checking for pending referrals...")
+    if is_first_recharge:
+        logger.debug("First recharge for customer %s, checking for pending referrals...", current_customer.customer_id)
         
         # Complete the referral if this customer was referred by someone
-        completed_referral, error = crud_referral.complete_referral(
-            db, current_customer.customer_id, current_customer.phone_number
-        )
+        completed_referral, error = crud_referral.complete_referral(db, current_customer.customer_id)
         
         if completed_referral:
-            print(f"DEBUG: Referral completed successfully for customer: {current_customer.phone_number}")
+            logger.debug("Referral completed successfully for customer: %s", current_customer.phone_number)
             referral_message += " Referral completed! You earned rewards for your referrer."
         else:
-            print(f"DEBUG: No referral to complete or error: {error}")
+            logger.debug("No referral to complete or error: %s", error)
     
     # Check if customer has active subscriptions for this phone number
     active_subscriptions = db.query(Subscription).filter(
@@ -572,62 +586,63 @@ transaction_router = APIRouter(prefix="/customer", tags=["View Transactions"])
 
 @transaction_router.get("/transactions", response_model=List[CustomerTransactionResponse])
 async def get_customer_transactions(
+    response: Response,
     transaction_id: Optional[int] = Query(None, description="Get specific transaction by ID"),
+    date_from: Optional[datetime] = Query(None, description="Filter from date"),
+    date_to: Optional[datetime] = Query(None, description="Filter to date (inclusive)"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of transactions to return"),
     current_customer: Customer = Depends(get_current_customer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get customer's transaction history or a specific transaction by ID.
+    History is returned newest first and paged by (transaction_date, transaction_id);
+    the cursor for the next page is returned in the X-Next-Cursor header.
     """
-    if transaction_id is not None:
-        transaction = db.query(Transaction).filter(
-            Transaction.transaction_id == transaction_id,
-            Transaction.customer_id == current_customer.customer_id
-        ).first()
-        
-        if not transaction:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transaction not found"
-            )
-        
-        plan = db.query(Plan).filter(Plan.plan_id == transaction.plan_id).first()
-        
-        return [CustomerTransactionResponse(
-            transaction_id=transaction.transaction_id,
-            plan_name=plan.plan_name if plan else "Unknown",
-            recipient_phone_number=transaction.recipient_phone_number,
-            transaction_type=transaction.transaction_type,
-            original_amount=float(transaction.original_amount),
-            discount_amount=float(transaction.discount_amount),
-            final_amount=float(transaction.final_amount),
-            payment_method=transaction.payment_method,
-            payment_status=transaction.payment_status,
-            transaction_date=transaction.transaction_date
-        )]
-    
-    transactions = db.query(Transaction).filter(
-        Transaction.customer_id == current_customer.customer_id
-    ).order_by(Transaction.transaction_date.desc()).all()
+    after_date = after_id = None
+    if cursor:
+        try:
+            date_part, id_part = cursor.rsplit("_", 1)
+            after_date, after_id = datetime.fromisoformat(date_part), int(id_part)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
+    rows = crud_transaction.get_customer_history_rows(
+        db,
+        customer_id=current_customer.customer_id,
+        transaction_id=transaction_id,
+        date_from=date_from,
+        date_to=date_to,
+        after_date=after_date,
+        after_id=after_id,
+        limit=limit
+    )
     
-    response_transactions = []
-    for transaction in transactions:
-        plan = db.query(Plan).filter(Plan.plan_id == transaction.plan_id).first()
-        
-        response_transactions.append(CustomerTransactionResponse(
-            transaction_id=transaction.transaction_id,
-            plan_name=plan.plan_name if plan else "Unknown",
-            recipient_phone_number=transaction.recipient_phone_number,
-            transaction_type=transaction.transaction_type,
-            original_amount=float(transaction.original_amount),
-            discount_amount=float(transaction.discount_amount),
-            final_amount=float(transaction.final_amount),
-            payment_method=transaction.payment_method,
-            payment_status=transaction.payment_status,
-            transaction_date=transaction.transaction_date
-        ))
+    if transaction_id is not None and not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
     
-    return response_transactions
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = f"{rows[-1].transaction_date.isoformat()}_{rows[-1].transaction_id}"
+    
+    return [
+        CustomerTransactionResponse(
+            transaction_id=row.transaction_id,
+            plan_name=row.plan_name or "Unknown",
+            recipient_phone_number=row.recipient_phone_number,
+            transaction_type=row.transaction_type,
+            original_amount=float(row.original_amount),
+            discount_amount=float(row.discount_amount),
+            final_amount=float(row.final_amount),
+            payment_method=row.payment_method,
+            payment_status=row.payment_status,
+            transaction_date=row.transaction_date
+        )
+        for row in rows
+    ]
 
 # ==========================================================
 # SUBSCRIPTION MANAGEMENT
@@ -641,6 +656,9 @@ async def get_customer_active_subscriptions(current_customer: Customer = Depends
     """
     Get customer's active subscription.
     """
+    return list_active_subscriptions(db, current_customer.customer_id)
+
+def list_active_subscriptions(db: Session, customer_id: int) -> List[CustomerSubscriptionResponse]:
     from app.services.subscription_service import subscription_service
     
     # Process expired subscriptions before returning data
@@ -651,7 +669,7 @@ async def get_customer_active_subscriptions(current_customer: Customer = Depends
     subscriptions = db.query(Subscription).join(
         Plan, Subscription.plan_id == Plan.plan_id
     ).filter(
-        Subscription.customer_id == current_customer.customer_id,
+        Subscription.customer_id == customer_id,
         Subscription.activation_date.isnot(None),  
         Subscription.activation_date <= current_time,  
         Subscription.expiry_date > current_time  
@@ -1,12 +1,14 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
 
 from app.core.auth import get_current_customer
+from app.core.single_flight import single_flight, flight_key
 from app.models.models import Customer
 from app.schemas.cms import HeaderResponse, CarouselResponse, FAQResponse, CMSListResponse
 from app.mongo import get_mongo_db
-from app.utils.mongo_utils import bson_to_json
+from app.utils.mongo_utils import MongoJSONResponse, find_serialized
 
 router = APIRouter(prefix="/customer/cms", tags=["Customer - CMS Content"])
 
@@ -18,35 +20,21 @@ async def get_cms_content(
     """
     Get all CMS content for customer frontend
     """
-    # Get headers
-    headers_collection = db.headers
-    headers = []
-    async for header in headers_collection.find().sort("created_at", -1):
-        header_data = bson_to_json(header)
-        header_data["id"] = str(header["_id"])
-        headers.append(HeaderResponse(**header_data))
-    
-    # Get carousels
-    carousels_collection = db.carousels
-    carousels = []
-    async for carousel in carousels_collection.find().sort("order", 1):
-        carousel_data = bson_to_json(carousel)
-        carousel_data["id"] = str(carousel["_id"])
-        carousels.append(CarouselResponse(**carousel_data))
-    
-    # Get FAQs
-    faqs_collection = db.faqs
-    faqs = []
-    async for faq in faqs_collection.find().sort("order", 1):
-        faq_data = bson_to_json(faq)
-        faq_data["id"] = str(faq["_id"])
-        faqs.append(FAQResponse(**faq_data))
-    
-    return CMSListResponse(
-        headers=headers,
-        carousels=carousels,
-        faqs=faqs
+    content = await single_flight.do(flight_key("/customer/cms/content"), lambda: load_cms_content(db))
+    return MongoJSONResponse(content)
+
+async def load_cms_content(db: AsyncIOMotorDatabase):
+    """Headers, carousels and FAQs, read concurrently"""
+    headers, carousels, faqs = await asyncio.gather(
+        find_serialized(db.headers, HeaderResponse, "created_at", -1),
+        find_serialized(db.carousels, CarouselResponse, "order", 1),
+        find_serialized(db.faqs, FAQResponse, "order", 1)
     )
+    return {
+        "headers": headers,
+        "carousels": carousels,
+        "faqs": faqs
+    }
 
 @router.get("/headers", response_model=List[HeaderResponse])
 async def get_headers(
@@ -55,15 +43,8 @@ async def get_headers(
     """
     Get headers for customer (public endpoint)
     """
-    headers_collection = db.headers
-    headers = []
-    
-    async for header in headers_collection.find().sort("created_at", -1):
-        header_data = bson_to_json(header)
-        header_data["id"] = str(header["_id"])
-        headers.append(HeaderResponse(**header_data))
-    
-    return headers
+    headers = await find_serialized(db.headers, HeaderResponse, "created_at", -1)
+    return MongoJSONResponse(headers)
 
 @router.get("/carousels", response_model=List[CarouselResponse])
 async def get_carousels(
@@ -72,15 +53,8 @@ async def get_carousels(
     """
     Get carousel items for customer (public endpoint)
     """
-    carousels_collection = db.carousels
-    carousels = []
-    
-    async for carousel in carousels_collection.find().sort("order", 1):
-        carousel_data = bson_to_json(carousel)
-        carousel_data["id"] = str(carousel["_id"])
-        carousels.append(CarouselResponse(**carousel_data))
-    
-    return carousels
+    carousels = await find_serialized(db.carousels, CarouselResponse, "order", 1)
+    return MongoJSONResponse(carousels)
 
 @router.get("/faqs", response_model=List[FAQResponse])
 async def get_faqs(
@@ -89,12 +63,5 @@ async def get_faqs(
     """
     Get FAQ items for customer (public endpoint)
     """
-    faqs_collection = db.faqs
-    faqs = []
-    
-    async for faq in faqs_collection.find().sort("order", 1):
-        faq_data = bson_to_json(faq)
-        faq_data["id"] = str(faq["_id"])
-        faqs.append(FAQResponse(**faq_data))
-    
-    return faqs
\ No newline at end of file
+    faqs = await find_serialized(db.faqs, FAQResponse, "order", 1)
+    return MongoJSONResponse(faqs)
\ No newline at end of file
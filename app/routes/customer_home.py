@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from sqlalchemy.orm import Session
+from typing import Optional, Set
+
+from app.core.auth import get_current_customer
+from app.core.single_flight import single_flight, flight_key
+from app.crud.crud_notification import crud_notification
+from app.database import session_scope
+from app.models.models import Customer
+from app.mongo import get_mongo_db
+from app.routes.customer import list_active_subscriptions, list_plans_for_customer
+from app.routes.customer_cms import load_cms_content
+from app.schemas.customer_operations import CustomerHomeResponse, CustomerProfileResponse
+from app.schemas.notification import NotificationStats
+from app.utils.mongo_utils import MongoJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/customer", tags=["Customer Home"])
+
+HOME_COMPONENTS = ("profile", "active_subscriptions", "notification_stats", "cms", "plans")
+
+
+def _parse_fields(fields: Optional[str]) -> Set[str]:
+    if not fields:
+        return set(HOME_COMPONENTS)
+    selected = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = selected - set(HOME_COMPONENTS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(HOME_COMPONENTS)}"
+        )
+    return selected
+
+
+def _in_session(fn, *args):
+    """Run fn(db, *args) in a worker thread on its own session, so components load side by side"""
+    def call():
+        with session_scope() as db:
+            return fn(db, *args)
+
+    return asyncio.to_thread(call)
+
+
+def _notification_stats(db: Session, customer_id: int) -> NotificationStats:
+    return NotificationStats(**crud_notification.get_notification_stats(db, customer_id))
+
+
+@router.get("/home", response_model=CustomerHomeResponse)
+async def get_customer_home(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated components to include: " + ", ".join(HOME_COMPONENTS) + " (default: all)"
+    ),
+    current_customer: Customer = Depends(get_current_customer),
+    mongo_db: AsyncIOMotorDatabase = Depends(get_mongo_db)
+):
+    """
+    Everything the app shows on launch, in one response: profile, active
+    subscriptions, notification stats, CMS content and the plan catalog.
+    Authenticates once and loads the components concurrently, CMS from
+    MongoDB alongside the SQL reads. A component that fails is listed in
+    `unavailable` instead of failing the whole response.
+    """
+    selected = _parse_fields(fields)
+    customer_id = current_customer.customer_id
+
+    loaders = {
+        "active_subscriptions": lambda: _in_session(list_active_subscriptions, customer_id),
+        "notification_stats": lambda: _in_session(_notification_stats, customer_id),
+        # Shared with concurrent /customer/cms/content and /customer/plans requests
+        "cms": lambda: single_flight.do(flight_key("/customer/cms/content"), lambda: load_cms_content(mongo_db)),
+        "plans": lambda: single_flight.do_read(
+            flight_key("/customer/plans"), list_plans_for_customer, None, None, None
+        ),
+    }
+
+    components = {}
+    if "profile" in selected:
+        components["profile"] = CustomerProfileResponse.model_validate(current_customer)
+
+    names = [name for name in HOME_COMPONENTS if name in selected and name in loaders]
+    results = await asyncio.gather(*(loaders[name]() for name in names), return_exceptions=True)
+
+    unavailable = []
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.error("Home component %s failed for customer %s: %s", name, customer_id, result)
+            unavailable.append(name)
+            result = None
+        components[name] = result
+
+    # CMS content is already serialized for JSON; the rest are response models
+    content = {
+        name: components[name] if name == "cms" else jsonable_encoder(components[name])
+        for name in HOME_COMPONENTS if name in components
+    }
+    content["unavailable"] = unavailable
+    return MongoJSONResponse(content)
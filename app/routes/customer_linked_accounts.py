@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -9,6 +10,10 @@ from app.core.auth import get_current_customer
 from app.schemas.linked_account import *
 from app.crud import crud_linked_account
 from app.crud.crud_linked_account import crud_linked_account
+from app.crud.crud_customer import crud_customer
+from app.services.phone_directory import phone_directory
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/customer", tags=["Linked Accounts"])
 
@@ -22,7 +27,7 @@ async def add_linked_account(
     Add a linked account (family member/friend) to your account.
     The linked phone number will receive OTP for verification (simulated).
     """
-    print(f"DEBUG: Adding linked account - Primary: {current_customer.customer_id}, Linked: {linked_data.linked_phone_number}")
+    logger.debug("Adding linked account - Primary: %s, Linked: %s", current_customer.customer_id, linked_data.linked_phone_number)
     
     # Create the linked account data with primary customer ID
     linked_account_data = LinkedAccountCreate(
@@ -158,6 +163,16 @@ async def recharge_linked_account(
             detail="Linked account not found"
         )
     
+    # Active subscriptions and the registered owner of the number, in one lookup.
+    # Not cached: the answer decides when the new plan activates.
+    directory_entry = phone_directory.resolve(db, linked_account.linked_phone_number, use_cache=False)
+    active_subscriptions = directory_entry["active_subscriptions"] if directory_entry else []
+    subscriber_id = (
+        linked_account.linked_customer_id
+        or (directory_entry and directory_entry["customer_id"])
+        or current_customer.customer_id
+    )
+    
     # Verify plan exists and is active
     plan = db.query(Plan).filter(
         Plan.plan_id == recharge_data.plan_id,
@@ -214,6 +229,9 @@ async def recharge_linked_account(
     )
     
     db.add(transaction)
+    # Any successful payment ends the customer's first-recharge window
+    if current_customer.first_recharge_at is None:
+        crud_customer.mark_first_recharge(db, current_customer.customer_id)
     db.commit()
     db.refresh(transaction)
     
@@ -222,18 +240,12 @@ async def recharge_linked_account(
     
     current_time = datetime.utcnow()
     
-    # Check if linked number has active subscriptions
-    active_subscriptions = db.query(Subscription).filter(
-        Subscription.phone_number == linked_account.linked_phone_number,
-        Subscription.expiry_date > current_time
-    ).order_by(Subscription.expiry_date.desc()).all()
-    
     if plan.is_topup or not active_subscriptions:
         activation_date = current_time
         expiry_date = current_time + timedelta(days=plan.validity_days)
         
         subscription = Subscription(
-            customer_id=linked_account.linked_customer_id or current_customer.customer_id,
+            customer_id=subscriber_id,
             phone_number=linked_account.linked_phone_number,
             plan_id=recharge_data.plan_id,
             transaction_id=transaction.transaction_id,
@@ -247,17 +259,17 @@ async def recharge_linked_account(
         )
         
         db.add(subscription)
+        crud_customer.record_plan_activation(db, subscriber_id, activation_date)
         db.commit()
         
         message = f"Recharge successful for {linked_account.linked_phone_number}! Plan activated immediately."
         
     else:
-        latest_active_subscription = active_subscriptions[0]
-        activation_date = latest_active_subscription.expiry_date
+        activation_date = active_subscriptions[0]["expiry_date"]
         expiry_date = activation_date + timedelta(days=plan.validity_days)
         
         subscription = Subscription(
-            customer_id=linked_account.linked_customer_id or current_customer.customer_id,
+            customer_id=subscriber_id,
             phone_number=linked_account.linked_phone_number,
             plan_id=recharge_data.plan_id,
             transaction_id=transaction.transaction_id,
@@ -277,7 +289,7 @@ async def recharge_linked_account(
         # Get next queue position
         queue_position = subscription_service.get_next_queue_position(
             db, 
-            linked_account.linked_customer_id or current_customer.customer_id, 
+            subscriber_id, 
             linked_account.linked_phone_number
         )
         
@@ -285,7 +297,7 @@ async def recharge_linked_account(
         from app.models.models import SubscriptionActivationQueue
         queue_item = SubscriptionActivationQueue(
             subscription_id=subscription.subscription_id,
-            customer_id=linked_account.linked_customer_id or current_customer.customer_id,
+            customer_id=subscriber_id,
             phone_number=linked_account.linked_phone_number,
             expected_activation_date=activation_date,
             expected_expiry_date=expiry_date,
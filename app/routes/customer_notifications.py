@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, session_scope
 from app.models.models import Customer
 from app.core.auth import get_current_customer
+from app.core.metrics import notification_stream_events
 from app.schemas.notification import NotificationResponse, NotificationStats, MarkAsReadRequest
 from app.crud.crud_notification import crud_notification
+from app.services.notification_hub import notification_hub, notification_event
 
 router = APIRouter(prefix="/customer/notifications", tags=["Customer Notifications"])
 
@@ -35,6 +41,79 @@ async def get_notification_stats(
     stats = crud_notification.get_notification_stats(db, current_customer.customer_id)
     return NotificationStats(**stats)
 
+def _format_event(notification: Dict[str, Any]) -> str:
+    data = json.dumps(notification, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {notification['notification_id']}\nevent: notification\ndata: {data}\n\n"
+
+def _missed_notifications(customer_id: int, after_id: int) -> List[Dict[str, Any]]:
+    with session_scope() as db:
+        return [
+            notification_event(notification)
+            for notification in crud_notification.get_customer_notifications_after(
+                db, customer_id, after_id, settings.NOTIFICATION_STREAM_REPLAY_LIMIT
+            )
+        ]
+
+async def _notification_stream(customer_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    # Subscribe before reading missed notifications so nothing committed in
+    # between is lost; live events already replayed are skipped by id
+    queue = notification_hub.subscribe(customer_id)
+    try:
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n"
+
+        # Replay page by page until caught up; live ids are above everything
+        # missed, so going live early would skip the rest for good
+        while last_event_id is not None:
+            missed = await asyncio.to_thread(_missed_notifications, customer_id, last_event_id)
+            for notification in missed:
+                notification_stream_events.labels("replay").inc()
+                last_event_id = notification["notification_id"]
+                yield _format_event(notification)
+            if len(missed) < settings.NOTIFICATION_STREAM_REPLAY_LIMIT:
+                break
+
+        # Keep-alives start at HEARTBEAT_MIN and back off while the stream is idle
+        heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_MIN
+        while True:
+            try:
+                notification = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                heartbeat = min(heartbeat * 2, settings.NOTIFICATION_STREAM_HEARTBEAT_MAX)
+                continue
+
+            if notification is None:
+                # Fell behind or shutting down; the client reconnects with Last-Event-ID
+                break
+            if last_event_id is not None and notification["notification_id"] <= last_event_id:
+                continue
+            last_event_id = notification["notification_id"]
+            heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_MIN
+            yield _format_event(notification)
+    finally:
+        notification_hub.unsubscribe(customer_id, queue)
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None, description="Last notification_id received; missed notifications are replayed"),
+    current_customer: Customer = Depends(get_current_customer),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events stream of the customer's new notifications, replacing
+    polling of the inbox and stats. Each event's id is the notification_id;
+    reconnect with Last-Event-ID to receive what was missed.
+    """
+    customer_id = current_customer.customer_id
+    # The stream stays open for a long time; return the authentication
+    # session's connection to the pool now rather than when it ends
+    db.close()
+    return StreamingResponse(
+        _notification_stream(customer_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/mark-read")
 async def mark_notifications_as_read(
     read_request: MarkAsReadRequest,
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -9,6 +10,8 @@ from app.core.auth import get_current_customer
 from app.schemas.postpaid import *
 from app.crud import crud_postpaid
 
+logger = logging.getLogger(__name__)
+
 
 # ==========================================================
 # POSTPAID PLAN BROWSING
@@ -208,7 +211,7 @@ async def activate_postpaid_plan(
     Activate a postpaid plan for a primary phone number.
     Note: Each phone number can have only one active postpaid plan at a time.
     """
-    print(f"DEBUG: Activation request received - Customer: {current_customer.customer_id}, Plan: {activation_data.plan_id}, Number: {activation_data.primary_number}")
+    logger.debug("Activation request received - Customer: %s, Plan: %s, Number: %s", current_customer.customer_id, activation_data.plan_id, activation_data.primary_number)
     
     activation, error_message = crud_postpaid.create_activation(
         db, current_customer.customer_id, 
@@ -217,7 +220,7 @@ async def activate_postpaid_plan(
     
     if not activation:
         error_detail = error_message or "Failed to activate postpaid plan"
-        print(f"DEBUG: Activation failed - {error_detail}")
+        logger.debug("Activation failed - %s", error_detail)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error_detail
@@ -240,7 +243,7 @@ async def activate_postpaid_plan(
         "status": activation.status
     }
     
-    print(f"DEBUG: Activation successful - Activation ID: {activation.activation_id}")
+    logger.debug("Activation successful - Activation ID: %s", activation.activation_id)
     return PostpaidActivationResponse(**response_data)
 
 @activations_router.get("/activation", response_model=List[PostpaidActivationResponse])
@@ -253,7 +256,7 @@ async def get_customer_postpaid_activations(
     Includes activations where customer is primary owner OR secondary number.
     """
     # Get all activations where this customer is involved (primary or secondary)
-    activations = crud_postpaid.get_activations_for_customer(
+    activations = crud_postpaid.get_customer_activation_summaries(
         db, 
         current_customer.customer_id, 
         current_customer.phone_number
@@ -265,41 +268,7 @@ async def get_customer_postpaid_activations(
             detail="No active postpaid plans found for your account"
         )
     
-    response_activations = []
-    for activation in activations:
-        plan = db.query(Plan).filter(Plan.plan_id == activation.plan_id).first()
-        
-        # Get secondary numbers for this activation
-        secondary_numbers = crud_postpaid.get_secondary_numbers(db, activation.activation_id)
-        
-        # Check if current customer is primary owner or secondary number
-        is_primary_owner = (activation.customer_id == current_customer.customer_id)
-        
-        response_data = {
-            "activation_id": activation.activation_id,
-            "plan_name": plan.plan_name if plan else "Unknown",
-            "primary_number": activation.primary_number,
-            "billing_cycle_start": activation.billing_cycle_start,
-            "billing_cycle_end": activation.billing_cycle_end,
-            "base_data_allowance_gb": float(activation.base_data_allowance_gb),
-            "current_data_balance_gb": float(activation.current_data_balance_gb),
-            "data_used_gb": float(activation.data_used_gb),
-            "base_amount": float(activation.base_amount),
-            "total_amount_due": float(activation.total_amount_due),
-            "status": activation.status,
-            "secondary_numbers": [
-                {
-                    "secondary_id": sec.secondary_id,
-                    "phone_number": sec.phone_number,
-                    "added_date": sec.added_date
-                } for sec in secondary_numbers
-            ],
-            "user_role": "primary_owner" if is_primary_owner else "secondary_number"
-        }
-        
-        response_activations.append(PostpaidActivationResponse(**response_data))
-    
-    return response_activations
+    return [PostpaidActivationResponse(**activation) for activation in activations]
 
 
 # ==========================================================
@@ -411,7 +380,7 @@ async def add_secondary_number(
     """
     Add a secondary number to postpaid plan.
     """
-    print(f"DEBUG: Adding secondary number request - Activation: {secondary_data.activation_id}, Number: {secondary_data.phone_number}")
+    logger.debug("Adding secondary number request - Activation: %s, Number: %s", secondary_data.activation_id, secondary_data.phone_number)
     
     # Verify the activation belongs to the current customer
     activation = crud_postpaid.get_activation_by_id(db, secondary_data.activation_id)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter(tags=["Metrics"])
+
+# ==========================================================
+# PROMETHEUS SCRAPE ENDPOINT
+# ==========================================================
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """
+    Application metrics in Prometheus text exposition format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
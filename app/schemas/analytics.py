@@ -165,6 +165,14 @@ class KPIResponse(BaseModel):
     target_value: Any
     status: str  # positive, negative, neutral
 
+class RealTimeMetricsSnapshot(BaseModel):
+    """Rolling-window metrics; current_customers counts registrations within the window"""
+    generated_at: datetime
+    last_minute: RealTimeMetrics
+    last_hour: RealTimeMetrics
+    last_day: RealTimeMetrics
+    kpis: List[KPIResponse]  # last hour against the hour before
+
 class ChartDataPoint(BaseModel):
     label: str
     value: Any
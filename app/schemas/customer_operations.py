@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
 from app.models.models import AccountStatus, TransactionType, PaymentMethod, PaymentStatus
+from app.schemas.cms import CMSListResponse
+from app.schemas.notification import NotificationStats
 
 class CustomerProfileResponse(BaseModel):
     customer_id: int
@@ -109,4 +111,13 @@ class RechargeResponse(BaseModel):
     plan_name: str
     final_amount: float
     payment_status: PaymentStatus
-    message: str
\ No newline at end of file
+    message: str
+
+class CustomerHomeResponse(BaseModel):
+    """Launch payload; components not requested through `fields` are omitted"""
+    profile: Optional[CustomerProfileResponse] = None
+    active_subscriptions: Optional[List[CustomerSubscriptionResponse]] = None
+    notification_stats: Optional[NotificationStats] = None
+    cms: Optional[CMSListResponse] = None
+    plans: Optional[List[PlanResponseForCustomer]] = None
+    unavailable: List[str] = []
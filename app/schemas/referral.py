@@ -73,6 +73,10 @@ class ReferralConfig(BaseModel):
     default_expiry_days: int = 30
     default_max_uses: int = 1
 
+class ReferralCodeBatchResponse(BaseModel):
+    count: int
+    codes: List[str]
+
 class SystemReferralStats(BaseModel):
     total_referral_programs: int
     active_referral_programs: int
@@ -1,38 +1,147 @@
+import logging
 import asyncio
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.config import settings
+from app.database import session_scope
+from app.core.metrics import background_job_duration
 from app.services.subscription_service import subscription_service
 from app.services.automated_notifications import automated_notifications
 from app.models.models import Subscription, ActiveTopup, PostpaidActivation
 from app.crud.crud_token import crud_token
+from app.crud.crud_notification_counter import crud_notification_counter
+from app.services.retention_service import retention_service
+from app.services.dashboard_counters import dashboard_counters
+from app.services.inactivity_service import inactivity_service
+from app.services.realtime_metrics import realtime_metrics
+
+logger = logging.getLogger(__name__)
 
 async def process_expired_subscriptions_periodically():
     """Background task to process expired subscriptions every hour"""
     while True:
         try:
-            db = SessionLocal()
+            with background_job_duration.time("automated_notifications"), session_scope() as db:
+                # Process expired subscriptions first
+                subscription_service.process_expired_subscriptions(db)
+                
+                # Check for upcoming expiries and send notifications
+                await check_upcoming_expiries(db)
+                
+                # Check for low data balance (200MB threshold)
+                await check_low_data_balance(db)
+                
+                # Check for postpaid bill due dates
+                await check_postpaid_due_dates(db)
+            
+            logger.info("Processed automated notifications")
             
-            # Process expired subscriptions first
-            subscription_service.process_expired_subscriptions(db)
+        except Exception as e:
+            logger.error("Error processing automated notifications: %s", e)
+        
+        # Wait for 1 hour before next run
+        await asyncio.sleep(3600)
+        
+def expire_subscriptions():
+    """Remove ended plans, activate queued ones and refresh those customers' activity state"""
+    with background_job_duration.time("subscription_expiry"), session_scope() as db:
+        return subscription_service.process_expired_subscriptions(db)
+
+async def expire_subscriptions_periodically():
+    """Background task for subscription expiry, off the event loop"""
+    while True:
+        try:
+            activated = await asyncio.to_thread(expire_subscriptions)
+            if activated:
+                logger.info("Activated queued plans for %s customers", activated)
             
-            # Check for upcoming expiries and send notifications
-            await check_upcoming_expiries(db)
+        except Exception as e:
+            logger.error("Error processing expired subscriptions: %s", e)
+        
+        await asyncio.sleep(settings.SUBSCRIPTION_EXPIRY_INTERVAL)
+        
+def reconcile_notification_counters():
+    """Correct inbox and global notification counters that drifted from the notifications table"""
+    with background_job_duration.time("notification_counter_reconcile"), session_scope() as db:
+        return crud_notification_counter.reconcile(db)
+
+async def reconcile_notification_counters_periodically():
+    """Background task to reconcile notification counters, off the event loop"""
+    while True:
+        try:
+            result = await asyncio.to_thread(reconcile_notification_counters)
+            if result is not None:
+                logger.info(
+                    "Reconciled notification counters: %s customers and %s global counters corrected",
+                    result["customers"], result["global_counters"]
+                )
             
-            # Check for low data balance (200MB threshold)
-            await check_low_data_balance(db)
+        except Exception as e:
+            logger.error("Error reconciling notification counters: %s", e)
+        
+        await asyncio.sleep(settings.NOTIFICATION_COUNTER_RECONCILE_INTERVAL)
+        
+def reconcile_dashboard_counters():
+    """Rebuild the admin dashboard counters from SQL"""
+    with background_job_duration.time("dashboard_counter_reconcile"), session_scope() as db:
+        dashboard_counters.reconcile(db)
+
+async def reconcile_dashboard_counters_periodically():
+    """Background task to correct dashboard counter drift, off the event loop"""
+    while True:
+        try:
+            await asyncio.to_thread(reconcile_dashboard_counters)
             
-            # Check for postpaid bill due dates
-            await check_postpaid_due_dates(db)
+        except Exception as e:
+            logger.error("Error reconciling dashboard counters: %s", e)
+        
+        await asyncio.sleep(settings.DASHBOARD_COUNTER_RECONCILE_INTERVAL)
+        
+def run_inactivity_recompute():
+    """Recompute days_inactive for all customers and send inactivity warnings"""
+    with background_job_duration.time("inactivity_recompute"), session_scope() as db:
+        return inactivity_service.run(db)
+
+async def run_inactivity_recompute_nightly():
+    """Background task for the daily inactivity recompute at INACTIVITY_RECOMPUTE_TIME, off the event loop"""
+    while True:
+        await asyncio.sleep(inactivity_service.seconds_until_next_run())
+        try:
+            result = await asyncio.to_thread(run_inactivity_recompute)
+            if result is not None:
+                logger.info(
+                    "Inactivity recompute: %s customers updated, warnings sent %s",
+                    result["customers_updated"], result["warnings_sent"]
+                )
             
-            db.close()
-            print("✅ Processed automated notifications")
+        except Exception as e:
+            logger.error("Error recomputing customer inactivity: %s", e)
+        
+def seed_realtime_metrics():
+    """Load the last day of events into the live dashboard windows"""
+    with background_job_duration.time("realtime_metrics_seed"), session_scope() as db:
+        realtime_metrics.seed(db)
+
+def run_retention_maintenance():
+    """Create upcoming notification partitions and archive expired months"""
+    with background_job_duration.time("notification_retention"), session_scope() as db:
+        return retention_service.run_maintenance(db)
+
+async def run_retention_maintenance_periodically():
+    """Background task for notification partitioning and retention, off the event loop"""
+    while True:
+        try:
+            result = await asyncio.to_thread(run_retention_maintenance)
+            if result is not None:
+                logger.info(
+                    "Retention maintenance: %s partitions created, %s notifications archived",
+                    len(result["created_partitions"]), result["archived_rows"]
+                )
             
         except Exception as e:
-            print(f"❌ Error processing automated notifications: {e}")
+            logger.error("Error during retention maintenance: %s", e)
         
-        # Wait for 1 hour before next run
-        await asyncio.sleep(3600)
+        await asyncio.sleep(settings.RETENTION_MAINTENANCE_INTERVAL)
         
 async def check_upcoming_expiries(db: Session):
     """Check for subscriptions/topups expiring soon and send notifications"""
@@ -58,7 +167,7 @@ async def check_upcoming_expiries(db: Session):
                 subscription.plan.plan_name, 
                 subscription.expiry_date
             )
-            print(f"📅 Sent expiry notification for subscription {subscription.subscription_id}")
+            logger.info("Sent expiry notification for subscription %s", subscription.subscription_id)
     
     # Check topups expiring soon
     upcoming_topups = db.query(ActiveTopup).filter(
@@ -77,7 +186,7 @@ async def check_upcoming_expiries(db: Session):
                 f"Topup {topup.topup_data_gb}GB",
                 topup.expiry_date
             )
-            print(f"📅 Sent expiry notification for topup {topup.topup_id}")
+            logger.info("Sent expiry notification for topup %s", topup.topup_id)
 
 async def check_low_data_balance(db: Session):
     """Check for low data balance and send notifications - 200MB threshold"""
@@ -98,7 +207,7 @@ async def check_low_data_balance(db: Session):
             subscription.customer_id,
             balance_mb 
         )
-        print(f"⚠️ Sent low balance notification for subscription {subscription.subscription_id}: {balance_mb:.0f}MB")
+        logger.info("Sent low balance notification for subscription %s: %.0fMB", subscription.subscription_id, balance_mb)
     
     # Check postpaid activations with low data (< 200MB)
     low_balance_postpaid = db.query(PostpaidActivation).filter(
@@ -114,7 +223,7 @@ async def check_low_data_balance(db: Session):
             activation.customer_id,
             balance_mb   
         )
-        print(f"⚠️ Sent low balance notification for postpaid activation {activation.activation_id}: {balance_mb:.0f}MB")
+        logger.info("Sent low balance notification for postpaid activation %s: %.0fMB", activation.activation_id, balance_mb)
         
 async def check_postpaid_due_dates(db: Session):
     """Check for postpaid bills due soon"""
@@ -139,13 +248,13 @@ async def check_postpaid_due_dates(db: Session):
             f"Your postpaid bill of ₹{activation.total_amount_due} is due in {days_until_due} days. Please pay before {activation.billing_cycle_end.strftime('%d %b %Y')}.",
             "push"
         )
-        print(f"💳 Sent due date notification for postpaid activation {activation.activation_id}")
+        logger.info("Sent due date notification for postpaid activation %s", activation.activation_id)
         
 
 def cleanup_expired_tokens(db: Session):
     """Clean up expired blacklisted tokens"""
     try:
         deleted_count = crud_token.cleanup_expired_tokens(db)
-        print(f"Cleaned up {deleted_count} expired blacklisted tokens")
+        logger.info("Cleaned up %s expired blacklisted tokens", deleted_count)
     except Exception as e:
-        print(f"Error cleaning up expired tokens: {e}")
\ No newline at end of file
+        logger.error("Error cleaning up expired tokens: %s", e)
\ No newline at end of file
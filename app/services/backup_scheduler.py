@@ -1,11 +1,15 @@
+import logging
 import asyncio
 from datetime import datetime, time, timedelta  
 from typing import Dict, Any
 from sqlalchemy.orm import Session
 from app.services.backup_service import backup_service
-from app.database import get_db
+from app.database import session_scope
+from app.core.metrics import background_job_duration
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 class BackupScheduler:
     def __init__(self):
         self.schedule = {}
@@ -80,7 +84,7 @@ class BackupScheduler:
             return
         
         self.is_running = True
-        print("Backup scheduler started")
+        logger.info("Backup scheduler started")
         
         while self.is_running:
             await self._check_schedule()
@@ -89,7 +93,7 @@ class BackupScheduler:
     async def stop(self):
         """Stop the backup scheduler"""
         self.is_running = False
-        print("Backup scheduler stopped")
+        logger.info("Backup scheduler stopped")
     
     async def _check_schedule(self):
         """Check if it's time to run scheduled backup"""
@@ -99,17 +103,17 @@ class BackupScheduler:
         now = datetime.now()
         
         if self.schedule['next_run'] and now >= self.schedule['next_run']:
-            print(f"Running scheduled {self.schedule['frequency']} backup...")
+            logger.info("Running scheduled %s backup...", self.schedule['frequency'])
             
             # Perform backup 
             try:
-                db = next(get_db())
-                result = backup_service.perform_backup(db, admin_id=1, backup_type='auto')
+                with background_job_duration.time("scheduled_backup"), session_scope() as db:
+                    result = backup_service.perform_backup(db, admin_id=1, backup_type='auto')
                 
                 if result['success']:
-                    print(f"Automated backup completed successfully: {result['backup_id']}")
+                    logger.info("Automated backup completed successfully: %s", result['backup_id'])
                 else:
-                    print(f"Automated backup failed: {result['error']}")
+                    logger.error("Automated backup failed: %s", result['error'])
                 
                 # Update schedule
                 self.schedule['last_run'] = now
@@ -119,7 +123,7 @@ class BackupScheduler:
                 )
                 
             except Exception as e:
-                print(f"Error during automated backup: {e}")
+                logger.error("Error during automated backup: %s", e)
     
     def get_schedule_status(self) -> Dict[str, Any]:
         """Get current schedule status"""
@@ -1,3 +1,4 @@
+import logging
 import os
 import json
 import zipfile
@@ -7,6 +8,8 @@ from sqlalchemy.orm import Session
 from app.crud.crud_backup_restore import crud_backup_restore
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 class BackupService:
     def __init__(self):
         self.backup_dir = "backups"
@@ -121,7 +124,7 @@ class BackupService:
                 db.commit()
                 
         except Exception as e:
-            print(f"Error cleaning up old backups: {e}")
+            logger.error("Error cleaning up old backups: %s", e)
     
     def get_backup_schedule_options(self) -> Dict[str, Any]:
         """Get available backup schedule options"""
@@ -0,0 +1,253 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.models import Customer, PaymentStatus, Subscription, Transaction
+from app.schemas.analytics import ChartDataPoint, ChartDataset, ChartResponse
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip; each batch is reduced to NumPy arrays before the next
+BATCH_SIZE = 50000
+
+
+def _months(values) -> np.ndarray:
+    """Months since 1970-01 for a sequence of dates or datetimes"""
+    # NumPy parses datetime objects one by one at several microseconds each;
+    # reading year and month off them is over ten times faster
+    return np.array([value.year * 12 + value.month for value in values], dtype=np.int64) - (1970 * 12 + 1)
+
+
+def _sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """np.unique for integer keys; sorting and dropping repeats avoids its much slower hash path on NumPy 2"""
+    keys = np.sort(keys)
+    if len(keys) < 2:
+        return keys
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+
+def _month_label(month: int) -> str:
+    return str(np.datetime64(int(month), "M"))
+
+
+def _month_start(month: int) -> datetime:
+    return np.datetime64(int(month), "M").astype("datetime64[s]").astype(datetime)
+
+
+def _batches(db: Session, statement):
+    """Rows of `statement` as column tuples, streamed BATCH_SIZE at a time"""
+    result = db.execute(statement.execution_options(yield_per=BATCH_SIZE))
+    for partition in result.partitions():
+        yield tuple(zip(*partition))
+
+
+@dataclass
+class CustomerActivity:
+    """
+    Monthly activity over a window of `span` calendar months starting at
+    `start_month`. A customer is active in a month if they recharged in it or
+    had a subscription running during it; active pairs are encoded as
+    customer_id * span + month offset, sorted and unique.
+    """
+    start_month: int
+    span: int
+    active_keys: np.ndarray
+    revenue: np.ndarray  # successful recharge revenue per month offset
+    signup_customers: np.ndarray  # customers who signed up in the window, sorted
+    signup_offsets: np.ndarray  # their signup month offsets
+
+
+class CohortAnalyticsEngine:
+    """
+    Cohort retention, churn and ARPU over complete calendar months. The
+    columns involved are streamed from SQL in batches, each reduced with NumPy
+    to (customer, month) activity keys and monthly revenue, and the charts are
+    computed from those arrays without per-row Python. Results are cached for
+    the rest of the day.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[date, int], Dict[str, ChartResponse]] = {}
+
+    def load(self, db: Session, months: int, today: date) -> CustomerActivity:
+        end_month = int(_months([today])[0])  # exclusive: the current month is incomplete
+        start_month = end_month - months
+        window_start, window_end = _month_start(start_month), _month_start(end_month)
+
+        return self.build_activity(
+            start_month, months,
+            transactions=_batches(db, select(
+                Transaction.customer_id, Transaction.transaction_date, Transaction.final_amount
+            ).where(
+                Transaction.payment_status == PaymentStatus.success,
+                Transaction.transaction_date >= window_start,
+                Transaction.transaction_date < window_end
+            )),
+            subscriptions=_batches(db, select(
+                Subscription.customer_id, Subscription.activation_date, Subscription.expiry_date
+            ).where(
+                Subscription.activation_date.isnot(None),
+                Subscription.activation_date < window_end,
+                Subscription.expiry_date >= window_start
+            )),
+            signups=_batches(db, select(Customer.customer_id, Customer.created_at).where(
+                Customer.created_at >= window_start,
+                Customer.created_at < window_end
+            ))
+        )
+
+    def build_activity(self, start_month: int, months: int, transactions: Iterable[tuple],
+                       subscriptions: Iterable[tuple], signups: Iterable[tuple]) -> CustomerActivity:
+        """
+        Reduce column batches, as _batches() yields them, to CustomerActivity:
+        (customer_ids, transaction_dates, amounts) for successful recharges,
+        (customer_ids, activation_dates, expiry_dates) for subscriptions and
+        (customer_ids, created_at) for signups, all within the window.
+        """
+        key_batches: List[np.ndarray] = []
+        revenue = np.zeros(months)
+
+        for customer_ids, transaction_dates, amounts in transactions:
+            offsets = _months(transaction_dates) - start_month
+            revenue += np.bincount(offsets, weights=np.array(amounts, dtype=np.float64), minlength=months)
+            key_batches.append(_sorted_unique(np.array(customer_ids, dtype=np.int64) * months + offsets))
+
+        for customer_ids, activation_dates, expiry_dates in subscriptions:
+            # Expand each subscription to every window month it covers
+            first = np.maximum(_months(activation_dates) - start_month, 0)
+            last = np.minimum(_months(expiry_dates) - start_month, months - 1)
+            lengths = np.maximum(last - first + 1, 0)
+            covered = np.repeat(first, lengths) + (
+                np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            )
+            keys = np.repeat(np.array(customer_ids, dtype=np.int64), lengths) * months + covered
+            key_batches.append(_sorted_unique(keys))
+
+        signup_customers, signup_offsets = [], []
+        for customer_ids, created_at in signups:
+            signup_customers.append(np.array(customer_ids, dtype=np.int64))
+            signup_offsets.append(_months(created_at) - start_month)
+
+        customers = np.concatenate(signup_customers) if signup_customers else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate(signup_offsets) if signup_offsets else np.zeros(0, dtype=np.int64)
+        order = np.argsort(customers, kind="stable")
+
+        return CustomerActivity(
+            start_month=start_month,
+            span=months,
+            active_keys=_sorted_unique(np.concatenate(key_batches)) if key_batches else np.zeros(0, dtype=np.int64),
+            revenue=revenue,
+            signup_customers=customers[order],
+            signup_offsets=offsets[order]
+        )
+
+    def retention(self, activity: CustomerActivity) -> ChartResponse:
+        """Share of each signup cohort active N months after signup"""
+        span = activity.span
+        customers, months = np.divmod(activity.active_keys, span)
+
+        position = np.searchsorted(activity.signup_customers, customers)
+        position = np.minimum(position, max(len(activity.signup_customers) - 1, 0))
+        in_cohort = (
+            (activity.signup_customers[position] == customers)
+            if len(activity.signup_customers) else np.zeros(len(customers), dtype=bool)
+        )
+        cohorts = activity.signup_offsets[position[in_cohort]]
+        ages = months[in_cohort] - cohorts
+        counted = ages >= 0
+
+        active = np.bincount(cohorts[counted] * span + ages[counted], minlength=span * span).reshape(span, span)
+        sizes = np.bincount(activity.signup_offsets, minlength=span)
+
+        labels = [f"Month {age}" for age in range(span)]
+        datasets = []
+        for cohort in range(span):
+            if not sizes[cohort]:
+                continue
+            rates = np.round(active[cohort, :span - cohort] / sizes[cohort] * 100, 1)
+            datasets.append(ChartDataset(
+                label=f"{_month_label(activity.start_month + cohort)} ({sizes[cohort]} customers)",
+                data=[ChartDataPoint(label=labels[age], value=float(rate)) for age, rate in enumerate(rates)]
+            ))
+        return ChartResponse(type="line", labels=labels, datasets=datasets, options={"unit": "%"})
+
+    def churn(self, activity: CustomerActivity) -> ChartResponse:
+        """Share of customers active in a month who are not active in the next"""
+        span = activity.span
+        keys = activity.active_keys
+        months = keys % span
+
+        following = keys + 1
+        position = np.minimum(np.searchsorted(keys, following), max(len(keys) - 1, 0))
+        retained = (keys[position] == following) if len(keys) else np.zeros(0, dtype=bool)
+        churned = ~retained & (months < span - 1)
+
+        active = np.bincount(months, minlength=span)
+        lost = np.bincount(months[churned], minlength=span)
+        rates = np.divide(lost, active, out=np.zeros(span), where=active > 0) * 100
+
+        labels = [_month_label(activity.start_month + month) for month in range(1, span)]
+        return ChartResponse(
+            type="line",
+            labels=labels,
+            datasets=[
+                ChartDataset(
+                    label="Churn rate (%)",
+                    data=[ChartDataPoint(label=label, value=round(float(rate), 1)) for label, rate in zip(labels, rates[:-1])]
+                ),
+                ChartDataset(
+                    label="Customers lost",
+                    data=[ChartDataPoint(label=label, value=int(count)) for label, count in zip(labels, lost[:-1])]
+                ),
+            ],
+            options={"unit": "%"}
+        )
+
+    def arpu(self, activity: CustomerActivity) -> ChartResponse:
+        """Recharge revenue per active customer, by month"""
+        span = activity.span
+        active = np.bincount(activity.active_keys % span, minlength=span)
+        arpu = np.divide(activity.revenue, active, out=np.zeros(span), where=active > 0)
+
+        labels = [_month_label(activity.start_month + month) for month in range(span)]
+        return ChartResponse(
+            type="bar",
+            labels=labels,
+            datasets=[
+                ChartDataset(
+                    label="ARPU (₹)",
+                    data=[ChartDataPoint(label=label, value=round(float(value), 2)) for label, value in zip(labels, arpu)]
+                ),
+                ChartDataset(
+                    label="Active customers",
+                    data=[ChartDataPoint(label=label, value=int(count)) for label, count in zip(labels, active)]
+                ),
+            ],
+            options={"currency": "INR"}
+        )
+
+    def report(self, db: Session, months: int) -> Dict[str, ChartResponse]:
+        """All three charts for the last `months` complete months, computed once per day"""
+        today = datetime.utcnow().date()
+        with self._lock:
+            cached = self._cache.get((today, months))
+            if cached is not None:
+                return cached
+
+            activity = self.load(db, months, today)
+            report = {
+                "retention": self.retention(activity),
+                "churn": self.churn(activity),
+                "arpu": self.arpu(activity),
+            }
+            # Keep only today's results
+            self._cache = {key: value for key, value in self._cache.items() if key[0] == today}
+            self._cache[(today, months)] = report
+            return report
+
+cohort_analytics = CohortAnalyticsEngine()
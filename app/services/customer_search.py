@@ -0,0 +1,198 @@
+import bisect
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.core.session_events import on_commit, on_flush, stage
+from app.models.models import Customer
+
+_PHONE_FORMATTING = re.compile(r"[\s\-+().]")
+
+
+def normalize_phone_query(term: str) -> Optional[str]:
+    """Digits of a phone-number query such as '98765 43210', or None if the term is not one"""
+    stripped = _PHONE_FORMATTING.sub("", term)
+    return stripped if stripped.isdigit() else None
+
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def phone_filter(column, term: str):
+    """
+    Phone number condition for admin filters. Digit-only queries match as a
+    prefix, which the text_pattern_ops indexes serve; anything else falls back
+    to a substring match.
+    """
+    digits = normalize_phone_query(term)
+    if digits is not None:
+        return column.like(f"{escape_like(digits)}%", escape="\\")
+    return column.ilike(f"%{escape_like(term.strip())}%", escape="\\")
+
+
+def name_filter(column, term: str):
+    """Case-insensitive substring match, served by the pg_trgm GIN index"""
+    return column.ilike(f"%{escape_like(term.strip())}%", escape="\\")
+
+
+def _trigrams(value: str) -> Set[str]:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class LocalSearchIndex:
+    """
+    In-process phone and name index, used where pg_trgm is unavailable
+    (SQLite test and development setups). Loaded from the customers table on
+    first use and kept current from committed sessions in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        self._phones: List[Tuple[str, int]] = []
+        self._name_trigrams: Dict[str, Set[int]] = {}
+
+    def _add(self, customer_id: int, phone_number: str, full_name: str):
+        self._remove(customer_id)
+        name = full_name.lower()
+        self._entries[customer_id] = (phone_number, name)
+        bisect.insort(self._phones, (phone_number, customer_id))
+        for trigram in _trigrams(name):
+            self._name_trigrams.setdefault(trigram, set()).add(customer_id)
+
+    def _remove(self, customer_id: int):
+        entry = self._entries.pop(customer_id, None)
+        if entry is None:
+            return
+        phone_number, name = entry
+        position = bisect.bisect_left(self._phones, (phone_number, customer_id))
+        if position < len(self._phones) and self._phones[position] == (phone_number, customer_id):
+            del self._phones[position]
+        for trigram in _trigrams(name):
+            postings = self._name_trigrams.get(trigram)
+            if postings:
+                postings.discard(customer_id)
+
+    def load(self, db: Session):
+        with self._lock:
+            if self.loaded:
+                return
+            rows = db.query(Customer.customer_id, Customer.phone_number, Customer.full_name).filter(
+                Customer.deleted_at.is_(None)
+            ).all()
+            for customer_id, phone_number, full_name in rows:
+                self._add(customer_id, phone_number, full_name)
+            self.loaded = True
+
+    def apply(self, changes: List[Tuple[int, Optional[str], Optional[str]]]):
+        """Apply committed (customer_id, phone_number, full_name) rows; None phone means removed"""
+        with self._lock:
+            if not self.loaded:
+                return
+            for customer_id, phone_number, full_name in changes:
+                if phone_number is None:
+                    self._remove(customer_id)
+                else:
+                    self._add(customer_id, phone_number, full_name or "")
+
+    def search(self, term: str, limit: int) -> List[int]:
+        """Ranked customer ids: exact phone, phone prefix, name prefix, then name similarity"""
+        with self._lock:
+            digits = normalize_phone_query(term)
+            if digits is not None:
+                start = bisect.bisect_left(self._phones, (digits, -1))
+                matches = []
+                for phone_number, customer_id in self._phones[start:]:
+                    if not phone_number.startswith(digits):
+                        break
+                    matches.append((len(phone_number), phone_number, customer_id))
+                return [customer_id for _, _, customer_id in sorted(matches)[:limit]]
+
+            needle = term.strip().lower()
+            term_trigrams = {t for t in _trigrams(needle) if t.strip() == t} if len(needle) >= 3 else set()
+            if term_trigrams:
+                candidates = set.intersection(*(self._name_trigrams.get(t, set()) for t in term_trigrams))
+            else:
+                candidates = self._entries.keys()
+
+            query_trigrams = _trigrams(needle)
+            ranked = []
+            for customer_id in candidates:
+                name = self._entries[customer_id][1]
+                if needle in name:
+                    ranked.append((
+                        not name.startswith(needle),
+                        -_similarity(query_trigrams, _trigrams(name)),
+                        customer_id
+                    ))
+            return [customer_id for _, _, customer_id in sorted(ranked)[:limit]]
+
+
+class CustomerSearchService:
+    """
+    Ranked admin customer lookup. On PostgreSQL, digit-only queries use the
+    phone prefix index and names use the pg_trgm GIN index, ranked by
+    trigram similarity. Other databases use LocalSearchIndex.
+    """
+
+    def __init__(self):
+        self.local_index = LocalSearchIndex()
+
+    def search(self, db: Session, search_term: str, skip: int = 0, limit: int = 50) -> List[Customer]:
+        term = search_term.strip()
+        if not term:
+            return []
+
+        if db.bind.dialect.name != "postgresql":
+            self.local_index.load(db)
+            customer_ids = self.local_index.search(term, skip + limit)[skip:]
+            if not customer_ids:
+                return []
+            customers = {
+                customer.customer_id: customer
+                for customer in db.query(Customer).filter(Customer.customer_id.in_(customer_ids))
+            }
+            return [customers[customer_id] for customer_id in customer_ids if customer_id in customers]
+
+        query = db.query(Customer).filter(Customer.deleted_at.is_(None))
+        digits = normalize_phone_query(term)
+        if digits is not None:
+            query = query.filter(phone_filter(Customer.phone_number, digits)).order_by(
+                func.length(Customer.phone_number), Customer.phone_number
+            )
+        else:
+            prefix = f"{escape_like(term)}%"
+            query = query.filter(name_filter(Customer.full_name, term)).order_by(
+                case((Customer.full_name.ilike(prefix, escape="\\"), 0), else_=1),
+                func.similarity(Customer.full_name, term).desc(),
+                Customer.customer_id
+            )
+        return query.offset(skip).limit(limit).all()
+
+customer_search = CustomerSearchService()
+
+
+# Keep the local index current once customer rows commit
+@on_flush(Customer)
+def _collect_search_rows(session, new, dirty, deleted):
+    if not customer_search.local_index.loaded:
+        return
+    changes = [
+        (obj.customer_id, None if obj.deleted_at is not None else obj.phone_number, obj.full_name)
+        for obj in new + dirty
+    ]
+    changes.extend((obj.customer_id, None, None) for obj in deleted)
+    stage(session, "customer_search_rows", changes)
+
+
+@on_commit("customer_search_rows")
+def _apply_search_rows(staged):
+    customer_search.local_index.apply([change for changes in staged for change in changes])
@@ -0,0 +1,353 @@
+import json
+import logging
+import threading
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.session_events import on_commit, on_flush, stage
+from app.models.models import Customer, Plan, Transaction, PaymentStatus
+
+try:
+    import redis
+except ImportError:  # optional; the in-process store is used without it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+TOTAL_CUSTOMERS = "total_customers"
+TOTAL_TRANSACTIONS = "total_transactions"
+TOTAL_REVENUE = "total_revenue"
+
+
+def _revenue_today_key(day: date) -> str:
+    return f"revenue_today:{day.isoformat()}"
+
+
+def _new_customers_key(day: date) -> str:
+    return f"new_customers:{day.isoformat()}"
+
+
+def _plan_count_key(plan_id: int) -> str:
+    return f"plan_transactions:{plan_id}"
+
+
+def _plan_revenue_key(plan_id: int) -> str:
+    return f"plan_revenue:{plan_id}"
+
+
+# A counted row: ("transaction" or "customer", its id, the counter increments)
+CountedRow = Tuple[str, int, Dict[str, float]]
+
+
+class LocalCounterStore:
+    """Counters held in this process, shared by all of its threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = {}
+        self._journal: Optional[List[CountedRow]] = None
+
+    def incr_rows(self, rows: List[CountedRow]):
+        with self._lock:
+            for _, _, amounts in rows:
+                for key, amount in amounts.items():
+                    self._values[key] = self._values.get(key, 0) + amount
+            if self._journal is not None:
+                self._journal.extend(rows)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        with self._lock:
+            return {key: self._values.get(key, 0) for key in keys}
+
+    def get_prefixed(self, prefix: str) -> Dict[str, float]:
+        with self._lock:
+            return {key: value for key, value in self._values.items() if key.startswith(prefix)}
+
+    def acquire_reconcile(self, seconds: int) -> bool:
+        return True  # only this process's threads share these counters
+
+    def begin_reconcile(self, seconds: int):
+        """Journal rows counted from now on, until finish_reconcile() or cancel_reconcile()"""
+        with self._lock:
+            self._journal = []
+
+    def finish_reconcile(self, values: Dict[str, float], watermarks: Dict[str, int]):
+        """
+        Replace the counters with `values`, computed from SQL over rows up to
+        `watermarks`, plus the journaled rows above them, which SQL did not see.
+        """
+        with self._lock:
+            rebuilt = dict(values)
+            for kind, row_id, amounts in self._journal or ():
+                if row_id > watermarks[kind]:
+                    for key, amount in amounts.items():
+                        rebuilt[key] = rebuilt.get(key, 0) + amount
+            self._values = rebuilt
+            self._journal = None
+
+    def cancel_reconcile(self):
+        with self._lock:
+            self._journal = None
+
+
+# Both scripts run atomically in Redis, so no increment lands between reading
+# the journal and rewriting the hash
+_RECORD_SCRIPT = """
+local rows = cjson.decode(ARGV[1])
+for _, row in ipairs(rows) do
+    for key, amount in pairs(row[3]) do
+        redis.call('HINCRBYFLOAT', KEYS[1], key, string.format('%.17g', amount))
+    end
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+"""
+
+_FINISH_RECONCILE_SCRIPT = """
+local values = cjson.decode(ARGV[1])
+local watermarks = cjson.decode(ARGV[2])
+for _, entry in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+    for _, row in ipairs(cjson.decode(entry)) do
+        if row[2] > watermarks[row[1]] then
+            for key, amount in pairs(row[3]) do
+                values[key] = (values[key] or 0) + amount
+            end
+        end
+    end
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+for key, value in pairs(values) do
+    redis.call('HSET', KEYS[1], key, string.format('%.17g', value))
+end
+"""
+
+
+class RedisCounterStore:
+    """Counters in a Redis hash, shared by every worker process"""
+
+    def __init__(self, url: str, hash_key: str = "nexa:dashboard_counters"):
+        self._client = redis.Redis.from_url(url)
+        self._hash_key = hash_key
+        self._journal_key = f"{hash_key}:journal"
+        self._record = self._client.register_script(_RECORD_SCRIPT)
+        self._finish_reconcile = self._client.register_script(_FINISH_RECONCILE_SCRIPT)
+
+    def incr_rows(self, rows: List[CountedRow]):
+        self._record(keys=[self._hash_key, self._journal_key], args=[json.dumps(rows)])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        keys = list(keys)
+        values = self._client.hmget(self._hash_key, keys)
+        return {key: float(value) if value is not None else 0 for key, value in zip(keys, values)}
+
+    def get_prefixed(self, prefix: str) -> Dict[str, float]:
+        return {
+            key.decode(): float(value)
+            for key, value in self._client.hgetall(self._hash_key).items()
+            if key.decode().startswith(prefix)
+        }
+
+    def acquire_reconcile(self, seconds: int) -> bool:
+        """Claim the next `seconds` of reconciling for this worker; False if another has it"""
+        return bool(self._client.set(f"{self._hash_key}:reconcile", 1, nx=True, ex=seconds))
+
+    def begin_reconcile(self, seconds: int):
+        """
+        Start journaling counted rows from every worker. The journal holds an
+        empty entry so it exists, and expires if this worker dies mid-reconcile.
+        """
+        pipeline = self._client.pipeline()
+        pipeline.delete(self._journal_key)
+        pipeline.rpush(self._journal_key, "[]")
+        pipeline.expire(self._journal_key, seconds)
+        pipeline.execute()
+
+    def finish_reconcile(self, values: Dict[str, float], watermarks: Dict[str, int]):
+        """
+        Replace the hash with `values`, computed from SQL over rows up to
+        `watermarks`, plus the journaled rows above them. Counters for past
+        days are not in `values` and are dropped.
+        """
+        self._finish_reconcile(
+            keys=[self._hash_key, self._journal_key], args=[json.dumps(values), json.dumps(watermarks)]
+        )
+
+    def cancel_reconcile(self):
+        self._client.delete(self._journal_key)
+
+
+class DashboardCounterService:
+    """
+    Counters behind /admin/analytics/dashboard. Successful transactions and new
+    customers are counted when their session commits, and reconcile() rebuilds
+    everything from SQL periodically to absorb drift (other workers without a
+    shared store, deletes, manual edits). With a shared store, one worker per
+    DASHBOARD_COUNTER_RECONCILE_INTERVAL does the rebuild.
+    """
+
+    def __init__(self):
+        if settings.REDIS_URL and redis is not None:
+            self.store = RedisCounterStore(settings.REDIS_URL)
+        else:
+            if settings.REDIS_URL:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-process counters")
+            self.store = LocalCounterStore()
+        self._plan_names: Dict[int, str] = {}
+        self._reconciled = False
+        self._reconcile_lock = threading.Lock()
+
+    # Write path
+    def record(self, transactions: List[Tuple[int, int, float]], customer_ids: List[int]):
+        """
+        Count committed successful transactions, given as (transaction_id,
+        plan_id, final_amount), and new customers. Ids let a concurrent
+        reconcile tell rows its SQL snapshot saw from rows it did not.
+        """
+        today = datetime.utcnow().date()
+        rows: List[CountedRow] = []
+
+        for transaction_id, plan_id, revenue in transactions:
+            rows.append(("transaction", transaction_id, {
+                TOTAL_TRANSACTIONS: 1,
+                TOTAL_REVENUE: revenue,
+                _revenue_today_key(today): revenue,
+                _plan_count_key(plan_id): 1,
+                _plan_revenue_key(plan_id): revenue,
+            }))
+
+        for customer_id in customer_ids:
+            rows.append(("customer", customer_id, {TOTAL_CUSTOMERS: 1, _new_customers_key(today): 1}))
+
+        if rows:
+            self.store.incr_rows(rows)
+
+    # Reconciliation
+    def refresh_plan_names(self, db: Session):
+        self._plan_names = dict(db.query(Plan.plan_id, Plan.plan_name).all())
+
+    def reconcile(self, db: Session):
+        """
+        Rebuild every counter from SQL, unless another worker has just done so.
+        SQL covers rows up to the highest transaction and customer ids at the
+        start; rows counted after that are journaled by the store and added
+        back, so commits made during the rebuild are kept.
+        """
+        self.refresh_plan_names(db)
+        if not self.store.acquire_reconcile(settings.DASHBOARD_COUNTER_RECONCILE_INTERVAL):
+            self._reconciled = True
+            return
+
+        self.store.begin_reconcile(settings.DASHBOARD_COUNTER_RECONCILE_INTERVAL)
+        try:
+            watermarks = {
+                "transaction": db.query(func.max(Transaction.transaction_id)).scalar() or 0,
+                "customer": db.query(func.max(Customer.customer_id)).scalar() or 0,
+            }
+            self.store.finish_reconcile(self._sql_values(db, watermarks), watermarks)
+        except Exception:
+            self.store.cancel_reconcile()
+            raise
+        self._reconciled = True
+
+    def _sql_values(self, db: Session, watermarks: Dict[str, int]) -> Dict[str, float]:
+        today = datetime.utcnow().date()
+        customers = Customer.customer_id <= watermarks["customer"]
+        successful = and_(Transaction.payment_status == "success", Transaction.transaction_id <= watermarks["transaction"])
+
+        values: Dict[str, float] = {
+            TOTAL_CUSTOMERS: db.query(func.count(Customer.customer_id)).filter(customers).scalar() or 0,
+            _new_customers_key(today): db.query(func.count(Customer.customer_id)).filter(
+                customers, func.date(Customer.created_at) == today
+            ).scalar() or 0,
+            _revenue_today_key(today): float(db.query(func.sum(Transaction.final_amount)).filter(
+                func.date(Transaction.transaction_date) == today, successful
+            ).scalar() or 0),
+        }
+
+        total_transactions, total_revenue = 0, 0.0
+        for plan_id, count, revenue in db.query(
+            Transaction.plan_id,
+            func.count(Transaction.transaction_id), func.sum(Transaction.final_amount)
+        ).filter(successful).group_by(Transaction.plan_id):
+            values[_plan_count_key(plan_id)] = count
+            values[_plan_revenue_key(plan_id)] = float(revenue or 0)
+            total_transactions += count
+            total_revenue += float(revenue or 0)
+
+        values[TOTAL_TRANSACTIONS] = total_transactions
+        values[TOTAL_REVENUE] = total_revenue
+        return values
+
+    def ensure_reconciled(self, db_factory):
+        if self._reconciled:
+            return
+        with self._reconcile_lock:
+            if not self._reconciled:
+                with db_factory() as db:
+                    self.reconcile(db)
+
+    # Read path
+    def get_dashboard(self, db_factory, top_plans: int = 3):
+        today = datetime.utcnow().date()
+        totals = self.store.get_many([
+            TOTAL_CUSTOMERS, TOTAL_TRANSACTIONS, TOTAL_REVENUE,
+            _revenue_today_key(today), _new_customers_key(today)
+        ])
+
+        plan_counts = self.store.get_prefixed("plan_transactions:")
+        plan_revenue = self.store.get_prefixed("plan_revenue:")
+        ranked = sorted(
+            ((int(key.split(":", 1)[1]), count) for key, count in plan_counts.items() if count),
+            key=lambda item: item[1], reverse=True
+        )[:top_plans]
+
+        # A plan created since the last reconcile
+        if any(plan_id not in self._plan_names for plan_id, _ in ranked):
+            with db_factory() as db:
+                self.refresh_plan_names(db)
+
+        return {
+            "today": {
+                "revenue": f"₹{float(totals[_revenue_today_key(today)]):,.2f}",
+                "new_customers": int(totals[_new_customers_key(today)])
+            },
+            "overview": {
+                "total_customers": int(totals[TOTAL_CUSTOMERS]),
+                "total_transactions": int(totals[TOTAL_TRANSACTIONS]),
+                "total_revenue": f"₹{float(totals[TOTAL_REVENUE]):,.2f}"
+            },
+            "top_plans": [
+                {
+                    "name": self._plan_names.get(plan_id, "Unknown"),
+                    "transactions": int(count),
+                    "revenue": f"₹{plan_revenue.get(_plan_revenue_key(plan_id), 0):,.2f}"
+                }
+                for plan_id, count in ranked
+            ]
+        }
+
+dashboard_counters = DashboardCounterService()
+
+
+# Count rows once their transaction commits; rolled back work is discarded
+@on_flush(Transaction, Customer)
+def _collect_dashboard_rows(session, new, dirty, deleted):
+    transactions = [
+        (obj.transaction_id, obj.plan_id, float(obj.final_amount or 0))
+        for obj in new
+        if isinstance(obj, Transaction) and obj.payment_status in (PaymentStatus.success, "success")
+    ]
+    customer_ids = [obj.customer_id for obj in new if isinstance(obj, Customer)]
+    if transactions or customer_ids:
+        stage(session, "dashboard_counter_rows", (transactions, customer_ids))
+
+
+@on_commit("dashboard_counter_rows")
+def _apply_dashboard_rows(staged):
+    dashboard_counters.record(
+        [row for transactions, _ in staged for row in transactions],
+        [customer_id for _, customer_ids in staged for customer_id in customer_ids]
+    )
@@ -0,0 +1,190 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import and_, cast, exists, func, select, update, Integer
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.models import Customer, Subscription, NotificationType, NotificationChannel
+from app.crud.crud_notification import crud_notification
+from app.database import advisory_lock
+from app.schemas.notification import NotificationCreate
+from app.services.notification_service import notification_service
+
+logger = logging.getLogger(__name__)
+
+# advisory_lock key held by the worker running the nightly job
+INACTIVITY_LOCK_KEY = 0x494E4143  # "INAC"
+
+
+def _days_since(db: Session, column, now: datetime):
+    """Whole days between `column` and `now`, as timedelta.days would count them"""
+    if db.bind.dialect.name == "postgresql":
+        return cast(func.floor(func.extract("epoch", now - column) / 86400), Integer)
+    return cast(func.julianday(now) - func.julianday(column), Integer)
+
+
+class InactivityService:
+    """
+    Nightly, set-based recompute of customers' activity state. Customers are
+    processed in customer_id ranges of INACTIVITY_CHUNK_SIZE, two statements
+    per range: an UPDATE ... FROM the latest active subscription per customer,
+    and an UPDATE of days_inactive for everyone without one, counted from the
+    last active plan or, for customers who never had one, from sign-up. Only
+    rows whose values change are written. Customers reaching one of
+    INACTIVITY_WARNING_DAYS then get an inactivity_warning notification, in
+    batches.
+    """
+
+    def _recompute(self, db: Session, customer_condition, subscription_condition, now: datetime) -> int:
+        """Recompute the customers matching `customer_condition` (the same set, on Subscription.customer_id)"""
+        latest_active = select(
+            Subscription.customer_id,
+            func.max(Subscription.activation_date).label("latest_activation")
+        ).where(
+            subscription_condition,
+            Subscription.expiry_date > now
+        ).group_by(Subscription.customer_id).subquery()
+
+        active = db.execute(
+            update(Customer)
+            .where(
+                customer_condition,
+                Customer.customer_id == latest_active.c.customer_id,
+                (Customer.days_inactive != 0)
+                | Customer.days_inactive.is_(None)
+                | Customer.last_active_plan_date.is_(None)
+                | (Customer.last_active_plan_date != latest_active.c.latest_activation)
+                | Customer.inactivity_warning_days.isnot(None)
+            )
+            .values(
+                last_active_plan_date=latest_active.c.latest_activation,
+                days_inactive=0,
+                inactivity_warning_days=None,
+                inactivity_status_updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        days = func.coalesce(
+            _days_since(db, func.coalesce(Customer.last_active_plan_date, Customer.created_at), now), 0
+        )
+        has_active_subscription = exists().where(
+            Subscription.customer_id == Customer.customer_id,
+            Subscription.expiry_date > now
+        )
+        inactive = db.execute(
+            update(Customer)
+            .where(
+                customer_condition,
+                ~has_active_subscription,
+                Customer.days_inactive.is_(None) | (Customer.days_inactive != days)
+            )
+            .values(days_inactive=days, inactivity_status_updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        db.commit()
+        return active + inactive
+
+    def recompute(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Recompute last_active_plan_date/days_inactive for every customer; returns rows changed"""
+        now = now or datetime.utcnow()
+        low, high = db.query(func.min(Customer.customer_id), func.max(Customer.customer_id)).one()
+        if low is None:
+            return 0
+
+        changed = 0
+        for start in range(low, high + 1, settings.INACTIVITY_CHUNK_SIZE):
+            end = start + settings.INACTIVITY_CHUNK_SIZE
+            changed += self._recompute(
+                db,
+                and_(Customer.customer_id >= start, Customer.customer_id < end),
+                and_(Subscription.customer_id >= start, Subscription.customer_id < end),
+                now
+            )
+        return changed
+
+    def recompute_customers(self, db: Session, customer_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+        """Recompute activity state for specific customers, e.g. after their plans expire"""
+        customer_ids = sorted(set(customer_ids))
+        if not customer_ids:
+            return 0
+        return self._recompute(
+            db,
+            Customer.customer_id.in_(customer_ids),
+            Subscription.customer_id.in_(customer_ids),
+            now or datetime.utcnow()
+        )
+
+    def _claim_warnings(self, db: Session, threshold: int) -> List[int]:
+        """
+        Mark up to INACTIVITY_NOTIFICATION_BATCH_SIZE customers at `threshold`
+        as warned and return them. The conditional UPDATE makes each warning
+        go out once, however many times or places the job runs.
+        """
+        claimable = select(Customer.customer_id).where(
+            Customer.days_inactive == threshold,
+            Customer.deleted_at.is_(None),
+            Customer.inactivity_warning_days.is_(None) | (Customer.inactivity_warning_days != threshold)
+        ).order_by(Customer.customer_id).limit(settings.INACTIVITY_NOTIFICATION_BATCH_SIZE)
+        if db.bind.dialect.name == "postgresql":
+            claimable = claimable.with_for_update(skip_locked=True)
+
+        return sorted(db.execute(
+            update(Customer)
+            .where(Customer.customer_id.in_(claimable.scalar_subquery()))
+            .values(inactivity_warning_days=threshold)
+            .returning(Customer.customer_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all())
+
+    def send_warnings(self, db: Session) -> Dict[int, int]:
+        """
+        Notify customers whose days_inactive equals one of INACTIVITY_WARNING_DAYS.
+        Run once a day after recompute(), each threshold is reached once; the
+        claim is committed with the notifications, so a rerun sends nothing new.
+        """
+        sent: Dict[int, int] = {}
+
+        for threshold in settings.INACTIVITY_WARNING_DAYS:
+            sent[threshold] = 0
+            while True:
+                customer_ids = self._claim_warnings(db, threshold)
+                if not customer_ids:
+                    db.commit()
+                    break
+
+                notifications = crud_notification.create_bulk_notifications(db, [
+                    NotificationCreate(
+                        customer_id=customer_id,
+                        title="😴 We Miss You",
+                        message=f"You haven't had an active plan for {threshold} days. Recharge now to stay connected.",
+                        type=NotificationType.inactivity_warning,
+                        channel=NotificationChannel.sms
+                    )
+                    for customer_id in customer_ids
+                ])
+                notification_service.send_bulk_notifications(db, notifications)
+
+                sent[threshold] += len(customer_ids)
+        return sent
+
+    def run(self, db: Session) -> Optional[Dict[str, object]]:
+        """Nightly job; runs on one worker at a time, the others return None"""
+        with advisory_lock(INACTIVITY_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return None
+            changed = self.recompute(db)
+            warnings = self.send_warnings(db)
+            return {"customers_updated": changed, "warnings_sent": warnings}
+
+    def seconds_until_next_run(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next INACTIVITY_RECOMPUTE_TIME (HH:MM, UTC)"""
+        now = now or datetime.utcnow()
+        hour, minute = (int(part) for part in settings.INACTIVITY_RECOMPUTE_TIME.split(":"))
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+inactivity_service = InactivityService()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from app.config import settings
+from app.core.metrics import notification_stream_connections, notification_stream_events
+from app.core.session_events import on_commit, on_flush, stage
+from app.models.models import Notification
+from app.services.pg_listener import PG_PAYLOAD_LIMIT, pg_fanout_enabled, pg_notify
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "nexa_notifications"
+
+
+def notification_event(notification: Notification, created_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """JSON-ready stream event for a notification row"""
+    created_at = created_at or notification.created_at
+    return {
+        "notification_id": notification.notification_id,
+        "customer_id": notification.customer_id,
+        "title": notification.title,
+        "message": notification.message,
+        "type": getattr(notification.type, "value", notification.type),
+        "channel": getattr(notification.channel, "value", notification.channel),
+        "is_read": bool(notification.is_read),
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+class NotificationHub:
+    """
+    In-process pub/sub for new notifications, keyed by customer. Each open
+    stream holds a bounded queue; publish() may be called from any thread and
+    hands events to the event loop. A stream that falls NOTIFICATION_STREAM_QUEUE_SIZE
+    events behind is ended, and the client resumes from its Last-Event-ID.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, customer_id: int) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(customer_id, set()).add(queue)
+        notification_stream_connections.labels().inc()
+        return queue
+
+    def unsubscribe(self, customer_id: int, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(customer_id)
+            if queues is None or queue not in queues:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[customer_id]
+        notification_stream_connections.labels().dec()
+
+    def publish(self, events: List[Dict[str, Any]]):
+        """Deliver events to streams open in this process"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            targets = [
+                (queue, notification)
+                for notification in events
+                for queue in self._subscribers.get(notification["customer_id"], ())
+            ]
+        if targets:
+            loop.call_soon_threadsafe(self._deliver, targets)
+
+    @staticmethod
+    def _deliver(targets):
+        for queue, notification in targets:
+            try:
+                queue.put_nowait(notification)
+                notification_stream_events.labels("live").inc()
+            except asyncio.QueueFull:
+                # Too far behind: end the stream (None) and let the client resume
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def close(self):
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            queues = [queue for queues in self._subscribers.values() for queue in queues]
+        loop = self._loop
+        if queues and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, [(queue, None) for queue in queues])
+
+notification_hub = NotificationHub()
+
+
+def _pg_payloads(events: List[Dict[str, Any]]) -> List[str]:
+    """Pack events into JSON arrays that fit a NOTIFY payload"""
+    payloads, batch, size = [], [], 2
+    for notification in events:
+        encoded = json.dumps(notification, separators=(",", ":"))
+        if len(encoded.encode("utf-8")) > PG_PAYLOAD_LIMIT:
+            # Oversized message: announce it without the body, the inbox has the rest
+            encoded = json.dumps({**notification, "message": None}, separators=(",", ":"))
+        if batch and size + len(encoded) + 1 > PG_PAYLOAD_LIMIT:
+            payloads.append("[" + ",".join(batch) + "]")
+            batch, size = [], 2
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        payloads.append("[" + ",".join(batch) + "]")
+    return payloads
+
+
+# Publish notifications once their transaction commits. On PostgreSQL the
+# events go out with pg_notify inside the transaction, so PostgreSQL delivers
+# them to every worker's listener (this one included) only on commit.
+# Elsewhere they are staged and published to this process's hub.
+@on_flush(Notification)
+def _collect_notification_events(session, new, dirty, deleted):
+    if not new:
+        return
+    created_at = datetime.utcnow()
+    events = [notification_event(obj, created_at) for obj in new]
+    if pg_fanout_enabled(session.get_bind()):
+        for payload in _pg_payloads(events):
+            pg_notify(session, PG_CHANNEL, payload)
+    else:
+        stage(session, "notification_stream_events", events)
+
+
+@on_commit("notification_stream_events")
+def _publish_notification_events(staged):
+    notification_hub.publish([event for events in staged for event in events])
@@ -5,6 +5,7 @@ import logging
 from app.models.models import Notification, NotificationChannel, Customer
 from app.crud.crud_notification import crud_notification
 from app.schemas.notification import NotificationCreate
+from app.core.metrics import notifications_dispatched
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +19,19 @@ class NotificationService:
         - SMS: Log to console in Jio/Airtel format (simulation)
         - Push: Send real push notification
         """
+        success = self._dispatch(db, notification)
+        channel = getattr(notification.channel, "value", notification.channel)
+        notifications_dispatched.labels(channel, "sent" if success else "failed").inc()
+        return success
+
+    def _dispatch(self, db: Session, notification: Notification):
         try:
             customer = db.query(Customer).filter(
                 Customer.customer_id == notification.customer_id
             ).first()
             
             if not customer:
-                logger.error(f"Customer not found for notification: {notification.notification_id}")
+                logger.error("Customer not found for notification: %s", notification.notification_id)
                 crud_notification.update_notification_status(
                     db, notification.notification_id, "failed"
                 )
@@ -35,11 +42,11 @@ class NotificationService:
             elif notification.channel == NotificationChannel.push:
                 return self._send_push_notification(db, notification, customer)
             else:
-                logger.error(f"Unknown notification channel: {notification.channel}")
+                logger.error("Unknown notification channel: %s", notification.channel)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error sending notification {notification.notification_id}: {str(e)}")
+            logger.error("Error sending notification %s: %s", notification.notification_id, e)
             crud_notification.update_notification_status(
                 db, notification.notification_id, "failed"
             )
@@ -57,19 +64,11 @@ class NotificationService:
             # Format message based on notification type
             sms_message = self._format_sms_message(notification, provider, formatted_time)
             
-            print("\n" + "─" * 40)
-            print(f"📱 SMS from {provider}")
-            print("─" * 40)
-            print(f"To: {customer.phone_number}")
-            print(f"Time: {formatted_time}")
-            print("─" * 40)
-            print(sms_message)
-            print("─" * 40)
-            print("✅ Delivered")
-            print("─" * 40 + "\n")
-            
-            logger.info(f"SMS Simulation - Provider: {provider}, To: {customer.phone_number}, "
-                    f"Time: {formatted_time}, Message: {notification.message}")
+            logger.info(
+                "SMS Simulation - Provider: %s, To: %s, Time: %s",
+                provider, customer.phone_number, formatted_time,
+                extra={"notification_id": notification.notification_id, "sms_message": sms_message}
+            )
             
             # Update notification status
             crud_notification.update_notification_status(
@@ -78,7 +77,7 @@ class NotificationService:
             return True
             
         except Exception as e:
-            logger.error(f"SMS simulation failed for notification {notification.notification_id}: {str(e)}")
+            logger.error("SMS simulation failed for notification %s: %s", notification.notification_id, e)
             crud_notification.update_notification_status(
                 db, notification.notification_id, "failed", "simulated"
             )
@@ -162,10 +161,10 @@ Please pay to avoid late charges.
         """Send real push notification"""
         try:
             
-            logger.info(f"PUSH Notification - To: {customer.customer_id}, "
-                       f"Customer: {customer.full_name}, "
-                       f"Title: {notification.title}, "
-                       f"Message: {notification.message}")
+            logger.info(
+                "PUSH Notification - To: %s, Customer: %s, Title: %s, Message: %s",
+                customer.customer_id, customer.full_name, notification.title, notification.message
+            )
             
             
             # Simulate successful push delivery
@@ -175,7 +174,7 @@ Please pay to avoid late charges.
             return True
             
         except Exception as e:
-            logger.error(f"Push notification failed for notification {notification.notification_id}: {str(e)}")
+            logger.error("Push notification failed for notification %s: %s", notification.notification_id, e)
             crud_notification.update_notification_status(
                 db, notification.notification_id, "failed", "real"
             )
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+
+try:
+    import psycopg2
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+except ImportError:  # only needed for cross-worker fan-out on PostgreSQL
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+PG_PAYLOAD_LIMIT = 7500
+
+
+def pg_fanout_enabled(bind) -> bool:
+    """Whether events written through `bind` fan out to every worker with LISTEN/NOTIFY"""
+    return (
+        settings.NOTIFICATION_STREAM_PG_NOTIFY
+        and psycopg2 is not None
+        and bind.dialect.name == "postgresql"
+    )
+
+
+def pg_notify(session: Session, channel: str, payload: str):
+    """NOTIFY inside the session's transaction; PostgreSQL delivers it only on commit"""
+    session.connection().execute(
+        text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload}
+    )
+
+
+class PostgresListener:
+    """
+    LISTENs on a dedicated connection and hands the events of each NOTIFY
+    (a JSON array) to the handler registered for its channel, so events
+    committed by any worker reach every worker. Reconnects with backoff.
+    """
+
+    def __init__(self, db_engine, handlers: Dict[str, Callable[[List[Any]], None]]):
+        self.handlers = handlers
+        # psycopg2 takes a libpq URL, without SQLAlchemy's driver suffix
+        self.dsn = db_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self.listening = False
+
+    async def run(self):
+        backoff = 1
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.listening:
+                    backoff = 1
+                self.listening = False
+                logger.warning("PostgreSQL listener disconnected, retrying in %ss: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def _listen(self):
+        connection = await asyncio.to_thread(psycopg2.connect, self.dsn)
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                for channel in self.handlers:
+                    cursor.execute(f"LISTEN {channel}")
+            self.listening = True
+            logger.info("Listening on %s", ", ".join(self.handlers))
+
+            loop.add_reader(connection.fileno(), readable.set)
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    connection.poll()
+                    events: Dict[str, List[Any]] = {}
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        events.setdefault(notify.channel, []).extend(json.loads(notify.payload))
+                    for channel, batch in events.items():
+                        try:
+                            self.handlers[channel](batch)
+                        except Exception as e:
+                            logger.error("Error handling %s events: %s", channel, e)
+            finally:
+                loop.remove_reader(connection.fileno())
+        finally:
+            connection.close()
@@ -0,0 +1,237 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy import BigInteger, DateTime, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.session_events import on_commit, on_flush, stage
+from app.models.models import (
+    Customer, LinkedAccount, PostpaidActivation, PostpaidSecondaryNumber, PostpaidStatus,
+    ReferralProgram, ReferralStatus, Subscription
+)
+
+logger = logging.getLogger(__name__)
+
+_PHONE_FORMATTING = re.compile(r"[\s\-().]")
+
+# Model -> attribute holding a phone number; writes to these invalidate the cache
+_PHONE_COLUMNS = {
+    Customer: "phone_number",
+    LinkedAccount: "linked_phone_number",
+    PostpaidActivation: "primary_number",
+    PostpaidSecondaryNumber: "phone_number",
+    ReferralProgram: "referee_phone_number",
+    Subscription: "phone_number",
+}
+
+
+def to_e164(phone_number: str) -> Optional[str]:
+    """
+    E.164 form (+<country code><number>) of a phone number as entered, or None
+    if it is not one. Numbers without a country code get PHONE_DEFAULT_COUNTRY_CODE.
+    """
+    value = _PHONE_FORMATTING.sub("", phone_number or "")
+    if value.startswith("+"):
+        digits = value[1:]
+    elif value.startswith("00"):
+        digits = value[2:]
+    else:
+        digits = value.lstrip("0") if len(value) == 11 else value
+        if len(digits) == 10:
+            digits = settings.PHONE_DEFAULT_COUNTRY_CODE + digits
+
+    if not digits.isdigit() or not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def stored_forms(e164: str) -> List[str]:
+    """
+    Forms a number may be stored in: for the default country the national
+    digits with and without the trunk 0, and always the full digits
+    """
+    digits = e164[1:]
+    forms = [digits]
+    if digits.startswith(settings.PHONE_DEFAULT_COUNTRY_CODE):
+        national = digits[len(settings.PHONE_DEFAULT_COUNTRY_CODE):]
+        forms[:0] = [national, f"0{national}"]
+    return forms
+
+
+class PhoneDirectoryService:
+    """
+    Resolves a phone number to everything attached to it (owning customer,
+    active postpaid activation as primary or secondary, linked-account
+    relations, active prepaid subscriptions and a pending referral) with one
+    UNION ALL query over the phone indexes of each table. Results are kept in
+    a small LRU keyed by E.164 number, invalidated when a session in this
+    process commits a change to any of those rows and expired after
+    PHONE_DIRECTORY_CACHE_TTL for changes made elsewhere. ORM writes are
+    tracked automatically; Core update()/delete() statements must call
+    stage_invalidation() for the numbers they touch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _query(self, db: Session, forms: List[str]):
+        now = datetime.utcnow()
+        customers = select(
+            literal("customer").label("kind"), Customer.customer_id.label("customer_id"),
+            literal(None, BigInteger).label("record_id"), literal(None, BigInteger).label("related_id"),
+            literal(None, DateTime).label("valid_until")
+        ).where(Customer.phone_number.in_(forms), Customer.deleted_at.is_(None))
+
+        postpaid_primary = select(
+            literal("postpaid_primary"), PostpaidActivation.customer_id,
+            PostpaidActivation.activation_id, PostpaidActivation.customer_id,
+            PostpaidActivation.billing_cycle_end
+        ).where(
+            PostpaidActivation.primary_number.in_(forms),
+            PostpaidActivation.status == PostpaidStatus.active
+        )
+
+        postpaid_secondary = select(
+            literal("postpaid_secondary"), PostpaidSecondaryNumber.customer_id,
+            PostpaidActivation.activation_id, PostpaidActivation.customer_id,
+            PostpaidActivation.billing_cycle_end
+        ).join(
+            PostpaidActivation, PostpaidActivation.activation_id == PostpaidSecondaryNumber.activation_id
+        ).where(
+            PostpaidSecondaryNumber.phone_number.in_(forms),
+            PostpaidActivation.status == PostpaidStatus.active
+        )
+
+        linked = select(
+            literal("linked"), LinkedAccount.linked_customer_id,
+            LinkedAccount.linked_account_id, LinkedAccount.primary_customer_id, literal(None, DateTime)
+        ).where(LinkedAccount.linked_phone_number.in_(forms))
+
+        subscriptions = select(
+            literal("subscription"), Subscription.customer_id,
+            Subscription.subscription_id, Subscription.plan_id, Subscription.expiry_date
+        ).where(Subscription.phone_number.in_(forms), Subscription.expiry_date > now)
+
+        referrals = select(
+            literal("referral"), ReferralProgram.referee_customer_id,
+            ReferralProgram.referral_id, ReferralProgram.referrer_customer_id, ReferralProgram.expires_at
+        ).where(
+            ReferralProgram.referee_phone_number.in_(forms),
+            ReferralProgram.status == ReferralStatus.pending
+        )
+
+        return db.execute(union_all(
+            customers, postpaid_primary, postpaid_secondary, linked, subscriptions, referrals
+        )).all()
+
+    def _build(self, e164: str, rows) -> Dict[str, Any]:
+        resolution = {
+            "e164": e164,
+            "customer_id": None,
+            "postpaid": None,
+            "linked_accounts": [],
+            "active_subscriptions": [],
+            "pending_referral": None,
+        }
+        for kind, customer_id, record_id, related_id, valid_until in rows:
+            if kind == "customer":
+                resolution["customer_id"] = customer_id
+            elif kind in ("postpaid_primary", "postpaid_secondary"):
+                # A primary activation wins over a secondary membership
+                if resolution["postpaid"] is None or kind == "postpaid_primary":
+                    resolution["postpaid"] = {
+                        "activation_id": record_id,
+                        "role": "primary" if kind == "postpaid_primary" else "secondary",
+                        "owner_customer_id": related_id,
+                        "billing_cycle_end": valid_until,
+                    }
+            elif kind == "linked":
+                resolution["linked_accounts"].append({
+                    "linked_account_id": record_id,
+                    "primary_customer_id": related_id,
+                    "linked_customer_id": customer_id,
+                })
+            elif kind == "subscription":
+                resolution["active_subscriptions"].append({
+                    "subscription_id": record_id,
+                    "customer_id": customer_id,
+                    "plan_id": related_id,
+                    "expiry_date": valid_until,
+                })
+            elif kind == "referral":
+                resolution["pending_referral"] = {
+                    "referral_id": record_id,
+                    "referrer_customer_id": related_id,
+                    "expires_at": valid_until,
+                }
+        resolution["active_subscriptions"].sort(key=lambda sub: sub["expiry_date"], reverse=True)
+        return resolution
+
+    def resolve(self, db: Session, phone_number: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Everything attached to a phone number, or None if it is not a valid
+        number. Pass use_cache=False where the answer decides a write.
+        """
+        e164 = to_e164(phone_number)
+        if e164 is None:
+            return None
+
+        if use_cache and settings.PHONE_DIRECTORY_CACHE_SIZE > 0:
+            with self._lock:
+                cached = self._cache.get(e164)
+                if cached and cached[0] > time.monotonic():
+                    self._cache.move_to_end(e164)
+                    return self._without_expired(cached[1])
+
+        resolution = self._build(e164, self._query(db, stored_forms(e164)))
+
+        if settings.PHONE_DIRECTORY_CACHE_SIZE > 0:
+            with self._lock:
+                self._cache[e164] = (time.monotonic() + settings.PHONE_DIRECTORY_CACHE_TTL, resolution)
+                self._cache.move_to_end(e164)
+                while len(self._cache) > settings.PHONE_DIRECTORY_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return resolution
+
+    @staticmethod
+    def _without_expired(resolution: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        subscriptions = resolution["active_subscriptions"]
+        if all(sub["expiry_date"] > now for sub in subscriptions):
+            return resolution
+        return {**resolution, "active_subscriptions": [sub for sub in subscriptions if sub["expiry_date"] > now]}
+
+    def invalidate(self, phone_numbers: Set[str]):
+        with self._lock:
+            for phone_number in phone_numbers:
+                e164 = to_e164(phone_number)
+                if e164:
+                    self._cache.pop(e164, None)
+
+    def stage_invalidation(self, session: Session, phone_numbers: Iterable[str]):
+        """Drop cached resolutions for `phone_numbers` when `session` commits"""
+        numbers = {phone_number for phone_number in phone_numbers if phone_number}
+        if numbers:
+            stage(session, "phone_directory_numbers", numbers)
+
+phone_directory = PhoneDirectoryService()
+
+
+# Drop cached resolutions for numbers whose rows were written, once the
+# transaction commits
+@on_flush(*_PHONE_COLUMNS)
+def _collect_written_numbers(session, new, dirty, deleted):
+    for obj in new + dirty + deleted:
+        # Old values too, so a changed number does not keep a stale entry
+        history = inspect(obj).attrs[_PHONE_COLUMNS[type(obj)]].history
+        phone_directory.stage_invalidation(session, (*history.added, *history.unchanged, *history.deleted))
+
+
+@on_commit("phone_directory_numbers")
+def _invalidate_written_numbers(staged):
+    phone_directory.invalidate(set().union(*staged))
@@ -0,0 +1,238 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.core.session_events import on_commit, on_flush, stage
+from app.models.models import Customer, Notification, PaymentStatus, ReferralProgram, Transaction
+from app.schemas.analytics import KPIResponse, RealTimeMetrics, RealTimeMetricsSnapshot
+from app.services.pg_listener import pg_fanout_enabled, pg_notify
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "nexa_realtime_metrics"
+
+METRICS = (
+    "revenue", "transactions", "failed_transactions", "registrations",
+    "referrals", "referrals_completed", "notifications",
+)
+_INDEX = {name: index for index, name in enumerate(METRICS)}
+
+# Payment failure share over the last hour that degrades system_health,
+# once there are enough attempts to judge
+_HEALTH_MIN_ATTEMPTS = 20
+_HEALTH_WARNING_RATE = 0.10
+_HEALTH_CRITICAL_RATE = 0.25
+
+# Metrics for which a drop, not a rise, is the good direction
+_LOWER_IS_BETTER = {"failed_transactions"}
+
+
+class RollingWindow:
+    """
+    Sums of METRICS over the last `buckets * bucket_seconds` seconds, as a
+    ring of per-bucket sums plus running totals. Adding is O(1); buckets that
+    age out are subtracted from the totals as time advances, each once.
+    """
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._slots = [[0.0] * len(METRICS) for _ in range(buckets)]
+        self._totals = [0.0] * len(METRICS)
+        self._newest: Optional[int] = None
+
+    def _advance(self, bucket: int):
+        if self._newest is None:
+            self._newest = bucket
+            return
+        if bucket <= self._newest:
+            return
+        for step in range(1, min(bucket - self._newest, self.buckets) + 1):
+            slot = self._slots[(self._newest + step) % self.buckets]
+            for index, value in enumerate(slot):
+                if value:
+                    self._totals[index] -= value
+                    slot[index] = 0.0
+        self._newest = bucket
+
+    def add(self, at: float, amounts: Sequence[float]):
+        bucket = int(at // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket <= self._newest - self.buckets:
+            return  # older than the window
+        slot = self._slots[bucket % self.buckets]
+        for index, value in enumerate(amounts):
+            if value:
+                slot[index] += value
+                self._totals[index] += value
+
+    def totals(self, now: float) -> Dict[str, float]:
+        self._advance(int(now // self.bucket_seconds))
+        return {name: self._totals[index] for name, index in _INDEX.items()}
+
+
+def _change_percentage(current: float, previous: float) -> float:
+    if previous == 0:
+        return 100.0 if current else 0.0
+    return round((current - previous) / previous * 100, 2)
+
+
+class RealTimeMetricsService:
+    """
+    In-memory aggregator behind the live admin dashboard. Recharges,
+    registrations, referrals and notifications are counted when their session
+    commits (through LISTEN/NOTIFY on PostgreSQL, so every worker sees every
+    worker's events) into rolling minute, hour and day windows. snapshot()
+    reads only these windows; SQL is used once, by seed(), to cover the day
+    before startup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.windows = {
+            "minute": RollingWindow(1, 60),
+            "hour": RollingWindow(60, 60),
+            # The previous hour is the last two hours minus the last hour
+            "two_hours": RollingWindow(60, 120),
+            "day": RollingWindow(600, 144),
+        }
+
+    def record(self, batches: List[Dict[str, float]], at: Optional[float] = None):
+        """Count committed events, each a {metric: amount} dict"""
+        at = at or time.time()
+        with self._lock:
+            for amounts in batches:
+                vector = [float(amounts.get(name, 0)) for name in METRICS]
+                for window in self.windows.values():
+                    window.add(at, vector)
+
+    def seed(self, db: Session, now: Optional[datetime] = None):
+        """Load the last day's events from SQL into the windows; run once at startup"""
+        now = now or datetime.utcnow()
+        since = now - timedelta(days=1)
+
+        def at(value: datetime) -> float:
+            return value.replace(tzinfo=timezone.utc).timestamp()
+
+        with self._lock:
+            def add(when: datetime, **amounts):
+                vector = [float(amounts.get(name, 0)) for name in METRICS]
+                for window in self.windows.values():
+                    window.add(at(when), vector)
+
+            for when, status, amount in db.query(
+                Transaction.transaction_date, Transaction.payment_status, Transaction.final_amount
+            ).filter(Transaction.transaction_date >= since).yield_per(10000):
+                if status == PaymentStatus.success:
+                    add(when, revenue=float(amount or 0), transactions=1)
+                elif status == PaymentStatus.failed:
+                    add(when, failed_transactions=1)
+
+            for (when,) in db.query(Customer.created_at).filter(Customer.created_at >= since).yield_per(10000):
+                add(when, registrations=1)
+            for (when,) in db.query(ReferralProgram.created_at).filter(
+                ReferralProgram.created_at >= since
+            ).yield_per(10000):
+                add(when, referrals=1)
+            for (when,) in db.query(ReferralProgram.completed_at).filter(
+                ReferralProgram.completed_at >= since
+            ).yield_per(10000):
+                add(when, referrals_completed=1)
+            for (when,) in db.query(Notification.created_at).filter(
+                Notification.created_at >= since
+            ).yield_per(10000):
+                add(when, notifications=1)
+
+    def _metrics(self, totals: Dict[str, float], health: str) -> RealTimeMetrics:
+        return RealTimeMetrics(
+            current_revenue=round(totals["revenue"], 2),
+            current_customers=round(totals["registrations"]),
+            current_transactions=round(totals["transactions"]),
+            system_health=health
+        )
+
+    def snapshot(self) -> RealTimeMetricsSnapshot:
+        now = time.time()
+        with self._lock:
+            totals = {name: window.totals(now) for name, window in self.windows.items()}
+
+        hour = totals["hour"]
+        previous_hour = {name: totals["two_hours"][name] - hour[name] for name in METRICS}
+
+        attempts = hour["transactions"] + hour["failed_transactions"]
+        failure_rate = hour["failed_transactions"] / attempts if attempts else 0.0
+        if attempts < _HEALTH_MIN_ATTEMPTS or failure_rate < _HEALTH_WARNING_RATE:
+            health = "good"
+        elif failure_rate < _HEALTH_CRITICAL_RATE:
+            health = "warning"
+        else:
+            health = "critical"
+
+        kpis = []
+        for name in METRICS:
+            digits = 2 if name == "revenue" else None
+            current, previous = round(hour[name], digits), round(previous_hour[name], digits)
+            direction = (current > previous) - (current < previous)
+            if name in _LOWER_IS_BETTER:
+                direction = -direction
+            kpis.append(KPIResponse(
+                kpi_name=f"{name}_last_hour",
+                current_value=current,
+                previous_value=previous,
+                change_percentage=_change_percentage(current, previous),
+                target_value=None,
+                status={1: "positive", -1: "negative", 0: "neutral"}[direction]
+            ))
+
+        return RealTimeMetricsSnapshot(
+            generated_at=datetime.utcfromtimestamp(now),
+            last_minute=self._metrics(totals["minute"], health),
+            last_hour=self._metrics(hour, health),
+            last_day=self._metrics(totals["day"], health),
+            kpis=kpis
+        )
+
+    def stage(self, session: Session, **amounts: float):
+        """Count events that are not new rows (e.g. a referral completed by UPDATE) when `session` commits"""
+        if pg_fanout_enabled(session.get_bind()):
+            pg_notify(session, PG_CHANNEL, json.dumps([amounts]))
+        else:
+            stage(session, "realtime_metric_events", amounts)
+
+realtime_metrics = RealTimeMetricsService()
+
+
+# Count new rows once their transaction commits, the same way as notification
+# streams: pg_notify inside the transaction on PostgreSQL, otherwise staged and
+# recorded in this process after commit
+@on_flush(Transaction, Customer, ReferralProgram, Notification)
+def _collect_metric_events(session, new, dirty, deleted):
+    amounts: Dict[str, float] = {}
+
+    def add(name, value=1):
+        amounts[name] = amounts.get(name, 0) + value
+
+    for obj in new:
+        if isinstance(obj, Transaction):
+            if obj.payment_status in (PaymentStatus.success, "success"):
+                add("revenue", float(obj.final_amount or 0))
+                add("transactions")
+            elif obj.payment_status in (PaymentStatus.failed, "failed"):
+                add("failed_transactions")
+        elif isinstance(obj, Customer):
+            add("registrations")
+        elif isinstance(obj, ReferralProgram):
+            add("referrals")
+        elif isinstance(obj, Notification):
+            add("notifications")
+
+    if amounts:
+        realtime_metrics.stage(session, **amounts)
+
+
+@on_commit("realtime_metric_events")
+def _record_metric_events(staged):
+    realtime_metrics.record(staged)
@@ -0,0 +1,194 @@
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.crud.crud_notification import notification_retention_start
+from app.crud.crud_notification_counter import crud_notification_counter
+from app.database import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"^notifications_y(\d{4})m(\d{2})$")
+
+# advisory_lock key held by the worker running maintenance
+RETENTION_LOCK_KEY = 0x52455445  # "RETE"
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    years, month_index = divmod(value.month - 1 + months, 12)
+    return datetime(value.year + years, month_index + 1, 1)
+
+
+class RetentionService:
+    """
+    Monthly partitioning, retention and archival for the notifications table.
+
+    On PostgreSQL, notifications is range-partitioned by created_at
+    (migrations/versions/0005). Each month has its own partition, and expired
+    months are archived and then detached and dropped as a whole; stray rows
+    in the default partition are archived and deleted like on other
+    databases, month by month. Archives are gzipped JSON lines under
+    BACKUP_DIR/archive/notifications.
+    """
+
+    def __init__(self):
+        self.archive_dir = os.path.join(settings.BACKUP_DIR, "archive", "notifications")
+
+    def _partition_name(self, month: datetime) -> str:
+        return f"notifications_y{month.year}m{month.month:02d}"
+
+    def is_partitioned(self, db: Session) -> bool:
+        if db.bind.dialect.name != "postgresql":
+            return False
+        return bool(db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'notifications')"
+        )).scalar())
+
+    def _monthly_partitions(self, db: Session) -> List[datetime]:
+        names = db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'notifications'"
+        )).scalars().all()
+
+        months = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def _create_month_partition(self, db: Session, month: datetime):
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self._partition_name(month)} PARTITION OF notifications "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+
+    def ensure_partitions(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """Create partitions for the current month and NOTIFICATION_PARTITION_MONTHS_AHEAD after it"""
+        if not self.is_partitioned(db):
+            return []
+
+        current = _month_start(now or datetime.utcnow())
+        existing = set(self._monthly_partitions(db))
+        created = []
+        for offset in range(settings.NOTIFICATION_PARTITION_MONTHS_AHEAD + 1):
+            month = _add_months(current, offset)
+            if month not in existing:
+                self._create_month_partition(db, month)
+                created.append(self._partition_name(month))
+        db.commit()
+        return created
+
+    def _write_archive(self, db: Session, month: datetime, query: str, params: Dict[str, Any]) -> int:
+        """Stream the rows selected by `query` into the month's archive file"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"notifications_{month.year}_{month.month:02d}.jsonl.gz")
+        temp_path = f"{path}.tmp"
+
+        row_count = 0
+        result = db.execute(text(query).execution_options(yield_per=1000), params)
+        # Append mode: a month archived in several runs keeps every batch
+        with gzip.open(temp_path, "wt", encoding="utf-8") as archive:
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as previous:
+                    for line in previous:
+                        archive.write(line)
+            for row in result.mappings():
+                archive.write(json.dumps(dict(row), default=str, ensure_ascii=False) + "\n")
+                row_count += 1
+
+        if row_count:
+            os.replace(temp_path, path)
+        else:
+            os.remove(temp_path)
+        return row_count
+
+    def _archive_rows(self, db: Session, table: str, cutoff: datetime) -> List[tuple]:
+        """Archive and delete rows of `table` created before `cutoff`, a month at a time"""
+        oldest = db.execute(text(
+            f"SELECT MIN(created_at) FROM {table} WHERE created_at < :cutoff"
+        ), {"cutoff": cutoff}).scalar()
+        if isinstance(oldest, str):
+            oldest = datetime.fromisoformat(oldest)
+
+        archived = []
+        month = _month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            bounds = {"start": month, "end": min(_add_months(month, 1), cutoff)}
+            rows = self._write_archive(
+                db, month,
+                f"SELECT * FROM {table} WHERE created_at >= :start AND created_at < :end "
+                "ORDER BY notification_id",
+                bounds
+            )
+            db.execute(text(
+                f"DELETE FROM {table} WHERE created_at >= :start AND created_at < :end"
+            ), bounds)
+            db.commit()
+            if rows:
+                archived.append((month.strftime("%Y-%m"), rows))
+            month = _add_months(month, 1)
+        return archived
+
+    def archive_expired(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archive and remove notifications older than NOTIFICATION_RETENTION_MONTHS"""
+        cutoff = notification_retention_start(now)
+        if cutoff is None:
+            return {"archived_months": [], "archived_rows": 0}
+
+        archived_months, archived_rows = [], 0
+
+        if self.is_partitioned(db):
+            for month in self._monthly_partitions(db):
+                if _add_months(month, 1) > cutoff:
+                    break
+                partition = self._partition_name(month)
+                archived_rows += self._write_archive(db, month, f"SELECT * FROM {partition}", {})
+                db.execute(text(f"ALTER TABLE notifications DETACH PARTITION {partition}"))
+                db.execute(text(f"DROP TABLE {partition}"))
+                db.commit()
+                archived_months.append(month.strftime("%Y-%m"))
+            # Rows outside every monthly range, e.g. written after their month was dropped
+            archived = self._archive_rows(db, "notifications_default", cutoff)
+        else:
+            archived = self._archive_rows(db, "notifications", cutoff)
+
+        for month, rows in archived:
+            archived_rows += rows
+            if month not in archived_months:
+                archived_months.append(month)
+
+        if archived_rows:
+            crud_notification_counter.reconcile(db)
+            logger.info("Archived %s notifications from %s", archived_rows, ", ".join(sorted(archived_months)))
+
+        return {"archived_months": sorted(archived_months), "archived_rows": archived_rows}
+
+    def run_maintenance(self, db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Create upcoming partitions and archive expired months. Runs on one
+        worker at a time, since two would write the same archive file and
+        detach the same partition; the others return None.
+        """
+        with advisory_lock(RETENTION_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return None
+            created = self.ensure_partitions(db)
+            result = self.archive_expired(db)
+            result["created_partitions"] = created
+            return result
+
+retention_service = RetentionService()
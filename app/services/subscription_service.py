@@ -1,6 +1,14 @@
+import logging
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.database import advisory_lock
 from app.models.models import Subscription, SubscriptionActivationQueue, Customer, Plan
+from app.services.inactivity_service import inactivity_service
+
+logger = logging.getLogger(__name__)
+
+# advisory_lock key held by the worker processing expired subscriptions
+EXPIRY_LOCK_KEY = 0x45585049  # "EXPI"
 
 class SubscriptionService:
     
@@ -19,7 +27,17 @@ class SubscriptionService:
         return (last_position[0] + 1) if last_position else 1
     
     def process_expired_subscriptions(self, db: Session):
-        """Automatically process expired subscriptions and activate queued plans"""
+        """
+        Automatically process expired subscriptions and activate queued plans.
+        Runs on one worker at a time, since two would activate the same queued
+        plan twice; while another holds the lock this returns None.
+        """
+        with advisory_lock(EXPIRY_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return None
+            return self._process_expired_subscriptions(db)
+
+    def _process_expired_subscriptions(self, db: Session) -> int:
         current_time = datetime.utcnow()
         
         # Find all expired BASE plans (is_topup=False) that are activated
@@ -30,12 +48,14 @@ class SubscriptionService:
         ).all()
         
         processed_customers = set()
+        expired_customers = set()
         
         for expired_base_plan in expired_base_plans:
-            print(f"Processing expired BASE plan: {expired_base_plan.subscription_id} for customer {expired_base_plan.customer_id}")
+            logger.info("Processing expired BASE plan: %s for customer %s", expired_base_plan.subscription_id, expired_base_plan.customer_id)
             
             customer_id = expired_base_plan.customer_id
             phone_number = expired_base_plan.phone_number
+            expired_customers.add(customer_id)
             
             db.delete(expired_base_plan)
             db.commit()
@@ -53,7 +73,7 @@ class SubscriptionService:
         ).all()
         
         for expired_topup in expired_topups:
-            print(f"Deleting expired TOPUP: {expired_topup.subscription_id} for customer {expired_topup.customer_id}")
+            logger.info("Deleting expired TOPUP: %s for customer %s", expired_topup.subscription_id, expired_topup.customer_id)
             db.delete(expired_topup)
             db.commit()
         
@@ -76,6 +96,9 @@ class SubscriptionService:
                 if active_base_plans == 0:
                     self.process_customer_queue(db, customer_id, phone_number)
         
+        # Activity state changes here rather than on the next profile read
+        inactivity_service.recompute_customers(db, expired_customers, current_time)
+        
         return len(processed_customers)
     
     def process_customer_queue(self, db: Session, customer_id: int, phone_number: str):
@@ -94,7 +117,7 @@ class SubscriptionService:
         ).first()
         
         if queue_item:
-            print(f"Activating queued BASE plan: {queue_item.subscription_id}")
+            logger.info("Activating queued BASE plan: %s", queue_item.subscription_id)
             
             # Get the subscription
             subscription = db.query(Subscription).filter(
@@ -129,7 +152,7 @@ class SubscriptionService:
                 })
                 
                 db.commit()
-                print(f"✅ Activated BASE plan {subscription.subscription_id} from queue")
+                logger.info("Activated BASE plan %s from queue", subscription.subscription_id)
                 return True
         
         return False
@@ -1,32 +1,71 @@
+import json
 from bson import ObjectId
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Type
+from pydantic import BaseModel
+from starlette.responses import Response
+
+# Exact-type dispatch for BSON scalars that JSON cannot represent
+_BSON_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    ObjectId: str,
+    datetime: datetime.isoformat,
+}
 
 def bson_to_json(data: Dict[str, Any]) -> Dict[str, Any]:
     """Convert BSON document to JSON serializable format"""
-    print(f"bson_to_json input: {data}")
-    
     if not data:
-        print("bson_to_json: Input data is empty")
         return data
-    
+
     result = {}
-    for key, value in data.items():
-        print(f"Processing key: {key}, value: {value}, type: {type(value)}")
-        
-        if isinstance(value, ObjectId):
-            result[key] = str(value)
-        elif isinstance(value, datetime):
-            result[key] = value.isoformat()
-        elif isinstance(value, dict):
-            result[key] = bson_to_json(value)
-        elif isinstance(value, list):
-            result[key] = [bson_to_json(item) if isinstance(item, dict) else item for item in value]
-        else:
-            result[key] = value
-    
-    print(f"bson_to_json result: {result}")
+    # Walk nested dicts/lists with an explicit stack instead of recursion
+    stack = [(data.items(), result)]
+    while stack:
+        items, target = stack.pop()
+        for key, value in items:
+            converter = _BSON_CONVERTERS.get(type(value))
+            if converter is not None:
+                value = converter(value)
+            elif isinstance(value, dict):
+                nested = {}
+                stack.append((value.items(), nested))
+                value = nested
+            elif isinstance(value, list):
+                nested = [None] * len(value)
+                stack.append((enumerate(value), nested))
+                value = nested
+            target[key] = value
+
     return result
+
+def mongo_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Projection limited to the fields of a response model (`_id` is always returned)"""
+    return {name: 1 for name in model.model_fields if name != "id"}
+
+def serialize_document(document: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Shape a projected Mongo document like `model` would serialize it, without
+    building the model. Only for documents written by this application.
+    """
+    data = bson_to_json(document)
+    data["id"] = data.pop("_id")
+    for name in model.model_fields:
+        data.setdefault(name, None)
+    return data
+
+async def find_serialized(collection, model: Type[BaseModel], sort_field: str, direction: int) -> List[Dict[str, Any]]:
+    """Fetch a whole collection projected to `model` and serialized for JSON output"""
+    documents = []
+    async for document in collection.find({}, mongo_projection(model)).sort(sort_field, direction):
+        documents.append(serialize_document(document, model))
+    return documents
+
+class MongoJSONResponse(Response):
+    """JSON response for already-serialized Mongo content; skips response model validation"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 def create_timestamps():
     """Create created_at and updated_at timestamps"""
     now = datetime.utcnow()
@@ -34,4 +73,4 @@ def create_timestamps():
 
 def update_timestamp():
     """Create updated_at timestamp"""
-    return {"updated_at": datetime.utcnow()}
\ No newline at end of file
+    return {"updated_at": datetime.utcnow()}
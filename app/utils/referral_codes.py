@@ -0,0 +1,107 @@
+import hashlib
+from typing import List, Optional
+from app.config import settings
+
+# Referral codes are a sequence number run through a keyed Feistel permutation
+# of the 40-bit space, written as 8 Crockford base32 characters plus a Luhn
+# mod 32 check character. Distinct sequence numbers always give distinct
+# codes, and mistyped codes are rejected before touching the database.
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_CHAR_VALUES = {char: value for value, char in enumerate(CROCKFORD_ALPHABET)}
+# Crockford decoding: ambiguous letters read as the digits they resemble
+_CHAR_VALUES.update({"O": 0, "I": 1, "L": 1})
+
+PAYLOAD_LENGTH = 8
+CODE_LENGTH = PAYLOAD_LENGTH + 1
+_DOMAIN_BITS = 5 * PAYLOAD_LENGTH
+_HALF_BITS = _DOMAIN_BITS // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+MAX_SEQUENCE_VALUE = (1 << _DOMAIN_BITS) - 1
+
+
+def _round_keys(secret: str) -> List[int]:
+    digest = hashlib.blake2b(secret.encode("utf-8"), digest_size=4 * _ROUNDS, person=b"referral").digest()
+    return [int.from_bytes(digest[i:i + 4], "big") for i in range(0, len(digest), 4)]
+
+
+_KEYS = _round_keys(settings.REFERRAL_CODE_SECRET or settings.SECRET_KEY)
+
+
+def _round_function(half: int, key: int) -> int:
+    mixed = ((half ^ key) * 0x45D9F3B) & 0xFFFFFFFF
+    mixed ^= mixed >> 16
+    mixed = (mixed * 0x45D9F3B) & 0xFFFFFFFF
+    return (mixed ^ (mixed >> 16)) & _HALF_MASK
+
+
+def permute(value: int) -> int:
+    """Keyed bijection on [0, 2**40)"""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for key in _KEYS:
+        left, right = right, left ^ _round_function(right, key)
+    return (left << _HALF_BITS) | right
+
+
+def unpermute(value: int) -> int:
+    """Inverse of permute()"""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for key in reversed(_KEYS):
+        left, right = right ^ _round_function(left, key), left
+    return (left << _HALF_BITS) | right
+
+
+def _check_character(payload: str) -> str:
+    """
+    Luhn mod 32 check character. Catches every single-character error and
+    every adjacent swap except 0 <-> Z, the mod 32 analogue of Luhn's 09 <-> 90.
+    """
+    total, factor = 0, 2
+    for char in reversed(payload):
+        addend = factor * _CHAR_VALUES[char]
+        total += addend // 32 + addend % 32
+        factor = 1 if factor == 2 else 2
+    return CROCKFORD_ALPHABET[(32 - total % 32) % 32]
+
+
+def encode_referral_code(sequence_value: int) -> str:
+    if not 0 <= sequence_value <= MAX_SEQUENCE_VALUE:
+        raise ValueError("Referral code sequence exhausted")
+
+    number = permute(sequence_value)
+    chars = []
+    for _ in range(PAYLOAD_LENGTH):
+        number, remainder = divmod(number, 32)
+        chars.append(CROCKFORD_ALPHABET[remainder])
+    payload = "".join(reversed(chars))
+    return payload + _check_character(payload)
+
+
+def normalize_referral_code(code: str) -> Optional[str]:
+    """
+    Canonical form of a generated code as typed by a user (any case, hyphens,
+    O/I/L for 0/1/1), or None if it is not a well-formed code with a valid
+    check character.
+    """
+    cleaned = code.strip().upper().replace("-", "")
+    if len(cleaned) != CODE_LENGTH:
+        return None
+    try:
+        canonical = "".join(CROCKFORD_ALPHABET[_CHAR_VALUES[char]] for char in cleaned)
+    except KeyError:
+        return None
+    if _check_character(canonical[:PAYLOAD_LENGTH]) != canonical[-1]:
+        return None
+    return canonical
+
+
+def decode_referral_code(code: str) -> Optional[int]:
+    """Sequence value a code was generated from, or None if the code is malformed"""
+    canonical = normalize_referral_code(code)
+    if canonical is None:
+        return None
+    number = 0
+    for char in canonical[:PAYLOAD_LENGTH]:
+        number = number * 32 + _CHAR_VALUES[char]
+    return unpermute(number)
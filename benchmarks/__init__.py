@@ -0,0 +1,12 @@
+"""
+Runnable microbenchmarks, one module per hot path:
+
+    python -m benchmarks.<module> --help
+
+app.config needs a database URL and a secret at import time; the benchmarks
+never connect to PostgreSQL, so placeholders are filled in when unset.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
@@ -0,0 +1,125 @@
+"""
+CMS payload serialization: GET /admin/cms/overview from Mongo documents to
+response bytes, with per-document models and FastAPI's response_model pass
+(before) against projected, model-free serialization (after).
+
+    python -m benchmarks.bson_serializer [--headers 5] [--carousels 20] [--faqs 40]
+
+The "before" documents carry the fields an admin edit leaves behind that the
+response models drop; the "after" documents are projected with
+mongo_projection(), as the query now asks Mongo to do. Only CPU is measured:
+the smaller documents also save network transfer and BSON decoding, which
+this benchmark does not see.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.cms import CMSListResponse, CarouselResponse, FAQResponse, HeaderResponse
+from app.utils.mongo_utils import MongoJSONResponse, mongo_projection, serialize_document
+from benchmarks.cms_read_path import bson_to_json_logging, carousel_documents
+from benchmarks.timing import best_per_call, report
+
+# Written by the admin routes but not part of any response model
+_UNEXPOSED = {"created_by": "admin@nexa.example", "history": [{"at": datetime(2026, 1, 1), "by": ObjectId()}]}
+
+
+def header_documents(count: int):
+    created = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Festive offers {i}",
+            "description": "Double data on every annual plan this month. " * 2,
+            "button_text": "View plans",
+            "image_url": f"https://cdn.example.com/headers/{i}.webp",
+            "created_at": created + timedelta(days=i),
+            "updated_at": created + timedelta(days=i, hours=2),
+        }
+        for i in range(count)
+    ]
+
+
+def faq_documents(count: int):
+    created = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "question": f"How do I carry forward unused data ({i})?",
+            "answer": "Unused daily data does not carry forward; data add-ons stay valid until the base plan expires. " * 2,
+            "image_url": None,
+            "order": i,
+            "created_at": created + timedelta(hours=i),
+            "updated_at": created + timedelta(hours=i),
+        }
+        for i in range(count)
+    ]
+
+
+def project(documents, model):
+    fields = {"_id", *mongo_projection(model)}
+    return [{key: value for key, value in document.items() if key in fields} for document in documents]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--headers", type=int, default=5)
+    parser.add_argument("--carousels", type=int, default=20)
+    parser.add_argument("--faqs", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    collections = {
+        "headers": (HeaderResponse, header_documents(args.headers)),
+        "carousels": (CarouselResponse, carousel_documents(args.carousels)),
+        "faqs": (FAQResponse, faq_documents(args.faqs)),
+    }
+    full = {name: [{**document, **_UNEXPOSED} for document in documents] for name, (_, documents) in collections.items()}
+    projected = {name: project(documents, model) for name, (model, documents) in collections.items()}
+    response_field = create_response_field(name="Response_get_cms_overview", type_=CMSListResponse)
+    loop = asyncio.new_event_loop()
+
+    def before():
+        content = {}
+        for name, (model, _) in collections.items():
+            items = []
+            for document in full[name]:
+                data = bson_to_json_logging(document)
+                data["id"] = str(document["_id"])
+                items.append(model(**data))
+            content[name] = items
+        validated = loop.run_until_complete(
+            serialize_response(field=response_field, response_content=CMSListResponse(**content))
+        )
+        return JSONResponse(validated).body
+
+    def after():
+        return MongoJSONResponse({
+            name: [serialize_document(document, model) for document in projected[name]]
+            for name, (model, _) in collections.items()
+        }).body
+
+    documents = args.headers + args.carousels + args.faqs
+    number = max(1, 5000 // documents)
+    try:
+        sizes = len(before()), len(after())
+        rows = [
+            ("before (models + response_model)", best_per_call(before, number, args.repeat)),
+            ("after (projected, model-free)", best_per_call(after, number, args.repeat)),
+        ]
+    finally:
+        loop.close()
+
+    report(
+        f"CMS overview payload, {documents} documents ({sizes[0]} and {sizes[1]} response bytes)",
+        rows, baseline="before (models + response_model)",
+    )
+
+
+if __name__ == "__main__":
+    main()
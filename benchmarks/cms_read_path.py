@@ -0,0 +1,128 @@
+"""
+CMS read path: convert a page of carousel documents and build the response
+models, as GET /admin/cms/carousels did before and after print() tracing was
+replaced by logging.
+
+    python -m benchmarks.cms_read_path [--documents 50] [--repeat 5]
+
+"before" is the original bson_to_json, which printed its input, every key and
+its result; stdout goes to os.devnull, so this is the formatting cost alone and
+a terminal or a log pipe only adds to it. "logging" is the same function with
+those lines as logger.debug under setup_logging() at INFO. "current" is the
+bson_to_json in app.utils.mongo_utils.
+"""
+import argparse
+import contextlib
+import logging
+import os
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.schemas.cms import CarouselResponse
+from app.utils.mongo_utils import bson_to_json
+from benchmarks.timing import best_per_call, report
+
+logger = logging.getLogger("benchmarks.cms_read_path")
+
+
+def bson_to_json_print(data):
+    print(f"bson_to_json input: {data}")
+    if not data:
+        print("bson_to_json: Input data is empty")
+        return data
+    result = {}
+    for key, value in data.items():
+        print(f"Processing key: {key}, value: {value}, type: {type(value)}")
+        if isinstance(value, ObjectId):
+            result[key] = str(value)
+        elif isinstance(value, datetime):
+            result[key] = value.isoformat()
+        elif isinstance(value, dict):
+            result[key] = bson_to_json_print(value)
+        elif isinstance(value, list):
+            result[key] = [bson_to_json_print(item) if isinstance(item, dict) else item for item in value]
+        else:
+            result[key] = value
+    print(f"bson_to_json result: {result}")
+    return result
+
+
+def bson_to_json_logging(data):
+    logger.debug("bson_to_json input: %s", data)
+    if not data:
+        logger.debug("bson_to_json: Input data is empty")
+        return data
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, ObjectId):
+            result[key] = str(value)
+        elif isinstance(value, datetime):
+            result[key] = value.isoformat()
+        elif isinstance(value, dict):
+            result[key] = bson_to_json_logging(value)
+        elif isinstance(value, list):
+            result[key] = [bson_to_json_logging(item) if isinstance(item, dict) else item for item in value]
+        else:
+            result[key] = value
+    logger.debug("bson_to_json result: %s", result)
+    return result
+
+
+def carousel_documents(count: int):
+    created = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Unlimited 5G pack {i}",
+            "details": "Truly unlimited calls, 2GB/day and 100 SMS/day for 28 days. " * 3,
+            "price_text": f"₹{199 + i}",
+            "category_id": str(ObjectId()),
+            "image_url": f"https://cdn.example.com/carousels/{i}.webp",
+            "cta_text": "Recharge now",
+            "order": i,
+            "created_at": created + timedelta(hours=i),
+            "updated_at": created + timedelta(days=1, hours=i),
+        }
+        for i in range(count)
+    ]
+
+
+def read_page(convert, documents):
+    page = []
+    for document in documents:
+        data = convert(document)
+        data["id"] = str(document["_id"])
+        page.append(CarouselResponse(**data))
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=50, help="carousel documents per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = carousel_documents(args.documents)
+    number = max(1, 2000 // args.documents)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        before = best_per_call(lambda: read_page(bson_to_json_print, documents), number, args.repeat)
+
+    setup_logging()
+    try:
+        after = best_per_call(lambda: read_page(bson_to_json_logging, documents), number, args.repeat)
+        current = best_per_call(lambda: read_page(bson_to_json, documents), number, args.repeat)
+    finally:
+        shutdown_logging()
+
+    report(
+        f"CMS read path, {args.documents} carousel documents per page",
+        [("before (print tracing)", before), ("logging (DEBUG suppressed)", after), ("current", current)],
+        baseline="before (print tracing)",
+    )
+
+
+if __name__ == "__main__":
+    main()
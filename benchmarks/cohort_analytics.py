@@ -0,0 +1,147 @@
+"""
+Cohort retention, churn and ARPU over synthetic data: the vectorized engine
+in app.services.cohort_analytics against a per-row Python reduction.
+
+    python -m benchmarks.cohort_analytics [--rows 1000000] [--months 12] [--python-rows 1000000]
+
+Rows arrive in BATCH_SIZE column batches of Python ints, datetimes and
+floats, as the database driver hands them over. Time spent generating them
+is excluded, so the engine figure covers conversion, reduction and the three
+charts, but not SQL. --rows 10000000 is the 10M-transaction run; it peaks at
+about 600 MB of memory.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.cohort_analytics import BATCH_SIZE, CohortAnalyticsEngine, _month_start, _months
+
+
+class TimedBatches:
+    """Iterates column batches, keeping the time spent producing them apart"""
+
+    def __init__(self, batches):
+        self._batches = iter(batches)
+        self.spent = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return next(self._batches)
+        finally:
+            self.spent += time.perf_counter() - start
+
+
+def synthetic(rows: int, customers: int, start_month: int, months: int, seed: int):
+    """Transaction, subscription and signup batches for `rows` recharges"""
+    window_start = np.datetime64(_month_start(start_month), "s")
+    seconds = int((np.datetime64(_month_start(start_month + months), "s") - window_start).astype(np.int64))
+
+    def dates(rng, count, low=0):
+        return (window_start + rng.integers(low, seconds, count).astype("timedelta64[s]")).tolist()
+
+    def transactions():
+        rng = np.random.default_rng(seed)
+        for offset in range(0, rows, BATCH_SIZE):
+            count = min(BATCH_SIZE, rows - offset)
+            yield (
+                rng.integers(1, customers + 1, count).tolist(),
+                dates(rng, count),
+                rng.choice([199.0, 299.0, 349.0, 719.0], count).tolist(),
+            )
+
+    def subscriptions():
+        # One 28-day plan for every other recharge
+        rng = np.random.default_rng(seed + 1)
+        total = rows // 2
+        for offset in range(0, total, BATCH_SIZE):
+            count = min(BATCH_SIZE, total - offset)
+            activation = dates(rng, count)
+            yield (
+                rng.integers(1, customers + 1, count).tolist(),
+                activation,
+                [value + timedelta(days=28) for value in activation],
+            )
+
+    def signups():
+        # The first half of the customers signed up inside the window
+        rng = np.random.default_rng(seed + 2)
+        total = customers // 2
+        for offset in range(0, total, BATCH_SIZE):
+            count = min(BATCH_SIZE, total - offset)
+            yield list(range(offset + 1, offset + count + 1)), dates(rng, count)
+
+    return transactions, subscriptions, signups
+
+
+def python_active_pairs(start_month: int, months: int, transactions, subscriptions):
+    """The per-row alternative: a set of (customer, month) pairs and monthly revenue"""
+    active, revenue = set(), [0.0] * months
+    for customer_ids, transaction_dates, amounts in transactions:
+        for customer_id, transaction_date, amount in zip(customer_ids, transaction_dates, amounts):
+            month = (transaction_date.year - 1970) * 12 + transaction_date.month - 1 - start_month
+            active.add((customer_id, month))
+            revenue[month] += amount
+    for customer_ids, activation_dates, expiry_dates in subscriptions:
+        for customer_id, activation, expiry in zip(customer_ids, activation_dates, expiry_dates):
+            first = max((activation.year - 1970) * 12 + activation.month - 1 - start_month, 0)
+            last = min((expiry.year - 1970) * 12 + expiry.month - 1 - start_month, months - 1)
+            for month in range(first, last + 1):
+                active.add((customer_id, month))
+    return active, revenue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="successful recharges")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--customers", type=int, default=None, help="default: rows / 20")
+    parser.add_argument("--python-rows", type=int, default=1_000_000, help="recharges for the per-row comparison")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    customers = args.customers or max(1, args.rows // 20)
+    start_month = int(_months([date.today()])[0]) - args.months
+    engine = CohortAnalyticsEngine()
+
+    transactions, subscriptions, signups = synthetic(args.rows, customers, start_month, args.months, args.seed)
+    sources = [TimedBatches(transactions()), TimedBatches(subscriptions()), TimedBatches(signups())]
+    start = time.perf_counter()
+    activity = engine.build_activity(start_month, args.months, *sources)
+    built = time.perf_counter()
+    charts = [engine.retention(activity), engine.churn(activity), engine.arpu(activity)]
+    charted = time.perf_counter()
+    load = built - start - sum(source.spent for source in sources)
+
+    print(f"Cohort analytics, {args.rows} transactions, {args.rows // 2} subscriptions, "
+          f"{customers} customers, {args.months} months")
+    print(f"  engine: reduce batches     {load:8.2f} s   {load / args.rows * 1e6:6.2f} us/transaction")
+    print(f"  engine: three charts       {charted - built:8.2f} s   "
+          f"({len(activity.active_keys)} active customer-months, {len(charts[0].datasets)} cohorts)")
+
+    if args.python_rows:
+        rows = min(args.python_rows, args.rows)
+        transactions, subscriptions, _ = synthetic(rows, customers, start_month, args.months, args.seed)
+        sources = [TimedBatches(transactions()), TimedBatches(subscriptions())]
+        start = time.perf_counter()
+        active, revenue = python_active_pairs(start_month, args.months, *sources)
+        python = time.perf_counter() - start - sum(source.spent for source in sources)
+
+        transactions, subscriptions, _ = synthetic(rows, customers, start_month, args.months, args.seed)
+        sources = [TimedBatches(transactions()), TimedBatches(subscriptions()), TimedBatches(iter(()))]
+        start = time.perf_counter()
+        subset = engine.build_activity(start_month, args.months, *sources)
+        vectorized = time.perf_counter() - start - sum(source.spent for source in sources)
+        assert len(subset.active_keys) == len(active) and np.allclose(subset.revenue, revenue)
+
+        print(f"  on {rows} transactions: per-row Python {python:.2f} s, engine {vectorized:.2f} s "
+              f"({python / vectorized:.1f}x), same {len(active)} active customer-months")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+App launch latency: the serial /customer/profile, /customer/subscriptions/active,
+/customer/notifications/stats and /customer/plans calls against one
+GET /customer/home, through the full application on a seeded SQLite database.
+
+    python -m benchmarks.customer_home [--iterations 200] [--plans 40] [--rtt-ms 60]
+
+CMS content comes from MongoDB and is left out of both sides unless
+--with-cms is given, which needs MONGODB_URL to reach a server. Requests go
+through TestClient in process, so no network time is measured; --rtt-ms adds
+one round trip per HTTP call to the reported totals, as a mobile client pays.
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Component loaders run on worker threads with their own sessions, so they need
+# one shared database file rather than a private in-memory database each
+_database_file = None
+if os.environ.get("DATABASE_URL", "sqlite://") == "sqlite://":
+    _database_file = tempfile.mkstemp(suffix=".db")[1]
+    os.environ["DATABASE_URL"] = f"sqlite:///{_database_file}"
+# Every request comes from one client
+os.environ.setdefault("RATE_LIMIT_REQUESTS", str(10**9))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.security import create_access_token
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models.models import (
+    Base, Category, Customer, Notification, NotificationChannel, NotificationType, PaymentMethod,
+    PaymentStatus, Plan, PlanType, Subscription, Transaction, TransactionType
+)
+
+SERIAL_PATHS = ["/customer/profile", "/customer/subscriptions/active", "/customer/notifications/stats", "/customer/plans"]
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+def seed(plans: int) -> int:
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.add(Category(category_id=1, category_name="Popular"))
+        for plan_id in range(1, plans + 1):
+            db.add(Plan(plan_id=plan_id, category_id=1, plan_name=f"Plan {plan_id}", plan_type=PlanType.prepaid,
+                        price=99 + plan_id, validity_days=28, description="Unlimited calls"))
+        db.add(Customer(customer_id=1, phone_number="9876543210", password_hash="x", full_name="Bench Customer",
+                        last_active_plan_date=now - timedelta(days=1)))
+        for i in range(1, 3):
+            db.add(Transaction(
+                transaction_id=i, customer_id=1, plan_id=i, recipient_phone_number="9876543210",
+                transaction_type=TransactionType.prepaid_recharge, original_amount=100, final_amount=100,
+                payment_method=PaymentMethod.upi, payment_status=PaymentStatus.success
+            ))
+            db.add(Subscription(
+                subscription_id=i, customer_id=1, phone_number="9876543210", plan_id=i, transaction_id=i,
+                is_topup=i == 2, activation_date=now - timedelta(days=1), expiry_date=now + timedelta(days=27)
+            ))
+        for k in range(50):
+            db.add(Notification(customer_id=1, title="Plan update", message="Your plan changed",
+                                type=NotificationType.plan_expiry, channel=NotificationChannel.sms, is_read=k % 3 == 0))
+        db.commit()
+    return 1
+
+
+def timed(fn, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--plans", type=int, default=40, help="plans in the catalog")
+    parser.add_argument("--rtt-ms", type=float, default=60.0, help="client round trip added per HTTP call")
+    parser.add_argument("--with-cms", action="store_true", help="include CMS content (needs MongoDB)")
+    args = parser.parse_args()
+
+    # Request log lines would otherwise go to stdout with the results
+    logging.getLogger().setLevel(logging.WARNING)
+    customer_id = seed(args.plans)
+    token = create_access_token({"sub": str(customer_id)}, user_type="customer")
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = SERIAL_PATHS + (["/customer/cms/content"] if args.with_cms else [])
+    fields = "" if args.with_cms else "?fields=profile,active_subscriptions,notification_stats,plans"
+
+    # Not used as a context manager, so startup tasks (Mongo, schedulers) stay off
+    client = TestClient(app)
+
+    def serial():
+        for path in paths:
+            assert client.get(path, headers=headers).status_code == 200, path
+
+    def home():
+        response = client.get(f"/customer/home{fields}", headers=headers)
+        assert response.status_code == 200 and response.json()["unavailable"] == [], response.text
+
+    serial(), home()
+    rows = [("serial", len(paths), *timed(serial, args.iterations)), ("/customer/home", 1, *timed(home, args.iterations))]
+
+    print(f"App launch, {args.iterations} iterations, {args.plans} plans, CMS {'included' if args.with_cms else 'left out'}")
+    print(f"  {'':<16} {'calls':>5} {'median':>10} {'p95':>10} {f'median + {args.rtt_ms:g} ms RTT/call':>28}")
+    for label, calls, median, p95 in rows:
+        print(f"  {label:<16} {calls:>5} {median * 1e3:8.2f} ms {p95 * 1e3:7.2f} ms {median * 1e3 + calls * args.rtt_ms:25.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        engine.dispose()
+        if _database_file:
+            os.unlink(_database_file)
@@ -0,0 +1,145 @@
+"""
+Per-request overhead of the logging, rate limit and error middlewares on a
+trivial endpoint: no middleware, the BaseHTTPMiddleware versions they
+replaced, and the pure ASGI versions in app.middleware.
+
+    python -m benchmarks.middleware_overhead [--requests 2000] [--repeat 5]
+
+Requests are driven straight into the ASGI app on one event loop, so the
+numbers are middleware and routing cost with no server or network. The
+request log line is suppressed (level WARNING) to keep stdout out of the
+measurement; it costs the same in every variant.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import ErrorHandlerMiddleware, LoggingMiddleware, RateLimiter
+from benchmarks.timing import best_per_call, report
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logging.getLogger("app.middleware.logging_middleware").info(
+            f"Method: {request.method} | Path: {request.url.path} | Status: {response.status_code} | "
+            f"Process Time: {process_time:.4f}s | Client: {request.client.host if request.client else 'Unknown'}"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class BaseHTTPRateLimiter(BaseHTTPMiddleware):
+    def __init__(self, app, requests: int, window: int):
+        super().__init__(app)
+        self.requests = requests
+        self.window = window
+        self.requests_log = defaultdict(list)
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        current_time = time.time()
+        self.requests_log[client_ip] = [t for t in self.requests_log[client_ip] if current_time - t < self.window]
+        if len(self.requests_log[client_ip]) >= self.requests:
+            raise HTTPException(status_code=429, detail="Rate limit exceeded")
+        self.requests_log[client_ip].append(current_time)
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(self.requests)
+        response.headers["X-RateLimit-Remaining"] = str(self.requests - len(self.requests_log[client_ip]))
+        return response
+
+
+class BaseHTTPErrorHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except HTTPException:
+            raise
+        except ValidationError as e:
+            return JSONResponse(status_code=422, content={"success": False, "details": e.errors()})
+        except Exception:
+            return JSONResponse(status_code=500, content={"success": False, "error": "Internal Server Error"})
+
+
+def build_app(error_handler, rate_limiter, logging_middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    # Same order as app.main: the error handler innermost, logging outermost
+    if error_handler:
+        app.add_middleware(error_handler)
+        app.add_middleware(rate_limiter, requests=10**9, window=3600)
+        app.add_middleware(logging_middleware)
+    return app
+
+
+def _receiver():
+    pending = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Like a server, block until the client disconnects; BaseHTTPMiddleware listens for it
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def drive(app, count: int):
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    for i in range(count):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"testserver")], "server": ("testserver", 80),
+            # Spread over many clients, as the limiter's per-client log is rebuilt on each request
+            "client": (f"10.0.{i // 256 % 256}.{i % 256}", 50000),
+        }
+        await app(scope, _receiver(), send)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("app.middleware").setLevel(logging.WARNING)
+    variants = [
+        ("no middleware", build_app(None, None, None)),
+        ("BaseHTTPMiddleware x3", build_app(BaseHTTPErrorHandlerMiddleware, BaseHTTPRateLimiter, BaseHTTPLoggingMiddleware)),
+        ("pure ASGI x3", build_app(ErrorHandlerMiddleware, RateLimiter, LoggingMiddleware)),
+    ]
+
+    loop = asyncio.new_event_loop()
+    try:
+        rows = [
+            (label, best_per_call(lambda: loop.run_until_complete(drive(app, args.requests)), 1, args.repeat) / args.requests)
+            for label, app in variants
+        ]
+    finally:
+        loop.close()
+
+    report(f"GET /ping, {args.requests} requests, per request", rows, unit="us", baseline="BaseHTTPMiddleware x3")
+    bare = rows[0][1]
+    for label, seconds in rows[1:]:
+        print(f"  {label} adds {(seconds - bare) * 1e6:.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
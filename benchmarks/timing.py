@@ -0,0 +1,19 @@
+"""Timing and reporting helpers shared by the benchmarks"""
+import timeit
+from typing import Callable, Iterable, Tuple
+
+
+def best_per_call(fn: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Fastest of `repeat` runs of `number` calls, in seconds per call"""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def report(title: str, rows: Iterable[Tuple[str, float]], unit: str = "ms", baseline: str = None):
+    """Print one line per (label, seconds) row, with the speed-up over `baseline`"""
+    scale = {"s": 1, "ms": 1e3, "us": 1e6}[unit]
+    rows = list(rows)
+    reference = dict(rows).get(baseline)
+    print(title)
+    for label, seconds in rows:
+        speedup = f"  {reference / seconds:6.1f}x" if reference else ""
+        print(f"  {label:<40} {seconds * scale:12.3f} {unit}{speedup}")
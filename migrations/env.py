@@ -0,0 +1,31 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import settings
+from app.models.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_online():
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        raise RuntimeError("Migrations only apply to PostgreSQL; DATABASE_URL points elsewhere")
+
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    # Revisions inspect the live catalog (index validity, duplicates), so they cannot be rendered as SQL
+    raise RuntimeError("Offline (--sql) mode is not supported; run against the database")
+
+run_migrations_online()
@@ -0,0 +1,35 @@
+"""Shared steps for revisions that build indexes on live tables"""
+from typing import Optional
+
+from alembic import op
+from sqlalchemy import text
+
+
+def index_is_valid(name: str) -> Optional[bool]:
+    """pg_index.indisvalid for `name`, or None when the index does not exist"""
+    return op.get_bind().execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": name}
+    ).scalar()
+
+
+def create_index_concurrently(name: str, on: str, unique: bool = False):
+    """
+    CREATE INDEX CONCURRENTLY without blocking writes. A failed concurrent build
+    leaves an INVALID index that IF NOT EXISTS would skip forever, so one left
+    by an earlier run is dropped first, and the result is checked afterwards.
+    """
+    with op.get_context().autocommit_block():
+        if index_is_valid(name) is False:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {on}")
+        if not index_is_valid(name):
+            raise RuntimeError(f"Index {name} was left INVALID; fix the cause and run the migration again")
+
+
+def drop_index_concurrently(name: str):
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,53 @@
+"""first_recharge_at marker and referral referee indexes
+
+Revision ID: 0001_first_recharge_marker
+Revises:
+Create Date: 2026-10-19
+"""
+import logging
+
+from alembic import op
+from sqlalchemy import text
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0001_first_recharge_marker"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    op.execute("ALTER TABLE customers ADD COLUMN IF NOT EXISTS first_recharge_at TIMESTAMP")
+
+    # Customers who recharged before the marker existed
+    op.execute(
+        "UPDATE customers c SET first_recharge_at = t.first_success "
+        "FROM (SELECT customer_id, MIN(transaction_date) AS first_success FROM transactions "
+        "      WHERE payment_status = 'success' GROUP BY customer_id) t "
+        "WHERE c.customer_id = t.customer_id AND c.first_recharge_at IS NULL"
+    )
+
+    # A referee may belong to one program. Where older data has several, keep the
+    # completed (else earliest) one and detach the rest so the unique index can build
+    detached = op.get_bind().execute(text(
+        "UPDATE referral_program rp SET referee_customer_id = NULL "
+        "FROM (SELECT referral_id, ROW_NUMBER() OVER ("
+        "          PARTITION BY referee_customer_id "
+        "          ORDER BY (status = 'completed') DESC, created_at, referral_id) AS rank "
+        "      FROM referral_program WHERE referee_customer_id IS NOT NULL) ranked "
+        "WHERE rp.referral_id = ranked.referral_id AND ranked.rank > 1"
+    )).rowcount
+    if detached:
+        logger.warning("Detached the referee from %s duplicate referral programs", detached)
+
+    create_index_concurrently("idx_referral_referee_customer", "referral_program (referee_customer_id)", unique=True)
+    create_index_concurrently("idx_referral_referee_phone", "referral_program (referee_phone_number)")
+
+
+def downgrade():
+    drop_index_concurrently("idx_referral_referee_phone")
+    drop_index_concurrently("idx_referral_referee_customer")
+    op.execute("ALTER TABLE customers DROP COLUMN IF EXISTS first_recharge_at")
@@ -0,0 +1,32 @@
+"""pg_trgm and customer search indexes
+
+Revision ID: 0002_customer_search_indexes
+Revises: 0001_first_recharge_marker
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0002_customer_search_indexes"
+down_revision = "0001_first_recharge_marker"
+branch_labels = None
+depends_on = None
+
+SEARCH_INDEXES = [
+    ("idx_customer_name_trgm", "customers USING gin (full_name gin_trgm_ops)"),
+    ("idx_customer_phone_prefix", "customers (phone_number text_pattern_ops)"),
+    ("idx_linked_account_phone_prefix", "linked_accounts (linked_phone_number text_pattern_ops)"),
+    ("idx_postpaid_activation_number_prefix", "postpaid_activations (primary_number text_pattern_ops)"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, on in SEARCH_INDEXES:
+        create_index_concurrently(name, on)
+
+
+def downgrade():
+    for name, _ in reversed(SEARCH_INDEXES):
+        drop_index_concurrently(name)
@@ -0,0 +1,45 @@
+"""notification inbox and global counter tables
+
+The tables start empty; the counter reconcile that runs at worker startup
+fills them from the notifications table.
+
+Revision ID: 0003_notification_counters
+Revises: 0002_customer_search_indexes
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_notification_counters"
+down_revision = "0002_customer_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if "notification_inbox_counters" not in existing:
+        op.create_table(
+            "notification_inbox_counters",
+            sa.Column("customer_id", sa.BigInteger, sa.ForeignKey("customers.customer_id"), primary_key=True),
+            sa.Column("total_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("unread_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("received_today", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("today_date", sa.Date),
+            sa.Column("by_type", sa.JSON, nullable=False, server_default="{}"),
+            sa.Column("by_channel", sa.JSON, nullable=False, server_default="{}"),
+            sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+        )
+
+    if "notification_global_counters" not in existing:
+        op.create_table(
+            "notification_global_counters",
+            sa.Column("counter_key", sa.String(64), primary_key=True),
+            sa.Column("count", sa.BigInteger, nullable=False, server_default="0"),
+        )
+
+
+def downgrade():
+    op.drop_table("notification_global_counters")
+    op.drop_table("notification_inbox_counters")
@@ -0,0 +1,23 @@
+"""referral code sequence
+
+Referral codes are drawn from this sequence (app/utils/referral_codes.py);
+generating a code fails until it exists.
+
+Revision ID: 0004_referral_code_sequence
+Revises: 0003_notification_counters
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0004_referral_code_sequence"
+down_revision = "0003_notification_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE IF NOT EXISTS referral_code_seq")
+
+
+def downgrade():
+    op.execute("DROP SEQUENCE IF EXISTS referral_code_seq")
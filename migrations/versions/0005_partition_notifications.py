@@ -0,0 +1,80 @@
+"""partition notifications by month
+
+Rewrites notifications as a table range-partitioned by created_at, with one
+partition per month from the oldest row to NOTIFICATION_PARTITION_MONTHS_AHEAD
+months ahead, and a default partition. The primary key becomes
+(notification_id, created_at), because PostgreSQL requires the partition key
+in every unique constraint. Rows are copied in this transaction under an
+exclusive lock on the table.
+
+Revision ID: 0005_partition_notifications
+Revises: 0004_referral_code_sequence
+Create Date: 2026-10-19
+"""
+import logging
+from datetime import datetime
+
+from alembic import op
+from sqlalchemy import text
+
+from app.config import settings
+
+revision = "0005_partition_notifications"
+down_revision = "0004_referral_code_sequence"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    years, month_index = divmod(value.month - 1 + months, 12)
+    return datetime(value.year + years, month_index + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    already_partitioned = bind.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'notifications')"
+    )).scalar()
+    if already_partitioned:
+        return
+
+    op.execute("LOCK TABLE notifications IN ACCESS EXCLUSIVE MODE")
+    sequence = bind.execute(text("SELECT pg_get_serial_sequence('notifications', 'notification_id')")).scalar()
+    oldest = bind.execute(text("SELECT MIN(created_at) FROM notifications")).scalar()
+
+    op.execute("UPDATE notifications SET created_at = now() WHERE created_at IS NULL")
+    op.execute("ALTER TABLE notifications RENAME TO notifications_unpartitioned")
+    op.execute(
+        "CREATE TABLE notifications (LIKE notifications_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE notifications ADD PRIMARY KEY (notification_id, created_at)")
+    op.execute("ALTER TABLE notifications ADD FOREIGN KEY (customer_id) REFERENCES customers (customer_id)")
+    op.execute("CREATE INDEX idx_notification_customer_created ON notifications (customer_id, created_at)")
+    op.execute("CREATE TABLE notifications_default PARTITION OF notifications DEFAULT")
+
+    now = datetime.utcnow()
+    month = datetime(oldest.year, oldest.month, 1) if oldest else datetime(now.year, now.month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), settings.NOTIFICATION_PARTITION_MONTHS_AHEAD)
+    partitions = 0
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE notifications_y{month.year}m{month.month:02d} PARTITION OF notifications "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        partitions += 1
+        month = _add_months(month, 1)
+
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_unpartitioned")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY notifications.notification_id")
+    op.execute("DROP TABLE notifications_unpartitioned")
+    logger.info("Converted notifications to %s monthly partitions", partitions)
+
+
+def downgrade():
+    # Partitions may already have been archived and dropped; there is no faithful way back
+    raise NotImplementedError("Partitioning notifications cannot be reverted automatically")
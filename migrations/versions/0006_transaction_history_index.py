@@ -0,0 +1,26 @@
+"""covering index for customer transaction history
+
+Revision ID: 0006_transaction_history_index
+Revises: 0005_partition_notifications
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0006_transaction_history_index"
+down_revision = "0005_partition_notifications"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Covers the keyset-paged history listing, so pages are served from the index alone
+    create_index_concurrently(
+        "idx_transaction_customer_history",
+        "transactions (customer_id, transaction_date, transaction_id) INCLUDE ("
+        "plan_id, recipient_phone_number, transaction_type, original_amount, "
+        "discount_amount, final_amount, payment_method, payment_status)"
+    )
+
+
+def downgrade():
+    drop_index_concurrently("idx_transaction_customer_history")
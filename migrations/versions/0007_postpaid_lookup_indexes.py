@@ -0,0 +1,30 @@
+"""postpaid activation lookup indexes
+
+Revision ID: 0007_postpaid_lookup_indexes
+Revises: 0006_transaction_history_index
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0007_postpaid_lookup_indexes"
+down_revision = "0006_transaction_history_index"
+branch_labels = None
+depends_on = None
+
+# Serve the single-query customer activation lookup (crud_postpaid), which
+# matches a customer as the primary holder or as a secondary number
+INDEXES = [
+    ("idx_postpaid_activation_customer_status", "postpaid_activations (customer_id, status)"),
+    ("idx_postpaid_secondary_customer", "postpaid_secondary_numbers (customer_id)"),
+    ("idx_postpaid_secondary_phone", "postpaid_secondary_numbers (phone_number)"),
+]
+
+
+def upgrade():
+    for name, on in INDEXES:
+        create_index_concurrently(name, on)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        drop_index_concurrently(name)
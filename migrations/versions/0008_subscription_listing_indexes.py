@@ -0,0 +1,28 @@
+"""admin subscription listing indexes
+
+Revision ID: 0008_subscription_listing_indexes
+Revises: 0007_postpaid_lookup_indexes
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0008_subscription_listing_indexes"
+down_revision = "0007_postpaid_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+# Keyset pagination of the admin active-subscription and activation-queue views
+INDEXES = [
+    ("idx_subscription_active_window", "subscriptions (expiry_date, activation_date)"),
+    ("idx_activation_queue_pending", "subscription_activation_queue (processed_at, queue_position, queue_id)"),
+]
+
+
+def upgrade():
+    for name, on in INDEXES:
+        create_index_concurrently(name, on)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        drop_index_concurrently(name)
@@ -0,0 +1,21 @@
+"""subscription phone lookup index for the phone directory
+
+Revision ID: 0009_phone_directory_index
+Revises: 0008_subscription_listing_indexes
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0009_phone_directory_index"
+down_revision = "0008_subscription_listing_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One branch of the PhoneDirectoryService UNION ALL: live subscriptions on a number
+    create_index_concurrently("idx_subscription_phone_expiry", "subscriptions (phone_number, expiry_date)")
+
+
+def downgrade():
+    drop_index_concurrently("idx_subscription_phone_expiry")
@@ -0,0 +1,24 @@
+"""inactivity warning claim and days_inactive index
+
+Revision ID: 0010_customer_inactivity
+Revises: 0009_phone_directory_index
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0010_customer_inactivity"
+down_revision = "0009_phone_directory_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE customers ADD COLUMN IF NOT EXISTS inactivity_warning_days INTEGER")
+    create_index_concurrently("idx_customer_days_inactive", "customers (days_inactive)")
+
+
+def downgrade():
+    drop_index_concurrently("idx_customer_days_inactive")
+    op.execute("ALTER TABLE customers DROP COLUMN IF EXISTS inactivity_warning_days")
@@ -0,0 +1,104 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Settings are read at import time, so point the app at a throwaway SQLite file first
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db_file.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file.name}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.security import create_access_token
+from app.core.sql_profiler import profile_sql
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models.models import Admin, Base, Customer
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+    os.unlink(_db_file.name)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def client():
+    # Not used as a context manager, so startup tasks (Mongo, schedulers) stay off
+    return TestClient(app)
+
+
+@pytest.fixture
+def customer(db):
+    customer = Customer(phone_number="9876543210", password_hash="x", full_name="Test Customer")
+    db.add(customer)
+    db.commit()
+    return customer
+
+
+@pytest.fixture
+def admin(db):
+    admin = Admin(name="Test Admin", email="admin@example.com", phone_number="9123456780", password_hash="x")
+    db.add(admin)
+    db.commit()
+    return admin
+
+
+@pytest.fixture
+def customer_headers(customer):
+    token = create_access_token({"sub": str(customer.customer_id)}, user_type="customer")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin_headers(admin):
+    token = create_access_token({"sub": str(admin.admin_id)}, user_type="admin")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test when the block runs more statements than `budget`, or repeats
+    one statement shape often enough to look like an N+1:
+
+        with query_budget(4):
+            client.get("/customer/transactions", headers=customer_headers)
+    """
+
+    @contextmanager
+    def _budget(budget: int, allow_n_plus_one: bool = False):
+        with profile_sql() as profile:
+            yield profile
+        assert profile.statement_count <= budget, (
+            f"{profile.statement_count} statements, budget is {budget}: "
+            f"{dict(profile.fingerprints.most_common())}"
+        )
+        if not allow_n_plus_one:
+            assert not profile.has_n_plus_one, f"Repeated statements: {profile.repeated_statements()}"
+
+    return _budget
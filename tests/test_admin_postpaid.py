@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import (
+    AddonStatus, Category, Customer, Plan, PlanType, PostpaidActivation,
+    PostpaidDataAddon, PostpaidSecondaryNumber, PostpaidStatus
+)
+
+
+@pytest.fixture
+def activations(db):
+    db.add(Category(category_id=1, category_name="Postpaid"))
+    db.add(Plan(plan_id=1, category_id=1, plan_name="Family 599", plan_type=PlanType.postpaid,
+                price=599, validity_days=30, description="Shared data"))
+    now = datetime.utcnow()
+    for i in range(1, 41):
+        db.add(Customer(customer_id=100 + i, phone_number=f"9{i:09d}", password_hash="x", full_name=f"Customer {i}"))
+        db.add(PostpaidActivation(
+            activation_id=i, customer_id=100 + i, plan_id=1, primary_number=f"9{i:09d}",
+            billing_cycle_start=now, billing_cycle_end=now + timedelta(days=30),
+            base_data_allowance_gb=75, current_data_balance_gb=75, base_amount=599,
+            total_amount_due=599, status=PostpaidStatus.active, created_at=now - timedelta(minutes=i)
+        ))
+        db.add(PostpaidSecondaryNumber(activation_id=i, phone_number=f"8{i:09d}", added_date=now))
+        db.add(PostpaidDataAddon(activation_id=i, addon_name="10GB", data_amount_gb=10, addon_price=99,
+                                 valid_until=now + timedelta(days=30), status=AddonStatus.active))
+        db.add(PostpaidDataAddon(activation_id=i, addon_name="5GB", data_amount_gb=5, addon_price=49,
+                                 valid_until=now - timedelta(days=1), status=AddonStatus.expired))
+    db.commit()
+
+
+def test_activation_list_query_count_does_not_grow_with_page_size(client, admin_headers, activations, query_budget):
+    counts = {}
+    for limit in (5, 40):
+        # Auth (2), the activation page, then one batched load each for secondary numbers and addons
+        with query_budget(5) as profile:
+            response = client.get("/admin/postpaid/activations", params={"limit": limit}, headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = profile.statement_count
+
+    assert counts[5] == counts[40]
+
+
+def test_activation_list_includes_related_rows(client, admin_headers, activations):
+    response = client.get("/admin/postpaid/activations", params={"limit": 1}, headers=admin_headers)
+
+    activation = response.json()[0]
+    assert activation["customer_name"].startswith("Customer ")
+    assert len(activation["secondary_numbers"]) == 1
+    assert [addon["addon_name"] for addon in activation["data_addons"]] == ["10GB"]
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import (
+    Category, Customer, PaymentMethod, PaymentStatus, Plan, PlanType, Subscription,
+    SubscriptionActivationQueue, Transaction, TransactionType
+)
+
+
+@pytest.fixture
+def subscriptions(db):
+    """30 customers: odd ids hold an active subscription, even ids a queued one"""
+    db.add(Category(category_id=1, category_name="Popular"))
+    db.add(Plan(plan_id=1, category_id=1, plan_name="Daily 2GB", plan_type=PlanType.prepaid,
+                price=349, validity_days=28, description="Unlimited calls"))
+    now = datetime.utcnow()
+    for i in range(1, 31):
+        db.add(Customer(customer_id=100 + i, phone_number=f"9{i:09d}", password_hash="x", full_name=f"Customer {i}"))
+        db.add(Transaction(
+            transaction_id=i, customer_id=100 + i, plan_id=1, recipient_phone_number=f"9{i:09d}",
+            transaction_type=TransactionType.prepaid_recharge, original_amount=349, final_amount=349,
+            payment_method=PaymentMethod.upi, payment_status=PaymentStatus.success
+        ))
+        db.add(Subscription(
+            subscription_id=i, customer_id=100 + i, phone_number=f"9{i:09d}", plan_id=1, transaction_id=i,
+            activation_date=now - timedelta(days=1) if i % 2 else None,
+            expiry_date=now + timedelta(days=27)
+        ))
+        if not i % 2:
+            db.add(SubscriptionActivationQueue(
+                queue_id=i, subscription_id=i, customer_id=100 + i, phone_number=f"9{i:09d}",
+                expected_activation_date=now + timedelta(days=27), expected_expiry_date=now + timedelta(days=55),
+                queue_position=i % 3 + 1
+            ))
+    db.commit()
+
+
+@pytest.mark.parametrize("path", ["/admin/subscriptions/active", "/admin/subscriptions/queue"])
+def test_subscription_lists_query_count_does_not_grow_with_page_size(
+    client, admin_headers, subscriptions, query_budget, path
+):
+    counts = {}
+    for limit in (3, 15):
+        # Auth (2) and the single joined page query
+        with query_budget(3) as profile:
+            response = client.get(path, params={"limit": limit}, headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert all(row["plan_name"] == "Daily 2GB" and row["customer_name"] for row in response.json())
+        counts[limit] = profile.statement_count
+
+    assert counts[3] == counts[15]
+
+
+@pytest.mark.parametrize("path, key", [
+    ("/admin/subscriptions/active", "subscription_id"),
+    ("/admin/subscriptions/queue", "queue_id"),
+])
+def test_subscription_lists_page_by_cursor(client, admin_headers, subscriptions, path, key):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params, headers=admin_headers)
+        seen.extend(row[key] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert len(seen) == 15
+    assert len(set(seen)) == 15
@@ -0,0 +1,36 @@
+import re
+
+from app.core.sql_profiler import profile_sql
+
+_WRITE = re.compile(r"^\s*(INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+def test_profile_read_issues_no_writes(client, customer_headers):
+    with profile_sql() as profile:
+        response = client.get("/customer/profile", headers=customer_headers)
+
+    assert response.status_code == 200
+    assert profile.statement_count > 0
+    writes = [fp for fp in profile.fingerprints if _WRITE.match(fp)]
+    assert writes == []
+
+
+def test_profile_honours_if_none_match(client, customer_headers):
+    etag = client.get("/customer/profile", headers=customer_headers).headers["ETag"]
+
+    response = client.get("/customer/profile", headers={**customer_headers, "If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_profile_etag_changes_with_profile(client, customer_headers, customer, db):
+    etag = client.get("/customer/profile", headers=customer_headers).headers["ETag"]
+    customer.full_name = "Renamed Customer"
+    db.commit()
+
+    response = client.get("/customer/profile", headers={**customer_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed Customer"
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import (
+    Category, PaymentMethod, PaymentStatus, Plan, PlanType, Transaction, TransactionType
+)
+
+
+@pytest.fixture
+def transactions(db, customer):
+    db.add(Category(category_id=1, category_name="Popular"))
+    db.add(Plan(plan_id=1, category_id=1, plan_name="Daily 1.5GB", plan_type=PlanType.prepaid,
+                price=299, validity_days=28, description="Unlimited calls"))
+    now = datetime.utcnow()
+    for i in range(30):
+        db.add(Transaction(
+            customer_id=customer.customer_id,
+            plan_id=1,
+            recipient_phone_number=customer.phone_number,
+            transaction_type=TransactionType.prepaid_recharge,
+            original_amount=299,
+            final_amount=299,
+            payment_method=PaymentMethod.upi,
+            payment_status=PaymentStatus.success,
+            transaction_date=now - timedelta(hours=i)
+        ))
+    db.commit()
+
+
+def test_transaction_history_stays_within_query_budget(client, customer_headers, transactions, query_budget):
+    # Blacklist check, customer lookup and the history query itself
+    with query_budget(3):
+        response = client.get("/customer/transactions", params={"limit": 25}, headers=customer_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 25
+    assert all(row["plan_name"] == "Daily 1.5GB" for row in response.json())
+
+
+def test_transaction_history_pages_by_cursor(client, customer_headers, transactions, query_budget):
+    first = client.get("/customer/transactions", params={"limit": 20}, headers=customer_headers)
+    cursor = first.headers["X-Next-Cursor"]
+
+    with query_budget(3):
+        second = client.get("/customer/transactions", params={"limit": 20, "cursor": cursor}, headers=customer_headers)
+
+    assert len(second.json()) == 10
+    assert "X-Next-Cursor" not in second.headers
+    first_ids = {row["transaction_id"] for row in first.json()}
+    assert first_ids.isdisjoint(row["transaction_id"] for row in second.json())
@@ -0,0 +1,53 @@
+from app.database import session_scope
+from app.models.models import Category, Customer, PaymentMethod, PaymentStatus, Plan, PlanType, Transaction, TransactionType
+from app.services.dashboard_counters import LocalCounterStore, dashboard_counters
+
+
+def _recharge(db, transaction_id, plan_id=1, amount=349):
+    db.add(Transaction(
+        transaction_id=transaction_id, customer_id=1, plan_id=plan_id, recipient_phone_number="9000000001",
+        transaction_type=TransactionType.prepaid_recharge, original_amount=amount, final_amount=amount,
+        payment_method=PaymentMethod.upi, payment_status=PaymentStatus.success
+    ))
+    db.commit()
+
+
+def test_reconcile_keeps_commits_made_during_the_rebuild(db, monkeypatch):
+    monkeypatch.setattr(dashboard_counters, "store", LocalCounterStore())
+    db.add(Category(category_id=1, category_name="Popular"))
+    db.add(Plan(plan_id=1, category_id=1, plan_name="Daily 2GB", plan_type=PlanType.prepaid,
+                price=349, validity_days=28, description="Unlimited calls"))
+    db.add(Customer(customer_id=1, phone_number="9000000001", password_hash="x", full_name="Customer 1"))
+    db.commit()
+    for transaction_id in range(1, 4):
+        _recharge(db, transaction_id)
+
+    # A recharge commits after the SQL totals were read, before they are applied
+    finish_reconcile = dashboard_counters.store.finish_reconcile
+
+    def finish_after_a_commit(values, watermarks):
+        _recharge(db, 4)
+        finish_reconcile(values, watermarks)
+
+    monkeypatch.setattr(dashboard_counters.store, "finish_reconcile", finish_after_a_commit)
+    dashboard_counters.reconcile(db)
+
+    overview = dashboard_counters.get_dashboard(session_scope)["overview"]
+    assert overview["total_transactions"] == 4
+    assert overview["total_customers"] == 1
+
+
+def test_new_plan_is_named_before_the_next_reconcile(db, monkeypatch):
+    monkeypatch.setattr(dashboard_counters, "store", LocalCounterStore())
+    db.add(Category(category_id=1, category_name="Popular"))
+    db.add(Customer(customer_id=1, phone_number="9000000001", password_hash="x", full_name="Customer 1"))
+    db.commit()
+    dashboard_counters.reconcile(db)
+
+    db.add(Plan(plan_id=7, category_id=1, plan_name="Annual 2.5GB", plan_type=PlanType.prepaid,
+                price=3599, validity_days=365, description="Unlimited calls"))
+    db.commit()
+    _recharge(db, 1, plan_id=7, amount=3599)
+
+    top_plans = dashboard_counters.get_dashboard(session_scope)["top_plans"]
+    assert [(plan["name"], plan["transactions"]) for plan in top_plans] == [("Annual 2.5GB", 1)]
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app.models.models import Customer, Notification, NotificationType
+from app.services.inactivity_service import inactivity_service
+
+
+def test_warnings_count_from_sign_up_and_go_out_once(db):
+    now = datetime.utcnow()
+    db.add_all([
+        Customer(customer_id=1, phone_number="9000000001", password_hash="x", full_name="Never Recharged",
+                 created_at=now - timedelta(days=7, hours=1)),
+        Customer(customer_id=2, phone_number="9000000002", password_hash="x", full_name="Lapsed",
+                 created_at=now - timedelta(days=90), last_active_plan_date=now - timedelta(days=30, hours=1)),
+        Customer(customer_id=3, phone_number="9000000003", password_hash="x", full_name="New",
+                 created_at=now - timedelta(days=2)),
+    ])
+    db.commit()
+
+    first = inactivity_service.run(db)
+    second = inactivity_service.run(db)
+
+    assert first["warnings_sent"] == {7: 1, 30: 1}
+    assert second["warnings_sent"] == {7: 0, 30: 0}
+    warned = db.query(Notification.customer_id).filter(
+        Notification.type == NotificationType.inactivity_warning
+    ).order_by(Notification.customer_id).all()
+    assert [customer_id for customer_id, in warned] == [1, 2]
@@ -0,0 +1,31 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app.core.logging_config import DeferredQueueHandler, JsonFormatter
+
+
+def test_queued_records_keep_their_exception():
+    stream = io.StringIO()
+    output_handler = logging.StreamHandler(stream)
+    output_handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, output_handler)
+    logger = logging.getLogger("tests.logging")
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    logger.propagate = False
+
+    listener.start()
+    try:
+        raise ValueError("bad carousel")
+    except ValueError:
+        logger.exception("Failed to create %s", "carousel", extra={"carousel_id": 7})
+    finally:
+        listener.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Failed to create carousel"
+    assert entry["carousel_id"] == 7
+    assert "ValueError: bad carousel" in entry["exception"]
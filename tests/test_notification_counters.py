@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.crud.crud_notification_counter import crud_notification_counter
+from app.models.models import (
+    Customer, Notification, NotificationChannel, NotificationInboxCounter, NotificationType
+)
+
+
+@pytest.fixture
+def notifications(db, monkeypatch):
+    # Several batches, so customers are reconciled across transactions
+    monkeypatch.setattr(settings, "NOTIFICATION_COUNTER_RECONCILE_BATCH_SIZE", 3)
+    now = datetime.utcnow()
+    for customer_id in range(1, 8):
+        db.add(Customer(customer_id=customer_id, phone_number=f"90000000{customer_id:02d}",
+                        password_hash="x", full_name=f"Customer {customer_id}"))
+        for k in range(customer_id):
+            db.add(Notification(
+                customer_id=customer_id, title="Plan update", message="Your plan changed",
+                type=NotificationType.plan_expiry if k % 2 else NotificationType.low_balance,
+                channel=NotificationChannel.sms, is_read=k % 3 == 0,
+                status="sent" if k % 2 else "pending", sent_at=now if k % 2 else None,
+                created_at=now - timedelta(days=3 * (k % 2))
+            ))
+    db.commit()
+
+
+def test_reconcile_fills_empty_counters(db, notifications):
+    result = crud_notification_counter.reconcile(db)
+
+    assert result == {"customers": 7, "global_counters": 7}
+    assert crud_notification_counter.get_customer_stats(db, 7) == {
+        "total_notifications": 7, "unread_count": 4, "received_today": 4,
+        "by_type": {"low_balance": 4, "plan_expiry": 3}, "by_channel": {"sms": 7}
+    }
+    stats = crud_notification_counter.get_global_stats(db)
+    assert stats["total_notifications"] == 28
+    assert stats["sent_today"] == 12
+    assert stats["by_status"] == {"pending": 16, "sent": 12}
+
+
+def test_reconcile_writes_only_drifted_counters(db, notifications):
+    crud_notification_counter.reconcile(db)
+    expected = [crud_notification_counter.get_customer_stats(db, customer_id) for customer_id in range(1, 8)]
+    expected_global = crud_notification_counter.get_global_stats(db)
+
+    assert crud_notification_counter.reconcile(db) == {"customers": 0, "global_counters": 0}
+
+    inbox = db.get(NotificationInboxCounter, 5)
+    inbox.unread_count += 4
+    inbox.by_type = {**inbox.by_type, "offer": 2}
+    crud_notification_counter._increment_global(db, "total", 7)
+    db.commit()
+
+    assert crud_notification_counter.reconcile(db) == {"customers": 1, "global_counters": 1}
+    assert [crud_notification_counter.get_customer_stats(db, customer_id) for customer_id in range(1, 8)] == expected
+    assert crud_notification_counter.get_global_stats(db) == expected_global
@@ -0,0 +1,30 @@
+from app.utils.referral_codes import (
+    _check_character, decode_referral_code, encode_referral_code, normalize_referral_code
+)
+
+
+def test_codes_round_trip_and_tolerate_typing_variants():
+    code = encode_referral_code(12345)
+
+    assert decode_referral_code(code) == 12345
+    assert normalize_referral_code(f" {code[:4].lower()}-{code[4:]} ") == code
+
+
+def test_check_character_catches_adjacent_swaps_except_0_and_z():
+    payload = "0Z1Y2X3W"
+    check = _check_character(payload)
+
+    # The one blind spot of Luhn mod 32, as 09 <-> 90 is for Luhn mod 10
+    assert normalize_referral_code("Z01Y2X3W" + check) is not None
+    assert normalize_referral_code("0ZY12X3W" + check) is None
+    assert normalize_referral_code("0Z1Y2X3V" + check) is None
+
+
+def test_bulk_codes_are_distinct_and_well_formed(client, admin_headers):
+    # The referral router carries its own /admin prefix and is mounted under /admin
+    response = client.post("/admin/admin/referrals/codes/bulk", params={"count": 200}, headers=admin_headers)
+
+    assert response.status_code == 200
+    codes = response.json()["codes"]
+    assert len(set(codes)) == 200
+    assert all(normalize_referral_code(code) == code for code in codes)
@@ -0,0 +1,49 @@
+import time
+
+from app.models.models import Customer
+from app.services.customer_search import LocalSearchIndex, customer_search
+from app.services.phone_directory import phone_directory
+from app.services.realtime_metrics import realtime_metrics
+
+
+def test_search_index_follows_commits_and_ignores_rollbacks(db, monkeypatch):
+    monkeypatch.setattr(customer_search, "local_index", LocalSearchIndex())
+    customer_search.local_index.load(db)
+
+    db.add(Customer(customer_id=1, phone_number="9000000001", password_hash="x", full_name="Asha Rao"))
+    db.flush()
+    assert customer_search.local_index.search("90000", 10) == []
+    db.commit()
+    assert customer_search.local_index.search("90000", 10) == [1]
+
+    db.add(Customer(customer_id=2, phone_number="9000000002", password_hash="x", full_name="Ravi Kumar"))
+    db.flush()
+    db.rollback()
+    db.delete(db.get(Customer, 1))
+    db.commit()
+    assert customer_search.local_index.search("90000", 10) == []
+
+
+def test_phone_directory_drops_old_and_new_numbers_on_commit(db, customer):
+    assert phone_directory.resolve(db, customer.phone_number)["customer_id"] == customer.customer_id
+
+    customer.phone_number = "9123400000"
+    db.flush()
+    # Still cached until the change commits
+    assert phone_directory.resolve(db, "9876543210")["customer_id"] == customer.customer_id
+    db.commit()
+
+    assert phone_directory.resolve(db, "9876543210")["customer_id"] is None
+    assert phone_directory.resolve(db, "9123400000")["customer_id"] == customer.customer_id
+
+
+def test_realtime_metrics_count_committed_rows_only(db):
+    registrations = realtime_metrics.windows["hour"].totals(time.time())["registrations"]
+
+    db.add(Customer(customer_id=3, phone_number="9000000003", password_hash="x", full_name="Meera Iyer"))
+    db.commit()
+    db.add(Customer(customer_id=4, phone_number="9000000004", password_hash="x", full_name="Dev Shah"))
+    db.flush()
+    db.rollback()
+
+    assert realtime_metrics.windows["hour"].totals(time.time())["registrations"] == registrations + 1